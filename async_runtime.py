@@ -0,0 +1,389 @@
+"""
+Moduł realizujący współbieżne środowisko asyncio dla protokołów ARQ.
+Nadajnik, kanał (w każdą stronę) i Odbiornik są osobnymi zadaniami połączonymi
+ograniczonymi kolejkami asyncio.Queue, a linia opóźniająca kanału przetrzymuje
+ramki przez czas serializacji i propagacji. Dzięki temu w łączu jednocześnie
+znajduje się wiele ramek (potok), a przepustowość zależy od okna i RTT.
+"""
+
+# async_runtime.py
+import asyncio
+import heapq
+import time
+from channel import GilbertChannel, PassThroughChannel
+from config import SimConfig
+from sender import Sender, SelectiveRepeatSender
+from receiver import Receiver, SelectiveRepeatReceiver
+from events import sink_or_null, RETRANSMIT
+
+
+class AsyncLink:
+    """
+    Jednokierunkowe łącze jako dwa zadania: kanał (zakłócenia) i linia opóźniająca.
+
+    Ramki wstawione do `inbox` przechodzą przez model Gilberta, czekają czas serializacji
+    i propagacji, po czym trafiają do `outbox` w kolejności wysłania (FIFO).
+    Pełna kolejka `inbox` wstrzymuje wysyłającego (backpressure).
+
+    Attributes:
+        inbox (asyncio.Queue): Ramki od strony nadającej (ograniczona).
+        outbox (asyncio.Queue): Ramki gotowe do odbioru (ograniczona).
+        in_flight (int): Liczba ramek aktualnie w linii opóźniającej.
+        max_in_flight (int): Największa zaobserwowana liczba ramek w linii.
+    """
+
+    def __init__(self, channel, bit_rate, delay=None, queue_size=64):
+        """
+        Args:
+            channel (GilbertChannel): Model zakłóceń (może być wspólny dla obu kierunków).
+            bit_rate (float): Przepływność łącza (bity na sekundę).
+            delay (float): Stałe opóźnienie propagacji w sekundach (None - losowane z kanału).
+            queue_size (int): Pojemność kolejek wejściowej i wyjściowej.
+        """
+        self.channel = channel
+        self.bit_rate = bit_rate
+        self.delay = delay
+        self.inbox = asyncio.Queue(queue_size)
+        self.outbox = asyncio.Queue(queue_size)
+        self._line = asyncio.Queue()
+        self.free_at = 0.0
+        self.last_arrival = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _propagation_delay(self):
+        return self.delay if self.delay is not None else self.channel.sample_delay()
+
+    async def impair(self):
+        """Zadanie kanału: nakłada zakłócenia i wyznacza chwilę przybycia ramki."""
+        loop = asyncio.get_running_loop()
+        while True:
+            raw_bytes = await self.inbox.get()
+            raw_bytes = self.channel.propagate(raw_bytes)
+
+            departure = max(loop.time(), self.free_at)
+            self.free_at = departure + (len(raw_bytes) * 8) / self.bit_rate
+            arrival = max(self.free_at + self._propagation_delay(), self.last_arrival)
+            self.last_arrival = arrival
+
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self._line.put_nowait((arrival, raw_bytes))
+
+    async def deliver(self):
+        """Zadanie linii opóźniającej: wydaje ramki w chwili ich przybycia."""
+        loop = asyncio.get_running_loop()
+        while True:
+            arrival, raw_bytes = await self._line.get()
+            lag = arrival - loop.time()
+            if lag > 0:
+                await asyncio.sleep(lag)
+            self.in_flight -= 1
+            await self.outbox.put(raw_bytes)
+
+    def tasks(self):
+        """Tworzy zadania łącza (wymaga działającej pętli zdarzeń)."""
+        return [asyncio.create_task(self.impair()), asyncio.create_task(self.deliver())]
+
+
+class AsyncGoBackN:
+    """
+    Przebieg Go-Back-N w środowisku asyncio (czas rzeczywisty pętli zdarzeń).
+
+    Nadajnik i Odbiornik korzystają z kanału bez zakłóceń (PassThroughChannel),
+    a zakłócenia nakładają zadania łączy - każda transmisja przechodzi przez model
+    Gilberta dokładnie raz.
+
+    Attributes:
+        sim_config (SimConfig): Parametry przebiegu.
+        channel (GilbertChannel): Model zakłóceń wspólny dla obu kierunków.
+        delay (float or None): Stałe opóźnienie propagacji (None - z kanału, MIN_DELAY..MAX_DELAY).
+        queue_size (int): Pojemność kolejek łączy.
+        stats (dict): Liczniki przebiegu.
+        events: Odbiorca zdarzeń (domyślnie wyłączony).
+    """
+
+    sender_class = Sender
+    receiver_class = Receiver
+
+    def __init__(self, sim_config=None, delay=None, queue_size=64, events=None):
+        if sim_config is None:
+            sim_config = SimConfig.from_module()
+        self.sim_config = sim_config
+        self.events = sink_or_null(events)
+        self.channel = GilbertChannel(sim_config, events=self.events)
+        self.delay = delay
+        self.queue_size = queue_size
+        self.target_packets = sim_config.target_packets
+        self.data_to_send = [f"Pakiet_{i + 1}" for i in range(self.target_packets)]
+        self.sent_data_idx = 0
+        self.first_sent_at = []
+
+        self.stats = {
+            'transmissions': 0,
+            'retransmissions': 0,
+            'timeouts': 0,
+            'fast_retransmits': 0,
+            'latencies': [],
+        }
+
+    # --- Nadajnik ---
+
+    async def _transmit(self, raw_bytes):
+        await self.forward.inbox.put(raw_bytes)
+        self.stats['transmissions'] += 1
+
+    async def _send_new_frames(self):
+        sender = self.sender
+        while sender._is_within_window(sender.next_seq_num) and self.sent_data_idx < self.target_packets:
+            _, raw_bytes = sender.send_data(self.data_to_send[self.sent_data_idx])
+            self.first_sent_at.append(self.loop.time())
+            self.sent_data_idx += 1
+            await self._transmit(raw_bytes)
+
+    def _arm_timer(self):
+        """Watchdog timera (jak w GoBackNSimulation._arm_timer)."""
+        sender = self.sender
+        if sender.base != sender.next_seq_num and sender.timer_start is None:
+            sender.start_timer()
+        if sender.base == sender.next_seq_num and self.sent_data_idx >= self.target_packets:
+            sender.stop_timer()
+
+    def _next_deadline(self):
+        """Zwraca chwilę najbliższego timeoutu (None - brak działającego timera)."""
+        return self.sender.timer_deadline()
+
+    async def _on_timeout(self):
+        sender = self.sender
+        if not sender.is_timeout():
+            return
+
+        self.stats['timeouts'] += 1
+        await self._retransmit_window(fast=False)
+
+    async def _retransmit_window(self, fast):
+        """Retransmituje niepotwierdzone okno (po timeoucie lub szybko) i restartuje timer."""
+        sender = self.sender
+        sender.retransmission_started()
+        outstanding = sender.outstanding_frames()
+        if self.events.enabled:
+            self.events.emit(RETRANSMIT, seq=sender.base, frames=len(outstanding), selective=False, fast=fast)
+
+        for frame in outstanding:
+            await self._transmit(sender.send_frame(frame))
+            self.stats['retransmissions'] += 1
+
+        sender.stop_timer()
+        sender.start_timer()
+
+    async def _sender_task(self):
+        sender = self.sender
+        acks = self.reverse.outbox
+        while True:
+            await self._send_new_frames()
+            self._arm_timer()
+
+            deadline = self._next_deadline()
+            wait = None if deadline is None else max(0.0, deadline - self.loop.time())
+            try:
+                ack_bytes = await asyncio.wait_for(acks.get(), wait)
+            except asyncio.TimeoutError:
+                await self._on_timeout()
+                continue
+
+            ack_frame = sender.decode(ack_bytes)
+            if not ack_frame.is_corrupt():
+                sender.on_ack(ack_frame.seq_num)
+                if sender.fast_retransmit_pending:
+                    self.stats['fast_retransmits'] += 1
+                    await self._retransmit_window(fast=True)
+
+    # --- Odbiornik ---
+
+    async def _receiver_task(self):
+        receiver = self.receiver
+        frames = self.forward.outbox
+        acks = self.reverse.inbox
+        while True:
+            # Wstrzymane ACK (polityka potwierdzeń) - czekamy na ramkę najdłużej do jego terminu
+            ack_due = receiver.ack_due
+            wait = None if ack_due is None else max(0.0, ack_due - self.loop.time())
+            try:
+                raw_bytes = await asyncio.wait_for(frames.get(), wait)
+            except asyncio.TimeoutError:
+                ack_bytes = receiver.flush_ack()
+                if ack_bytes is not None:
+                    await acks.put(ack_bytes)
+                continue
+
+            delivered_before = len(receiver.received_payload)
+            ack_bytes = receiver.receive_frame(raw_bytes)
+
+            now = self.loop.time()
+            for idx in range(delivered_before, len(receiver.received_payload)):
+                self.stats['latencies'].append(now - self.first_sent_at[idx])
+            if len(receiver.received_payload) >= self.target_packets:
+                self.done.set()
+                return
+
+            if ack_bytes is not None:
+                await acks.put(ack_bytes)
+
+    async def run(self):
+        """
+        Wykonuje przebieg do momentu odebrania `target_packets` pakietów.
+
+        Returns:
+            dict: Statystyki przebiegu (m.in. efficiency, wall_time, throughput w pakietach/s,
+                  max_in_flight - największa liczba ramek DATA jednocześnie w łączu).
+        """
+        self.loop = asyncio.get_running_loop()
+        self.done = asyncio.Event()
+        pass_through = PassThroughChannel()
+        self.sender = self.sender_class(clock=self.loop.time, sim_config=self.sim_config, channel=pass_through,
+                                        events=self.events)
+        self.receiver = self.receiver_class(sim_config=self.sim_config, channel=pass_through, events=self.events,
+                                            clock=self.loop.time)
+        self.forward = AsyncLink(self.channel, self.sim_config.bit_rate, self.delay, self.queue_size)
+        self.reverse = AsyncLink(self.channel, self.sim_config.bit_rate, self.delay, self.queue_size)
+
+        wall_start = time.perf_counter()
+        tasks = self.forward.tasks() + self.reverse.tasks()
+        tasks.append(asyncio.create_task(self._sender_task()))
+        tasks.append(asyncio.create_task(self._receiver_task()))
+        done_waiter = asyncio.create_task(self.done.wait())
+        try:
+            finished, _ = await asyncio.wait(tasks + [done_waiter], return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                # Zadania robocze kończą się tylko błędem (lub odbiornik - po komplecie pakietów)
+                if task is not done_waiter and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks + [done_waiter]:
+                task.cancel()
+            await asyncio.gather(*tasks, done_waiter, return_exceptions=True)
+        wall_time = time.perf_counter() - wall_start
+
+        stats = self.stats
+        transmissions = stats['transmissions']
+        stats['delivered'] = len(self.receiver.received_payload)
+        stats['efficiency'] = self.target_packets / transmissions if transmissions > 0 else 0
+        stats['wall_time'] = wall_time
+        stats['throughput'] = stats['delivered'] / wall_time if wall_time > 0 else 0
+        stats['max_in_flight'] = self.forward.max_in_flight
+        stats['ack'] = self.receiver.ack_snapshot()
+        return stats
+
+
+class AsyncSelectiveRepeat(AsyncGoBackN):
+    """Przebieg Selective Repeat w środowisku asyncio (osobny timer dla każdej ramki)."""
+
+    sender_class = SelectiveRepeatSender
+    receiver_class = SelectiveRepeatReceiver
+
+    def __init__(self, sim_config=None, delay=None, queue_size=64, events=None):
+        super().__init__(sim_config, delay, queue_size, events)
+        self._timers = []
+
+    def _arm_timer(self):
+        sender = self.sender
+        for seq_num, start, deadline in sender.started_timers:
+            heapq.heappush(self._timers, (deadline, seq_num, start))
+        sender.started_timers.clear()
+
+    def _next_deadline(self):
+        # Timery nieaktualne (ramka potwierdzona lub timer zrestartowany) są pomijane
+        sender = self.sender
+        timers = self._timers
+        while timers:
+            _, seq_num, start = timers[0]
+            if sender.sent_at[seq_num % sender.buffer.capacity] == start and sender.buffer.get(seq_num) is not None:
+                return timers[0][0]
+            heapq.heappop(timers)
+        return None
+
+    async def _on_timeout(self):
+        _, seq_num, start = heapq.heappop(self._timers)
+        sender = self.sender
+        if not sender.is_frame_timeout(seq_num, start):
+            return
+
+        self.stats['timeouts'] += 1
+        if self.events.enabled:
+            self.events.emit(RETRANSMIT, seq=seq_num, frames=1, selective=True)
+
+        await self._transmit(sender.retransmit_frame(seq_num))
+        self.stats['retransmissions'] += 1
+
+
+# Klasy przebiegów asyncio dla trybów ARQ (SimConfig.arq_mode)
+RUNTIMES = {
+    'GBN': AsyncGoBackN,
+    'SR': AsyncSelectiveRepeat,
+}
+
+
+def run_async(sim_config=None, delay=None, queue_size=64, events=None):
+    """
+    Uruchamia jeden przebieg w nowej pętli asyncio i zwraca jego statystyki.
+
+    Args:
+        sim_config (SimConfig): Parametry przebiegu (tryb z sim_config.arq_mode).
+        delay (float): Stałe opóźnienie propagacji w jedną stronę (None - losowane z kanału).
+        queue_size (int): Pojemność kolejek łączy.
+        events: Odbiorca zdarzeń (np. events.ConsoleRenderer()).
+    """
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
+    return asyncio.run(RUNTIMES[sim_config.arq_mode](sim_config, delay, queue_size, events).run())
+
+
+def throughput_table(windows, delays, sim_config=None):
+    """
+    Mierzy przepustowość (pakiety/s) w funkcji rozmiaru okna i opóźnienia propagacji.
+
+    Returns:
+        list: Krotki (okno, opóźnienie, RTT, pakiety/s, max ramek w łączu).
+    """
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
+    rows = []
+    for delay in delays:
+        for window_size in windows:
+            stats = run_async(sim_config.replace(window_size=window_size), delay=delay)
+            rows.append((window_size, delay, 2 * delay, stats['throughput'], stats['max_in_flight']))
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+    import os
+
+    parser = argparse.ArgumentParser(description="Przepustowość ARQ w środowisku asyncio (okno x RTT)")
+    parser.add_argument('--mode', choices=['GBN', 'SR'], type=str.upper, default=None)
+    parser.add_argument('--window', type=int, nargs='+', default=[1, 2, 4, 7])
+    parser.add_argument('--delay', type=float, nargs='+', default=[0.002, 0.01],
+                        help="Opóźnienie propagacji w jedną stronę (sekundy)")
+    parser.add_argument('--p', type=float, default=None, help="GILBERT_P (0 - kanał bez burz)")
+    parser.add_argument('--k', type=float, default=None, help="GILBERT_K (0 - brak szumu tła)")
+    parser.add_argument('--packets', type=int, default=100)
+    parser.add_argument('--seq-bits', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    base_config = SimConfig.from_module(target_packets=args.packets, seed=args.seed, seq_bits=args.seq_bits)
+    if args.mode is not None:
+        base_config = base_config.replace(arq_mode=args.mode)
+    if args.p is not None:
+        base_config = base_config.replace(gilbert_p=args.p)
+    if args.k is not None:
+        base_config = base_config.replace(gilbert_k=args.k)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        table = throughput_table(args.window, args.delay, base_config)
+
+    print(f"Tryb {base_config.arq_mode}, {args.packets} pakietów")
+    print(f"{'okno':>5} {'RTT [ms]':>9} {'pakiety/s':>11} {'max w łączu':>12}")
+    for window_size, delay, rtt, throughput, in_flight in table:
+        print(f"{window_size:>5} {rtt * 1000:>9.1f} {throughput:>11.1f} {in_flight:>12}")
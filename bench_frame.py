@@ -0,0 +1,113 @@
+# bench_frame.py
+"""
+Mikrobenchmark kodeka ramek (Frame.to_bytes / Frame.from_bytes).
+Porównuje liczbę ramek na sekundę dla poprzedniej implementacji ("przed")
+i obecnej ("po"), a także koszt retransmisji z pamięcią podręczną Nadajnika.
+"""
+import struct
+import time
+import zlib
+
+from config import SimConfig
+from channel import GilbertChannel
+from frame import Frame
+from sender import Sender
+
+
+# --- Poprzednia implementacja (punkt odniesienia "przed") ---
+
+class LegacyFrame:
+    """Poprzednia postać ramki: atrybuty w __dict__, typ jako napis."""
+
+    def __init__(self, frame_type, seq_num, payload="", sender_id="A", receiver_id="B"):
+        self.type = frame_type
+        self.seq_num = seq_num
+        self.payload = payload if payload is not None else ""
+        self.sender = sender_id
+        self.receiver = receiver_id
+        self.corrupt_flag = False
+
+
+def legacy_to_bytes(frame):
+    type_code = 0 if frame.type == 'DATA' else 1
+    payload_bytes = frame.payload.encode('utf-8')
+    sender_bytes = frame.sender.encode('utf-8')
+    receiver_bytes = frame.receiver.encode('utf-8')
+    header = struct.pack('!BBcc', frame.seq_num, type_code, sender_bytes, receiver_bytes)
+    content = header + payload_bytes
+    crc = zlib.crc32(content)
+    return struct.pack('!I', crc) + content
+
+
+def legacy_from_bytes(data):
+    frame = LegacyFrame('DATA', 0)
+    try:
+        if len(data) < 8:
+            frame.corrupt_flag = True
+            return frame
+        received_crc = struct.unpack('!I', data[:4])[0]
+        content = data[4:]
+        if received_crc != zlib.crc32(content):
+            frame.corrupt_flag = True
+            try:
+                frame.seq_num = struct.unpack('!B', content[:1])[0]
+            except:
+                pass
+            return frame
+        seq_num, type_code, sender_b, receiver_b = struct.unpack('!BBcc', content[:4])
+        frame.seq_num = seq_num
+        frame.type = 'DATA' if type_code == 0 else 'ACK'
+        frame.sender = sender_b.decode('utf-8', errors='ignore')
+        frame.receiver = receiver_b.decode('utf-8', errors='ignore')
+        frame.payload = content[4:].decode('utf-8', errors='ignore')
+        return frame
+    except Exception:
+        f = LegacyFrame('DATA', 0)
+        f.corrupt_flag = True
+        return f
+
+
+def _rate(func, iterations):
+    """Zwraca liczbę wywołań `func` na sekundę (najlepszy z 3 pomiarów)."""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return iterations / best
+
+
+def run_codec_benchmark(iterations=100000, payload="Pakiet_12345"):
+    """
+    Mierzy ramki/s dla serializacji, deserializacji i retransmisji okna.
+
+    Returns:
+        dict: {nazwa_pomiaru: (ramki/s przed, ramki/s po)}.
+    """
+    frame = Frame('DATA', 5, payload)
+    legacy_frame = LegacyFrame('DATA', 5, payload)
+    raw = frame.to_bytes()
+    assert raw == legacy_to_bytes(legacy_frame), "Nowy kodek musi dawać identyczne bajty"
+
+    results = {
+        'to_bytes': (_rate(lambda: legacy_to_bytes(legacy_frame), iterations),
+                     _rate(frame.to_bytes, iterations)),
+        'from_bytes': (_rate(lambda: legacy_from_bytes(raw), iterations),
+                       _rate(lambda: Frame.from_bytes(raw), iterations)),
+    }
+
+    # Retransmisja zbuforowanej ramki: ponowna serializacja vs bajty z pamięci Nadajnika
+    ideal = GilbertChannel(SimConfig(gilbert_p=0.0, gilbert_k=0.0))
+    sender = Sender(window_size=4, max_seq=8, channel=ideal)
+    buffered = sender.process_data(payload)
+    results['retransmit'] = (_rate(lambda: ideal.propagate(legacy_to_bytes(legacy_frame)), iterations),
+                             _rate(lambda: sender.send_frame(buffered), iterations))
+    return results
+
+
+if __name__ == "__main__":
+    print("Mikrobenchmark kodeka ramek (ramki/s, najlepszy z 3 pomiarów)")
+    print(f"{'pomiar':<12} {'przed':>14} {'po':>14} {'zysk':>8}")
+    for name, (before, after) in run_codec_benchmark().items():
+        print(f"{name:<12} {before:>14,.0f} {after:>14,.0f} {after / before:>7.2f}x")
@@ -0,0 +1,185 @@
+# bench_window.py
+"""
+Pomiar pamięci i przepustowości reprezentacji ramek oraz bufora retransmisji.
+Porównuje poprzednie rozwiązanie (ramka z __dict__, bufor jako dict) z obecnym
+(ramka z __slots__, bufor pierścieniowy SendBuffer) dla okien do 2^15 ramek,
+a także obsługę potwierdzeń kumulacyjnych (zwalnianie komórek po jednej vs zakresem).
+"""
+import time
+import tracemalloc
+
+from bench_frame import LegacyFrame
+from config import SimConfig
+from frame import Frame, DATA
+from sender import Sender, SendBuffer
+
+
+def _allocated(factory, count):
+    """Zwraca średnią liczbę bajtów zaalokowanych na jeden obiekt tworzony przez `factory`."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    # Lista trzymająca obiekty to 8 bajtów na wskaźnik - odejmujemy ją od wyniku
+    return (after - before) / count - 8
+
+
+def frame_memory(count=10000):
+    """Zwraca (bajty na ramkę przed, bajty na ramkę po) - bez współdzielonego napisu z danymi."""
+    payload = "Pakiet_12345"
+    return (_allocated(lambda i: LegacyFrame('DATA', i & 0xFF, payload), count),
+            _allocated(lambda i: Frame(DATA, i & 0xFF, payload), count))
+
+
+def _dict_cycle(window_size, max_seq, frames, rounds):
+    """Poprzedni bufor: wypełnia okno, przegląda je (retransmisja) i zwalnia. Zwraca ramki/s."""
+    buffer = {}
+    start = time.perf_counter()
+    base = 0
+    for _ in range(rounds):
+        for offset in range(window_size):
+            buffer[(base + offset) % max_seq] = frames[offset]
+        for offset in range(window_size):
+            buffer.get((base + offset) % max_seq)
+        for offset in range(window_size):
+            buffer.pop((base + offset) % max_seq, None)
+        base = (base + window_size) % max_seq
+    return rounds * window_size / (time.perf_counter() - start)
+
+
+def _ring_cycle(window_size, max_seq, frames, rounds):
+    """Ten sam cykl na SendBuffer - dostęp do komórek tak, jak robi to Nadajnik. Zwraca ramki/s."""
+    buffer = SendBuffer(window_size, max_seq)
+    slots, wire, capacity = buffer.frames, buffer.wire, buffer.capacity
+    start = time.perf_counter()
+    base = 0
+    for _ in range(rounds):
+        for offset in range(window_size):
+            slot = (base + offset) % capacity
+            slots[slot] = frames[offset]
+            wire[slot] = None
+        for offset in range(window_size):
+            slots[(base + offset) % capacity]
+        for offset in range(window_size):
+            slot = (base + offset) % capacity
+            slots[slot] = None
+            wire[slot] = None
+        base = (base + window_size) % max_seq
+    return rounds * window_size / (time.perf_counter() - start)
+
+
+def window_benchmark(max_exponent=15, frames_per_size=200000):
+    """
+    Mierzy pamięć i przepustowość bufora retransmisji dla okien 2^2 .. 2^max_exponent.
+
+    Returns:
+        list: Krotki (okno, bajty/okno dict, bajty/okno pierścień, ramki/s dict, ramki/s pierścień).
+    """
+    rows = []
+    for exponent in range(2, max_exponent + 1):
+        window_size = 2 ** exponent
+        max_seq = 2 * window_size
+        frames = [Frame(DATA, i % max_seq, "x") for i in range(window_size)]
+        rounds = max(1, frames_per_size // window_size)
+
+        tracemalloc.start()
+        legacy = {i: frames[i] for i in range(window_size)}
+        legacy_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        ring = SendBuffer(window_size, max_seq)
+        for i in range(window_size):
+            ring[i] = frames[i]
+        ring_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del legacy
+
+        rows.append((window_size, legacy_bytes, ring_bytes,
+                     _dict_cycle(window_size, max_seq, frames, rounds),
+                     _ring_cycle(window_size, max_seq, frames, rounds)))
+    return rows
+
+
+def _slot_by_slot_ack(sender, ack_num):
+    """Poprzednia wersja Sender.on_ack: przesuwanie `base` i zwalnianie komórek po jednej, bez walidacji."""
+    frames, wire, capacity = sender.buffer.frames, sender.buffer.wire, sender.buffer.capacity
+    old_base = sender.base
+    moved = 0
+    slot = None
+    while sender.base != ack_num:
+        slot = sender.base % capacity
+        frames[slot] = None
+        wire[slot] = None
+        sender.base = (sender.base + 1) % sender.max_seq
+        moved += 1
+
+    if moved == 0:
+        return 0
+
+    sender.dup_acks = 0
+    if sender.recover is not None and (sender.recover - old_base) % sender.max_seq <= moved:
+        sender.recover = None
+    sender._rtt_sample(slot)
+    if sender.events.enabled:
+        sender.events.emit('ack_moved', ack=ack_num, old_base=old_base, new_base=sender.base, kind='ACK')
+    sender.stop_timer()
+    if sender.base != sender.next_seq_num:
+        sender.start_timer()
+    return moved
+
+
+def ack_cycle(window_size, acks_per_window, rounds, on_ack):
+    """
+    Wypełnia całe okno Nadajnika i potwierdza je `acks_per_window` ACK kumulacyjnymi.
+    Zwraca liczbę potwierdzonych ramek na sekundę.
+    """
+    max_seq = 2 * window_size
+    sender = Sender(window_size, max_seq, clock=lambda: 0.0, sim_config=SimConfig(seq_bits=max_seq.bit_length() - 1))
+    capacity = sender.buffer.capacity
+    ring = [Frame(DATA, i, "x") for i in range(capacity)]
+    step = window_size // acks_per_window
+    acked = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        sender.buffer.frames[:] = ring
+        base = sender.base
+        sender.next_seq_num = (base + window_size) % max_seq
+        for i in range(1, acks_per_window + 1):
+            acked += on_ack(sender, (base + i * step) % max_seq)
+    return acked / (time.perf_counter() - start)
+
+
+def ack_benchmark(max_exponent=15, frames_per_size=400000, acks_per_window=4):
+    """
+    Mierzy obsługę potwierdzeń kumulacyjnych dla okien 2^2 .. 2^max_exponent.
+
+    Returns:
+        list: Krotki (okno, ramki/s po jednej komórce, ramki/s Sender.on_ack).
+    """
+    rows = []
+    for exponent in range(2, max_exponent + 1):
+        window_size = 2 ** exponent
+        acks = min(acks_per_window, window_size)
+        rounds = max(1, frames_per_size // window_size)
+        rows.append((window_size,
+                     ack_cycle(window_size, acks, rounds, _slot_by_slot_ack),
+                     ack_cycle(window_size, acks, rounds, Sender.on_ack)))
+    return rows
+
+
+if __name__ == "__main__":
+    before, after = frame_memory()
+    print(f"Pamięć ramki: przed {before:.0f} B, po {after:.0f} B ({before / after:.2f}x mniej)\n")
+
+    print("Bufor retransmisji (pamięć pełnego okna i cykl wstaw/przegląd/zwolnij)")
+    print(f"{'okno':>7} {'dict [B]':>10} {'pierścień [B]':>14} {'dict [ramki/s]':>15} {'pierścień [ramki/s]':>20}")
+    for window_size, legacy_bytes, ring_bytes, legacy_rate, ring_rate in window_benchmark():
+        print(f"{window_size:>7} {legacy_bytes:>10} {ring_bytes:>14} {legacy_rate:>15,.0f} {ring_rate:>20,.0f}")
+
+    print("\nPotwierdzenia kumulacyjne (4 ACK na pełne okno)")
+    print(f"{'okno':>7} {'po komórce [ramki/s]':>21} {'on_ack [ramki/s]':>17} {'zmiana':>8}")
+    for window_size, slot_rate, bulk_rate in ack_benchmark():
+        print(f"{window_size:>7} {slot_rate:>21,.0f} {bulk_rate:>17,.0f} {bulk_rate / slot_rate:>7.1f}x")
@@ -0,0 +1,261 @@
+"""
+Zestaw benchmarków wydajności całego potoku ARQ.
+Każdy scenariusz ma stałe ziarno i stałą liczbę powtórzeń, a wynikiem jest
+przepustowość (więcej = lepiej). Wyniki są zapisywane w JSON i porównywane
+z zapisanym wynikiem bazowym, co pozwala wykryć regresje po zmianach
+w channel.py, frame.py lub sender.py.
+"""
+
+# benchmark.py
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+
+from config import SimConfig
+from channel import GilbertChannel
+from error_trace import ReplayChannel, cached_trace
+from frame import Frame
+from sender import Sender
+from bench_window import ack_cycle
+from colors import Colors
+from events import NULL_SINK
+import main
+
+# Domyślny plik z wynikiem bazowym (porównanie / aktualizacja przez --update-baseline)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+
+# Okna dla scenariuszy end-to-end
+E2E_WINDOWS = (1, 4, 7)
+
+# Okna dla scenariusza potwierdzeń kumulacyjnych (Sender.on_ack, 4 ACK na pełne okno)
+ACK_WINDOWS = (4, 4096, 32768)
+
+# Spadek wyniku (względem bazowego) uznawany za regresję.
+# Na współdzielonych maszynach rozrzut pomiarów bywa większy - wtedy warto podnieść --tolerance.
+DEFAULT_TOLERANCE = 0.20
+
+BENCH_SEED = 1234
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Wycisza wypisywanie logów symulacji (wizualizacja kanału, komunikaty Nadajnika)."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _best_time(func, repeats):
+    """
+    Zwraca najkrótszy czas wykonania `func` z `repeats` prób (sekundy).
+    Liczony jest czas zegarowy time.perf_counter - time.process_time ma w Windows rozdzielczość
+    ok. 15.6 ms, więc przy małej skali dawał 0. Wywłaszczenia przez inne procesy tłumi wybór
+    najlepszej próby. Wynik jest co najmniej równy rozdzielczości zegara (dzielnik przepustowości).
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return max(best, time.get_clock_info('perf_counter').resolution)
+
+
+# --- Scenariusze ---
+# Każdy scenariusz przyjmuje mnożnik skali i zwraca (wartość, jednostka).
+
+def bench_to_bytes(scale, repeats):
+    frame = Frame('DATA', 5, "Pakiet_12345")
+    iterations = int(100000 * scale)
+
+    def loop():
+        to_bytes = frame.to_bytes
+        for _ in range(iterations):
+            to_bytes()
+
+    return iterations / _best_time(loop, repeats), 'frames/s'
+
+
+def bench_from_bytes(scale, repeats):
+    raw = Frame('DATA', 5, "Pakiet_12345").to_bytes()
+    iterations = int(100000 * scale)
+
+    def loop():
+        from_bytes = Frame.from_bytes
+        for _ in range(iterations):
+            from_bytes(raw)
+
+    return iterations / _best_time(loop, repeats), 'frames/s'
+
+
+def bench_propagate(scale, repeats):
+    channel = GilbertChannel(SimConfig(seed=BENCH_SEED))
+    raw = Frame('DATA', 5, "Pakiet_12345").to_bytes()
+    iterations = int(20000 * scale)
+
+    def loop():
+        channel.seed(BENCH_SEED)
+        propagate = channel.propagate
+        for _ in range(iterations):
+            propagate(raw)
+
+    return iterations * len(raw) * 8 / _best_time(loop, repeats), 'bits/s'
+
+
+def bench_propagate_bsc(scale, repeats):
+    channel = GilbertChannel(seed=BENCH_SEED)
+    raw = Frame('DATA', 5, "Pakiet_12345").to_bytes()
+    iterations = int(20000 * scale)
+
+    def loop():
+        channel.seed(BENCH_SEED)
+        propagate_bsc = channel.propagate_bsc
+        for _ in range(iterations):
+            propagate_bsc(raw, 0.001)
+
+    return iterations * len(raw) * 8 / _best_time(loop, repeats), 'bits/s'
+
+
+def bench_replay(scale, repeats):
+    trace_path = cached_trace(SimConfig(seed=BENCH_SEED), nbits=1 << 20)
+    raw = Frame('DATA', 5, "Pakiet_12345").to_bytes()
+    iterations = int(20000 * scale)
+
+    with ReplayChannel(trace_path) as channel:
+        def loop():
+            channel.seed(BENCH_SEED)
+            propagate = channel.propagate
+            for _ in range(iterations):
+                propagate(raw)
+
+        return iterations * len(raw) * 8 / _best_time(loop, repeats), 'bits/s'
+
+
+def _on_ack(window_size):
+    def bench(scale, repeats):
+        rounds = max(1, int(400000 * scale) // window_size)
+        return max(ack_cycle(window_size, min(4, window_size), rounds, Sender.on_ack) for _ in range(repeats)), 'frames/s'
+
+    return bench
+
+
+def _e2e(window_size):
+    def bench(scale, repeats):
+        packets = max(1, int(1000 * scale))
+        sim_config = SimConfig.from_module(window_size=window_size, target_packets=packets, seed=BENCH_SEED)
+        with _quiet():
+            elapsed = _best_time(lambda: main.run_go_back_n_simulation(sim_config=sim_config, events=NULL_SINK),
+                                 repeats)
+        return packets / elapsed, 'packets/s'
+
+    return bench
+
+
+SCENARIOS = {
+    'frame_to_bytes': bench_to_bytes,
+    'frame_from_bytes': bench_from_bytes,
+    'channel_propagate': bench_propagate,
+    'channel_propagate_bsc': bench_propagate_bsc,
+    'channel_replay': bench_replay,
+}
+for _window in ACK_WINDOWS:
+    SCENARIOS[f'sender_on_ack_w{_window}'] = _on_ack(_window)
+for _window in E2E_WINDOWS:
+    SCENARIOS[f'e2e_gbn_w{_window}'] = _e2e(_window)
+
+
+def run_benchmarks(names=None, scale=1.0, repeats=5):
+    """
+    Uruchamia wybrane scenariusze (domyślnie wszystkie).
+
+    Args:
+        names (list): Nazwy scenariuszy z SCENARIOS.
+        scale (float): Mnożnik liczby iteracji (np. 0.1 dla szybkiego przebiegu).
+        repeats (int): Liczba powtórzeń - raportowany jest najlepszy wynik.
+
+    Returns:
+        dict: {'meta': {...}, 'results': {nazwa: {'value': liczba, 'unit': jednostka}}}.
+    """
+    if names is None:
+        names = list(SCENARIOS)
+    results = {}
+    for name in names:
+        if name not in SCENARIOS:
+            raise ValueError(f"Nieznany scenariusz: {name}")
+        value, unit = SCENARIOS[name](scale, repeats)
+        results[name] = {'value': value, 'unit': unit}
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': scale,
+            'repeats': repeats,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Porównuje wyniki z wynikiem bazowym.
+
+    Returns:
+        list: Krotki (nazwa, wartość bazowa lub None, wartość bieżąca, stosunek, czy regresja).
+    """
+    rows = []
+    for name, entry in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            rows.append((name, None, entry['value'], None, False))
+            continue
+        ratio = entry['value'] / base['value']
+        rows.append((name, base['value'], entry['value'], ratio, ratio < 1.0 - tolerance))
+    return rows
+
+
+def save_json(data, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def load_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarki potoku ARQ (kodek, kanał, symulacja end-to-end)")
+    parser.add_argument('--only', nargs='+', choices=list(SCENARIOS), default=None)
+    parser.add_argument('--scale', type=float, default=1.0, help="Mnożnik liczby iteracji")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default=None, help="Plik JSON z wynikami bieżącego przebiegu")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help="Zapisuje wyniki jako nowy wynik bazowy")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.only, scale=args.scale, repeats=args.repeats)
+    if args.output:
+        save_json(report, args.output)
+
+    baseline = load_json(args.baseline) if os.path.exists(args.baseline) else {}
+    rows = compare(report, baseline, args.tolerance)
+
+    print(f"{'scenariusz':<24} {'bazowy':>14} {'bieżący':>14} {'zmiana':>8}")
+    for name, base, value, ratio, regression in rows:
+        unit = report['results'][name]['unit']
+        if ratio is None:
+            print(f"{name:<24} {'-':>14} {value:>14,.0f} {'':>8} {unit}")
+            continue
+        color = Colors.RED if regression else Colors.RESET
+        print(f"{color}{name:<24} {base:>14,.0f} {value:>14,.0f} {ratio:>7.2f}x {unit}{Colors.RESET}")
+
+    if args.update_baseline:
+        save_json(report, args.baseline)
+        print(f"{Colors.GRAY}Zapisano wynik bazowy: {args.baseline}{Colors.RESET}")
+    elif any(row[4] for row in rows):
+        print(f"{Colors.RED}Wykryto regresję (spadek o więcej niż {args.tolerance:.0%}).{Colors.RESET}")
+        sys.exit(1)
@@ -1,117 +1,378 @@
 # channel.py
+import math
 import random
-import time
 import config
 from colors import Colors
+from events import sink_or_null, CHANNEL_ERRORS, BURST_START, BURST_END
 
+# Kanał BSC w trybie seryjnym: od tego prawdopodobieństwa maska jest składana
+# z operacji bitowych na słowach losowych zamiast z odstępów między błędami
+BSC_DENSE_THRESHOLD = 1 / 64
 
-class GilbertChannel:
-    def __init__(self):
-        self.state = 'G'
+# Liczba cyfr binarnych prawdopodobieństwa błędu w trybie bitowym
+BSC_PRECISION = 32
 
-    def propagate(self, data_bytes: bytearray) -> bytearray:
+
+class ChannelTrace:
+    """
+    Zapis przejścia jednej ramki przez kanał - wystarcza do odtworzenia wizualizacji.
+
+    Przechowywane są tylko dane wejściowe, maska przekłamań (bajty, None - brak błędów)
+    i przebiegi burzy jako lista przedziałów [(start, koniec)] (kodowanie długościami
+    przebiegów). Kolorowa wizualizacja bitowa jest budowana dopiero przy pierwszym
+    wywołaniu `render()` i zapamiętywana.
+
+    Attributes:
+        data (bytes): Ramka przed kanałem.
+        mask (bytes or None): Maska przekłamanych bitów (MSB -> LSB).
+        bursts (tuple): Przedziały bitów, w których kanał był w stanie B.
+        errors (int): Liczba przekłamanych bitów.
+    """
+
+    __slots__ = ('data', 'mask', 'bursts', 'errors', '_rendered')
+
+    def __init__(self, data, mask, bursts, errors):
+        self.data = bytes(data)
+        self.mask = bytes(mask) if mask is not None else None
+        self.bursts = tuple(bursts)
+        self.errors = errors
+        self._rendered = None
+
+    def output(self):
+        """Zwraca ramkę po przejściu przez kanał (dane XOR maska)."""
+        if self.mask is None:
+            return bytearray(self.data)
+        return GilbertChannel._apply_mask(self.data, self.mask)
+
+    def burst_mask(self):
+        """Zwraca maskę stanu burzy (bit ustawiony = kanał w stanie B) o długości ramki."""
+        nbits = len(self.data) * 8
+        value = 0
+        for start, end in self.bursts:
+            value |= ((1 << (end - start)) - 1) << (nbits - end)
+        return value.to_bytes(len(self.data), 'big')
+
+    def render(self):
         """
-        Symuluje kanał z wizualizacją bitową.
-        Pokazuje dokładnie, które bity zostały zmienione (na czerwono)
-        i gdzie trwała burza (na fioletowo).
+        Buduje (raz) wizualizację bitową: wejście i wyjście z kolorami ANSI.
+        Przekłamane bity są czerwone, bity wewnątrz wiązki fioletowe.
+
+        Returns:
+            tuple: (napis wejścia, napis wyjścia).
         """
-        if data_bytes is None:
-            return None
+        if self._rendered is None:
+            self._rendered = self._build()
+        return self._rendered
 
-        # Symulacja opóźnienia
-        time.sleep(random.uniform(0.001, 0.005))
-
-        corrupted_data = bytearray(data_bytes)
-        bit_errors_count = 0
-
-        # Bufory do budowania wizualizacji (stringi)
-        visual_input_str = ""
-        visual_output_str = ""
-
-        # Iteracja po bajtach
-        for i in range(len(corrupted_data)):
-            byte_val = corrupted_data[i]
-            new_byte_val = 0
-
-            # Dodajemy spację co bajt dla czytelności
-            if i > 0:
-                visual_input_str += " "
-                visual_output_str += " "
-
-            # Iteracja po bitach (od 7 do 0, żeby zachować kolejność czytania)
-            # Uwaga: bit_pos 0 to najmłodszy bit. Żeby wypisać ładnie "1000...",
-            # musimy iterować albo wyświetlać w odpowiedniej kolejności.
-            # Standardowo format(b, '08b') wyświetla od MSB do LSB.
-            # Zróbmy pętlę range(8) i składajmy, ale wizualizację budujmy ostrożnie.
-
-            # Żeby wizualizacja pasowała do binary stringa, musimy iterować od 7 w dół do 0
-            # (Big Endian display)
-            for bit_index in range(7, -1, -1):
-                bit_pos = bit_index
-                original_bit = (byte_val >> bit_pos) & 1
-                current_bit = original_bit
-
-                # --- LOGIKA GILBERTA ---
-                if self.state == 'G':
-                    if random.random() < config.GILBERT_P:
-                        self.state = 'B'
-                else:  # self.state == 'B'
-                    if random.random() < config.GILBERT_R:
-                        self.state = 'G'
-
-                # --- DECYZJA O BŁĘDZIE ---
-                error_prob = config.GILBERT_K if self.state == 'G' else config.GILBERT_H
-                is_flipped = False
-
-                if random.random() < error_prob:
-                    current_bit = current_bit ^ 1
-                    is_flipped = True
-                    bit_errors_count += 1
-
-                # Zapisz bit do nowego bajtu
-                new_byte_val |= (current_bit << bit_pos)
-
-                # --- BUDOWANIE WIZUALIZACJI ---
-                visual_input_str += str(original_bit)
-
-                if is_flipped:
+    def _build(self):
+        data = self.data
+        mask = self.mask if self.mask is not None else bytes(len(data))
+        burst_mask = self.burst_mask()
+
+        input_bytes = []
+        output_bytes = []
+        for i, byte_val in enumerate(data):
+            output_bits = format(byte_val ^ mask[i], '08b')
+            out = []
+            for j in range(8):
+                bit = output_bits[j]
+                if (mask[i] >> (7 - j)) & 1:
                     # Błąd (Czerwony)
-                    visual_output_str += f"{Colors.RED}{current_bit}{Colors.RESET}"
-                elif self.state == 'B':
+                    out.append(f"{Colors.RED}{bit}{Colors.RESET}")
+                elif (burst_mask[i] >> (7 - j)) & 1:
                     # Wewnątrz wiązki, ale ocalał (Fioletowy)
-                    visual_output_str += f"{Colors.MAGENTA}{current_bit}{Colors.RESET}"
+                    out.append(f"{Colors.MAGENTA}{bit}{Colors.RESET}")
                 else:
                     # Czysto (Szary/Zwykły)
-                    visual_output_str += f"{Colors.GRAY}{current_bit}{Colors.RESET}"
+                    out.append(f"{Colors.GRAY}{bit}{Colors.RESET}")
+            input_bytes.append(format(byte_val, '08b'))
+            output_bytes.append("".join(out))
+        return " ".join(input_bytes), " ".join(output_bytes)
+
+
+class GilbertChannel:
+    """
+    Kanał z pamięcią w modelu Gilberta-Elliotta (stany G - dobry, B - burza).
 
-            corrupted_data[i] = new_byte_val
+    Zamiast losować stan i błąd osobno dla każdego bitu, silnik generuje długości
+    przebiegów stanów G/B z rozkładu geometrycznego (parametry GILBERT_P / GILBERT_R),
+    a wewnątrz każdego przebiegu losuje odstępy między przekłamanymi bitami
+    (również geometrycznie, z prawdopodobieństwem GILBERT_K lub GILBERT_H).
+    Wynikowa maska przekłamań jest nakładana na całą ramkę jednym XOR-em.
+    Parametry pochodzą z obiektu SimConfig przebiegu (lub z modułu config).
 
-        # WYPISYWANIE LOGÓW (Zawsze lub tylko przy błędach)
-        # Prowadzący chce widzieć wiązki, więc wypiszmy, jeśli wystąpił błąd LUB byliśmy w burzy.
-        # Ale najprościej: jeśli były błędy.
+    Rozkład błędów jest identyczny z modelem "bit po bicie" (brak pamięci
+    rozkładu geometrycznego), a liczba wywołań generatora zależy od liczby
+    zmian stanu i błędów, a nie od liczby bitów.
+
+    Attributes:
+        state (str): Bieżący stan kanału ('G' lub 'B'), przenoszony między ramkami.
+        rng (random.Random): Prywatny generator liczb losowych (powtarzalność przebiegów).
+        sim_config (SimConfig or None): Parametry kanału. Przy None kanał czyta bieżące
+                                        wartości GILBERT_* z modułu config przy każdym użyciu.
+        events: Odbiorca zdarzeń (events.py) - przekłamania ramek i granice burz.
+        traces (list or None): Zapisy ChannelTrace kolejnych ramek (tylko przy record=True),
+                               pozwalają odtworzyć wizualizację dowolnej ramki.
+        bit_uses (int): Liczba bitów przepuszczonych przez kanał (wszystkie metody propagate*).
+                        Każda transmisja powinna przejść przez kanał raz - licznik pozwala to
+                        sprawdzić, porównując go z bitami wysłanymi przez sterownik.
+    """
+
+    def __init__(self, sim_config=None, seed=None, events=None, record=False):
+        if seed is None and sim_config is not None:
+            seed = sim_config.seed
+        self.sim_config = sim_config
+        self.events = sink_or_null(events)
+        self.traces = [] if record else None
+        self.bit_uses = 0
+        self.state = 'G'
+        self.rng = random.Random(seed)
+        # Osobny generator dla opóźnień - ich losowanie nie zmienia sekwencji błędów
+        self.delay_rng = random.Random(seed)
+
+    def seed(self, seed):
+        """Ponownie inicjalizuje generator kanału (powtarzalne przebiegi) i wraca do stanu G."""
+        self.rng.seed(seed)
+        self.delay_rng.seed(seed)
+        self.state = 'G'
+
+    def _params(self):
+        """Zwraca parametry modelu (P, R, K, H) z konfiguracji przebiegu lub z modułu config."""
+        cfg = self.sim_config
+        if cfg is None:
+            return config.GILBERT_P, config.GILBERT_R, config.GILBERT_K, config.GILBERT_H
+        return cfg.gilbert_p, cfg.gilbert_r, cfg.gilbert_k, cfg.gilbert_h
+
+    def sample_delay(self):
+        """Losuje opóźnienie propagacji ramki w kanale (w sekundach czasu symulowanego)."""
+        cfg = self.sim_config
+        if cfg is None:
+            return self.delay_rng.uniform(config.MIN_DELAY, config.MAX_DELAY)
+        return self.delay_rng.uniform(cfg.min_delay, cfg.max_delay)
+
+    def _geometric(self, p, limit):
+        """
+        Losuje liczbę porażek przed pierwszym sukcesem w próbach Bernoulliego(p).
+        Wynik jest obcinany do `limit` (dla p = 0 sukces nigdy nie następuje).
+        """
+        if p <= 0.0:
+            return limit
+        if p >= 1.0:
+            return 0
+        value = math.log(1.0 - self.rng.random()) / math.log1p(-p)
+        return limit if value >= limit else int(value)
+
+    def _flip_positions(self, mask, start, end, error_prob, nbits):
+        """
+        Zaznacza w masce bity z przedziału [start, end) przekłamane z prawdopodobieństwem error_prob.
+        Maska (na `nbits` bitów) jest tworzona dopiero przy pierwszym błędzie - bez błędów nic nie jest alokowane.
+
+        Returns:
+            tuple: (maska lub None, liczba błędów)
+        """
+        errors = 0
+        span = end - start
+        pos = self._geometric(error_prob, span)
+        if pos < span and mask is None:
+            mask = bytearray((nbits + 7) >> 3)
+        while pos < span:
+            bit = start + pos
+            mask[bit >> 3] |= 0x80 >> (bit & 7)
+            errors += 1
+            pos += 1 + self._geometric(error_prob, span)
+        return mask, errors
+
+    def _gilbert_mask(self, nbits):
+        """
+        Generuje maskę przekłamań dla `nbits` kolejnych bitów (kolejność MSB -> LSB).
+
+        Returns:
+            tuple: (maska jako bytearray lub None przy braku błędów,
+                    lista przedziałów burzy [(start, koniec)], liczba błędów)
+        """
+        p, r, k, h = self._params()
+        mask = None
+        bursts = []
+        errors = 0
+        pos = 0
+        state = self.state
 
-        if bit_errors_count > 0:
-            print(f"   [WEJŚCIE]: {visual_input_str}")
-            print(f"   [WYJŚCIE]: {visual_output_str}")
-            print(
-                f"{Colors.RED}  [KANAŁ]: Zmieniono {bit_errors_count} bitów (Legenda: {Colors.RED}Błąd{Colors.RESET}, {Colors.MAGENTA}Wiązka{Colors.RESET}).{Colors.RESET}")
+        # Pierwszy przebieg jest "kontynuacją" stanu z poprzedniej ramki - dzięki
+        # braku pamięci rozkładu geometrycznego wystarczy wylosować jego resztę.
+        if state == 'G':
+            run = self._geometric(p, nbits)
+        else:
+            run = self._geometric(r, nbits)
 
+        while True:
+            end = min(pos + run, nbits)
+            if end > pos:
+                if state == 'G':
+                    mask, flipped = self._flip_positions(mask, pos, end, k, nbits)
+                else:
+                    mask, flipped = self._flip_positions(mask, pos, end, h, nbits)
+                    bursts.append((pos, end))
+                errors += flipped
+            pos = end
+            if pos >= nbits:
+                break
+
+            # Zmiana stanu - bit, na którym nastąpiło przejście, należy już do nowego stanu
+            if state == 'G':
+                state = 'B'
+                run = 1 + self._geometric(r, nbits)
+            else:
+                state = 'G'
+                run = 1 + self._geometric(p, nbits)
+
+        self.state = state
+        return mask, bursts, errors
+
+    @staticmethod
+    def _apply_mask(data_bytes, mask) -> bytearray:
+        """Nakłada maskę przekłamań na cały bufor jedną operacją XOR."""
+        size = len(data_bytes)
+        flipped = int.from_bytes(data_bytes, 'big') ^ int.from_bytes(mask, 'big')
+        return bytearray(flipped.to_bytes(size, 'big'))
+
+    def propagate(self, data_bytes: bytearray) -> bytearray:
+        """
+        Symuluje kanał dla jednej ramki.
+        Przy włączonym odbiorcy zdarzeń zgłasza granice burz oraz przekłamania
+        (z maską - konsola pokazuje błędne bity na czerwono, a burzę na fioletowo).
+        """
+        if data_bytes is None:
+            return None
+
+        events = self.events
+        state_before = self.state
+        self.bit_uses += len(data_bytes) * 8
+        mask, bursts, bit_errors_count = self._gilbert_mask(len(data_bytes) * 8)
+        if self.traces is not None:
+            self.traces.append(ChannelTrace(data_bytes, mask, bursts, bit_errors_count))
+        if events.enabled:
+            self._emit_bursts(state_before, bursts, len(data_bytes) * 8)
+        if bit_errors_count == 0:
+            return bytearray(data_bytes)
+
+        corrupted_data = self._apply_mask(data_bytes, mask)
+        if events.enabled:
+            events.emit(CHANNEL_ERRORS, bits=bit_errors_count, data=bytes(data_bytes), mask=bytes(mask), bursts=bursts)
         return corrupted_data
 
+    def _emit_bursts(self, state_before, bursts, nbits):
+        """Zgłasza początki i końce burz w ramce (burza kontynuowana z poprzedniej ramki nie ma początku)."""
+        events = self.events
+        for start, end in bursts:
+            if start > 0 or state_before == 'G':
+                events.emit(BURST_START, bit=start)
+            if end < nbits:
+                events.emit(BURST_END, bit=end)
+
+    def propagate_batch(self, frames) -> list:
+        """
+        Przepuszcza serię ramek przez kanał jednym przebiegiem (bez wizualizacji).
+
+        Ramki są traktowane jak kolejne bity na łączu - stan Gilberta przechodzi
+        z ramki na ramkę dokładnie tak, jak przy kolejnych wywołaniach `propagate`.
+        Maska jest losowana dla całej serii naraz i nakładana jednym XOR-em.
+
+        Returns:
+            list: Lista bytearray (po jednym na ramkę wejściową).
+        """
+        sizes = [len(f) for f in frames]
+        joined = b"".join(frames)
+        self.bit_uses += len(joined) * 8
+        mask, bursts, errors = self._gilbert_mask(len(joined) * 8)
+        out = self._apply_mask(joined, mask) if errors else bytearray(joined)
+        if self.traces is not None:
+            self._record_batch(joined, sizes, mask, bursts)
+
+        result = []
+        offset = 0
+        for size in sizes:
+            result.append(out[offset:offset + size])
+            offset += size
+        return result
+
+    def _record_batch(self, joined, sizes, mask, bursts):
+        """Dzieli maskę i przebiegi burzy serii na zapisy ChannelTrace pojedynczych ramek."""
+        offset = 0
+        for size in sizes:
+            lo, hi = offset * 8, (offset + size) * 8
+            frame_mask = mask[offset:offset + size] if mask is not None else None
+            if frame_mask is not None and not any(frame_mask):
+                frame_mask = None
+            frame_bursts = [(max(start, lo) - lo, min(end, hi) - lo) for start, end in bursts if start < hi and end > lo]
+            errors = int.from_bytes(frame_mask, 'big').bit_count() if frame_mask is not None else 0
+            self.traces.append(ChannelTrace(joined[offset:offset + size], frame_mask, frame_bursts, errors))
+            offset += size
+
     def propagate_bsc(self, data_bytes: bytearray, error_prob: float) -> bytearray:
-        """Wersja dla testów statystycznych (bez wizualizacji)"""
+        """Wersja dla testów statystycznych (bez wizualizacji) - kanał BSC bez pamięci."""
         if data_bytes is None: return None
-        corrupted = bytearray(data_bytes)
-        for i in range(len(corrupted)):
-            val = corrupted[i]
-            new_val = 0
-            for b in range(8):
-                bit = (val >> b) & 1
-                if random.random() < error_prob:
-                    bit ^= 1
-                new_val |= (bit << b)
-            corrupted[i] = new_val
-        return corrupted
+        self.bit_uses += len(data_bytes) * 8
+        mask, errors = self._flip_positions(None, 0, len(data_bytes) * 8, error_prob, len(data_bytes) * 8)
+        if errors == 0:
+            return bytearray(data_bytes)
+        return self._apply_mask(data_bytes, mask)
+
+    def _bernoulli_bits(self, nbits, error_prob):
+        """
+        Losuje maskę `nbits` niezależnych bitów Bernoulliego(error_prob) jako liczbę całkowitą.
+
+        Prawdopodobieństwo jest rozwijane binarnie (BSC_PRECISION bitów), a maska powstaje
+        z kolejnych słów losowych łączonych AND (cyfra 0) lub OR (cyfra 1) od najmłodszej cyfry.
+        Koszt zależy od precyzji, a nie od liczby błędów - opłaca się przy dużym error_prob.
+        """
+        scaled = round(error_prob * (1 << BSC_PRECISION))
+        if scaled <= 0:
+            return 0
+        if scaled >= 1 << BSC_PRECISION:
+            return (1 << nbits) - 1
+        getrandbits = self.rng.getrandbits
+        # Cyfry zerowe poniżej najmłodszej jedynki dałyby tylko AND z zerem - pomijamy je
+        digit = (scaled & -scaled).bit_length() - 1
+        value = getrandbits(nbits)
+        for digit in range(digit + 1, BSC_PRECISION):
+            if (scaled >> digit) & 1:
+                value |= getrandbits(nbits)
+            else:
+                value &= getrandbits(nbits)
+        return value
+
+    def propagate_bsc_batch(self, frames, error_prob: float) -> bytearray:
+        """
+        Przepuszcza serię ramek przez kanał BSC jednym przebiegiem (bez wizualizacji).
+
+        Przy małym error_prob maska powstaje z odstępów między błędami (jak w propagate_bsc),
+        a przy dużym - z operacji bitowych na słowach losowych dla całej serii naraz.
+
+        Returns:
+            bytearray: Sklejone ramki po przejściu przez kanał (w kolejności wejściowej).
+        """
+        joined = b"".join(frames)
+        nbits = len(joined) * 8
+        self.bit_uses += nbits
+        if error_prob < BSC_DENSE_THRESHOLD:
+            mask, errors = self._flip_positions(None, 0, nbits, error_prob, nbits)
+            return self._apply_mask(joined, mask) if errors else bytearray(joined)
+        flipped = int.from_bytes(joined, 'big') ^ self._bernoulli_bits(nbits, error_prob)
+        return bytearray(flipped.to_bytes(len(joined), 'big'))
+
+
+class PassThroughChannel:
+    """
+    Kanał bez zakłóceń - zwraca kopię danych.
+
+    Używany przez Nadajnik/Odbiornik, gdy zakłócenia nakłada osobny element
+    (np. zadanie kanału w async_runtime.py), aby ramka nie przeszła przez model Gilberta dwa razy.
+    """
+
+    def propagate(self, data_bytes):
+        if data_bytes is None:
+            return None
+        return bytearray(data_bytes)
 
 
 # Instancja globalna
@@ -119,4 +380,4 @@ global_channel = GilbertChannel()
 
 
 def channel_simulate(data_bytes):
-    return global_channel.propagate(data_bytes)
\ No newline at end of file
+    return global_channel.propagate(data_bytes)
@@ -0,0 +1,132 @@
+"""
+Moduł wymiennych sum kontrolnych ramek.
+
+Każda suma kontrolna ma implementację tablicową (tablica 256 wpisów liczona raz przy
+imporcie, przetwarzanie bajt po bajcie). CRC-32 i Adler-32 liczone są w praktyce przez
+zlib (ta sama tablica w C) - wersja tablicowa służy do weryfikacji.
+
+Szerokość sumy określa narzut ramki: [suma (1-4 B)][nagłówek (4 B)][dane].
+Słabsza suma to mniej bitów narzutu (lepsze goodput), ale większa szansa na błąd niewykryty.
+
+Dostępne sumy (CHECKSUMS):
+    crc8 - CRC-8 (wielomian 0x07), 1 B,
+    crc16 - CRC-16-CCITT (0x1021, start 0xFFFF), 2 B,
+    crc32 - CRC-32 (IEEE 802.3, zlib), 4 B - domyślna,
+    crc32c - CRC-32C (Castagnoli, 0x1EDC6F41), 4 B,
+    adler32 - Adler-32 (zlib), 4 B.
+"""
+
+# checksum.py
+import struct
+import zlib
+
+import config
+
+
+def _crc_table(width, poly, reflected):
+    """Buduje tablicę 256 wartości CRC dla pojedynczych bajtów."""
+    top = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = []
+    for byte in range(256):
+        if reflected:
+            # Wielomian odwrócony bitowo, przetwarzanie od najmłodszego bitu
+            rpoly = int(format(poly, f'0{width}b')[::-1], 2)
+            crc = byte
+            for _ in range(8):
+                crc = (crc >> 1) ^ rpoly if crc & 1 else crc >> 1
+        else:
+            crc = byte << (width - 8)
+            for _ in range(8):
+                crc = ((crc << 1) ^ poly) & mask if crc & top else (crc << 1) & mask
+        table.append(crc)
+    return tuple(table)
+
+
+class TableCrc:
+    """
+    CRC liczone tablicowo (parametry jak w katalogu "Rocksoft": width, poly, init, refin/refout, xorout).
+
+    Attributes:
+        name (str): Nazwa sumy.
+        size (int): Szerokość w bajtach (narzut w ramce).
+        table (tuple): Tablica 256 wartości dla bajtów.
+    """
+
+    __slots__ = ('name', 'size', 'width', 'init', 'xorout', 'reflected', 'table', 'struct')
+
+    def __init__(self, name, width, poly, init, xorout, reflected):
+        self.name = name
+        self.width = width
+        self.size = width // 8
+        self.init = init
+        self.xorout = xorout
+        self.reflected = reflected
+        self.table = _crc_table(width, poly, reflected)
+        self.struct = struct.Struct('!' + {1: 'B', 2: 'H', 4: 'I'}[self.size])
+
+    def compute(self, data) -> int:
+        """Liczy sumę kontrolną bufora (bytes, bytearray lub memoryview)."""
+        table = self.table
+        crc = self.init
+        if self.reflected:
+            for byte in data:
+                crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+        elif self.width == 8:
+            for byte in data:
+                crc = table[crc ^ byte]
+        else:
+            shift = self.width - 8
+            mask = (1 << self.width) - 1
+            for byte in data:
+                crc = table[((crc >> shift) ^ byte) & 0xFF] ^ ((crc << 8) & mask)
+        return crc ^ self.xorout
+
+    def __repr__(self):
+        return f"<suma kontrolna {self.name}>"
+
+
+class ZlibChecksum:
+    """
+    Suma kontrolna liczona przez zlib (CRC-32 lub Adler-32) - ten sam interfejs co TableCrc.
+    Dla CRC-32 dostępna jest również wersja tablicowa (`reference`) do weryfikacji.
+    """
+
+    __slots__ = ('name', 'size', 'compute', 'reference', 'struct')
+
+    def __init__(self, name, function, reference=None):
+        self.name = name
+        self.size = 4
+        self.compute = function
+        self.reference = reference
+        self.struct = struct.Struct('!I')
+
+    def __repr__(self):
+        return f"<suma kontrolna {self.name}>"
+
+
+CRC8 = TableCrc('crc8', 8, 0x07, init=0x00, xorout=0x00, reflected=False)
+CRC16 = TableCrc('crc16', 16, 0x1021, init=0xFFFF, xorout=0x0000, reflected=False)
+CRC32C = TableCrc('crc32c', 32, 0x1EDC6F41, init=0xFFFFFFFF, xorout=0xFFFFFFFF, reflected=True)
+CRC32 = ZlibChecksum('crc32', zlib.crc32,
+                     reference=TableCrc('crc32', 32, 0x04C11DB7, init=0xFFFFFFFF, xorout=0xFFFFFFFF, reflected=True))
+ADLER32 = ZlibChecksum('adler32', zlib.adler32)
+
+CHECKSUMS = {c.name: c for c in (CRC8, CRC16, CRC32, CRC32C, ADLER32)}
+
+
+def get_checksum(checksum=None):
+    """
+    Zwraca obiekt sumy kontrolnej.
+
+    Args:
+        checksum: Nazwa z CHECKSUMS, gotowy obiekt lub None (CHECKSUM z modułu config).
+    """
+    if checksum is None:
+        checksum = config.CHECKSUM
+    if isinstance(checksum, str):
+        try:
+            return CHECKSUMS[checksum]
+        except KeyError:
+            raise ValueError(f"Nieznana suma kontrolna: {checksum!r} (dostępne: {', '.join(CHECKSUMS)})") from None
+    return checksum
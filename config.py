@@ -1,4 +1,5 @@
 # config.py
+from dataclasses import dataclass, fields, replace as _replace
 
 # --- Konfiguracja Modelu Gilberta-Elliotta ---
 
@@ -18,8 +19,156 @@ GILBERT_K = 0.0001
 GILBERT_H = 0.50
 
 # --- Reszta ---
+# Tryb protokołu ARQ: 'GBN' (Go-Back-N) lub 'SR' (Selective Repeat)
+ARQ_MODE = 'GBN'
 TIMEOUT = 1.0
+
+# Adaptacyjny TIMEOUT (estymacja RTT Jacobsona/Karna w Nadajniku). TIMEOUT jest wtedy
+# wartością początkową, a wyliczony czas jest obcinany do [MIN_TIMEOUT, MAX_TIMEOUT].
+ADAPTIVE_TIMEOUT = False
+MIN_TIMEOUT = 0.01
+MAX_TIMEOUT = 10.0
+
+# Szybka retransmisja Go-Back-N: liczba kolejnych zduplikowanych ACK dla Base, po której
+# Nadajnik powtarza okno bez czekania na TIMEOUT (0 - wyłączona).
+DUP_ACK_THRESHOLD = 0
+# Opóźnione potwierdzenie (sekundy): stacja pełnodupleksowa (duplex.py) czeka tyle na własną
+# ramkę danych, w której nagłówku może przenieść ACK, zanim wyśle osobną ramkę ACK.
+ACK_DELAY = 0.005
+
+# Polityka potwierdzeń Odbiornika Go-Back-N:
+#   'each' - ACK po każdej ramce (zachowanie klasyczne),
+#   'every_k' - ACK po każdych ACK_EVERY ramkach przyjętych w kolejności (reszta najpóźniej po ACK_DELAY),
+#   'timer' - jedno ACK najpóźniej ACK_DELAY po pierwszej niepotwierdzonej ramce.
+# Zduplikowane ACK (po ramce uszkodzonej lub poza kolejnością) są wysyłane od razu.
+ACK_POLICY = 'each'
+ACK_EVERY = 2
+# Limit powtórzeń tego samego zduplikowanego ACK (dla jednej wartości expected_seq_num);
+# kolejne są pomijane (0 - bez limitu).
+DUP_ACK_LIMIT = 0
 WINDOW_SIZE = 4
+# Liczba bitów numeru sekwencyjnego (1-32). Powyżej 8 bitów nagłówek ramki ma szersze
+# pole SN (2 lub 4 bajty), co pozwala modelować okna rzędu dziesiątek tysięcy ramek.
 SEQ_BITS = 3
 MAX_SEQ = 2 ** SEQ_BITS
-TARGET_PACKETS = 30
\ No newline at end of file
+TARGET_PACKETS = 30
+
+# Suma kontrolna ramek (checksum.py): 'crc8', 'crc16', 'crc32', 'crc32c' lub 'adler32'
+CHECKSUM = 'crc32'
+
+# --- Czas symulowany ---
+# Przepływność łącza w bitach na sekundę (czas serializacji ramki = bity / BIT_RATE).
+BIT_RATE = 1_000_000
+
+# Opóźnienie propagacji w kanale (losowane równomiernie z przedziału, w sekundach).
+MIN_DELAY = 0.001
+MAX_DELAY = 0.005
+
+
+# Dostępne polityki potwierdzeń (ACK_POLICY)
+ACK_POLICIES = ('each', 'every_k', 'timer')
+
+# --- Konfiguracja pojedynczej symulacji ---
+# Zmienne powyżej są wartościami domyślnymi. Każdy przebieg dostaje własny,
+# niezmienny obiekt SimConfig, więc kilka symulacji może działać równolegle
+# (wątki, asyncio, procesy), a ich wyniki można zapamiętywać według konfiguracji.
+
+@dataclass(frozen=True)
+class SimConfig:
+    """
+    Niezmienny (i haszowalny) zestaw parametrów jednej symulacji.
+
+    Attributes:
+        gilbert_p (float): Szansa wejścia w burzę (na bit).
+        gilbert_r (float): Szansa wyjścia z burzy (na bit).
+        gilbert_k (float): Prawdopodobieństwo przekłamania bitu w stanie G.
+        gilbert_h (float): Prawdopodobieństwo przekłamania bitu w stanie B.
+        timeout (float): Czas oczekiwania na ACK przed retransmisją (sekundy).
+        window_size (int): Rozmiar okna nadawczego.
+        seq_bits (int): Liczba bitów numeru sekwencyjnego.
+        target_packets (int): Liczba pakietów do dostarczenia.
+        bit_rate (float): Przepływność łącza (bity na sekundę).
+        min_delay (float): Minimalne opóźnienie propagacji (sekundy).
+        max_delay (float): Maksymalne opóźnienie propagacji (sekundy).
+        seed (int or None): Ziarno generatora kanału (None - przebieg niepowtarzalny).
+        arq_mode (str): Tryb protokołu - 'GBN' (Go-Back-N) lub 'SR' (Selective Repeat).
+        checksum (str): Suma kontrolna ramek (nazwa z checksum.CHECKSUMS).
+        adaptive_timeout (bool): TIMEOUT wyliczany z pomiarów RTT (timeout - wartość początkowa).
+        min_timeout (float): Dolne ograniczenie adaptacyjnego TIMEOUT (sekundy).
+        max_timeout (float): Górne ograniczenie adaptacyjnego TIMEOUT, także po podwajaniu (sekundy).
+        dup_ack_threshold (int): Próg zduplikowanych ACK dla szybkiej retransmisji GBN (0 - wyłączona).
+        ack_delay (float): Maksymalne opóźnienie potwierdzenia w oczekiwaniu na ramkę danych (sekundy).
+        ack_policy (str): Polityka potwierdzeń Odbiornika GBN - 'each', 'every_k' lub 'timer'.
+        ack_every (int): Co ile ramek przyjętych w kolejności wysyłane jest ACK (polityka 'every_k').
+        dup_ack_limit (int): Limit powtórzeń tego samego zduplikowanego ACK (0 - bez limitu).
+    """
+    gilbert_p: float = GILBERT_P
+    gilbert_r: float = GILBERT_R
+    gilbert_k: float = GILBERT_K
+    gilbert_h: float = GILBERT_H
+    timeout: float = TIMEOUT
+    window_size: int = WINDOW_SIZE
+    seq_bits: int = SEQ_BITS
+    target_packets: int = TARGET_PACKETS
+    bit_rate: float = BIT_RATE
+    min_delay: float = MIN_DELAY
+    max_delay: float = MAX_DELAY
+    seed: int = None
+    arq_mode: str = ARQ_MODE
+    checksum: str = CHECKSUM
+    adaptive_timeout: bool = ADAPTIVE_TIMEOUT
+    min_timeout: float = MIN_TIMEOUT
+    max_timeout: float = MAX_TIMEOUT
+    dup_ack_threshold: int = DUP_ACK_THRESHOLD
+    ack_delay: float = ACK_DELAY
+    ack_policy: str = ACK_POLICY
+    ack_every: int = ACK_EVERY
+    dup_ack_limit: int = DUP_ACK_LIMIT
+
+    def __post_init__(self):
+        for name in ('gilbert_p', 'gilbert_r', 'gilbert_k', 'gilbert_h'):
+            value = getattr(self, name)
+            if not 0.0 <= value <= 1.0:
+                raise ValueError(f"{name}={value} musi należeć do przedziału [0, 1]")
+        if not 1 <= self.seq_bits <= 32:
+            raise ValueError(f"seq_bits={self.seq_bits} musi należeć do [1, 32] (pole SN ma co najwyżej 4 bajty)")
+        if not 1 <= self.window_size < self.max_seq:
+            raise ValueError(f"window_size={self.window_size} musi należeć do [1, {self.max_seq - 1}]")
+        if not 0.0 < self.min_timeout <= self.max_timeout:
+            raise ValueError(f"Wymagane 0 < min_timeout <= max_timeout (podano {self.min_timeout}, {self.max_timeout})")
+        if self.dup_ack_threshold < 0:
+            raise ValueError(f"dup_ack_threshold={self.dup_ack_threshold} nie może być ujemny")
+        if self.ack_delay < 0:
+            raise ValueError(f"ack_delay={self.ack_delay} nie może być ujemne")
+        if self.ack_policy not in ACK_POLICIES:
+            raise ValueError(f"ack_policy={self.ack_policy!r} musi być jedną z: {', '.join(ACK_POLICIES)}")
+        if self.ack_every < 1:
+            raise ValueError(f"ack_every={self.ack_every} musi być dodatnie")
+        if self.dup_ack_limit < 0:
+            raise ValueError(f"dup_ack_limit={self.dup_ack_limit} nie może być ujemny")
+        if self.arq_mode not in ('GBN', 'SR'):
+            raise ValueError(f"arq_mode={self.arq_mode!r} musi być 'GBN' lub 'SR'")
+        # Import lokalny - checksum.py importuje config (CHECKSUM jako wartość domyślna)
+        from checksum import CHECKSUMS
+        if self.checksum not in CHECKSUMS:
+            raise ValueError(f"checksum={self.checksum!r} musi być jedną z: {', '.join(CHECKSUMS)}")
+        if self.arq_mode == 'SR' and self.window_size > self.max_seq // 2:
+            raise ValueError(f"W trybie SR window_size={self.window_size} nie może przekraczać "
+                             f"max_seq / 2 = {self.max_seq // 2}")
+
+    @property
+    def max_seq(self):
+        """Zakres numeracji sekwencyjnej (2 ** seq_bits)."""
+        return 2 ** self.seq_bits
+
+    def replace(self, **changes):
+        """Zwraca kopię konfiguracji ze zmienionymi polami."""
+        return _replace(self, **changes)
+
+    @classmethod
+    def from_module(cls, **changes):
+        """Tworzy konfigurację z bieżących wartości zmiennych modułu config (z opcjonalnymi zmianami)."""
+        module = globals()
+        values = {f.name: module[f.name.upper()] for f in fields(cls) if f.name.upper() in module}
+        values.update(changes)
+        return cls(**values)
@@ -0,0 +1,360 @@
+"""
+Moduł transmisji dwukierunkowej Go-Back-N z potwierdzeniami doklejanymi do danych (piggybacking).
+
+Stacja pełnodupleksowa (DuplexEndpoint) łączy role Nadajnika i Odbiornika jednej strony
+łącza. Każda wysyłana przez nią ramka danych ma typ DATA_ACK i niesie w nagłówku bieżące
+potwierdzenie kumulacyjne dla przeciwnego kierunku. Osobna ramka ACK jest wysyłana tylko
+wtedy, gdy przez ACK_DELAY od odebrania danych stacja nie miała własnej ramki, w której
+mogłaby potwierdzenie przenieść (timer opóźnionego ACK) - jedno takie ACK obejmuje wtedy
+wszystkie ramki odebrane w tym czasie. Przy symetrycznym ruchu ubywa w ten sposób większości
+osobnych ramek ACK, a z nimi serializacji, sum kontrolnych i przejść przez kanał.
+"""
+
+# duplex.py
+import time
+from channel import GilbertChannel
+from config import SimConfig
+from frame import Frame, ACK, DATA_ACK
+from sender import Sender
+from receiver import Receiver
+from simulation import _Link
+from events import sink_or_null, RETRANSMIT
+from scheduler import EventScheduler, FRAME_ARRIVAL, TIMER_EXPIRY, ACK_TIMER
+
+
+class PiggybackSender(Sender):
+    """
+    Nadajnik GBN, którego ramki danych niosą potwierdzenie dla przeciwnego kierunku.
+
+    Numer ACK jest pobierany przy każdej transmisji (także retransmisji), więc ramka zawsze
+    niesie aktualne potwierdzenie. Zapamiętane bajty ramki są używane ponownie tylko wtedy,
+    gdy numer ACK się nie zmienił od poprzedniej serializacji.
+
+    Attributes:
+        ack_source (callable): Zwraca bieżący numer ACK (następna oczekiwana ramka Odbiornika stacji).
+        station (str): ID tej stacji (nadawca ramek).
+        peer (str): ID stacji przeciwnej (odbiorca ramek).
+    """
+
+    def __init__(self, ack_source, station="A", peer="B", **kwargs):
+        super().__init__(**kwargs)
+        self.ack_source = ack_source
+        self.station = station
+        self.peer = peer
+
+    def encoded(self, frame):
+        ack_num = self.ack_source()
+        if frame.ack_num != ack_num:
+            frame.type_code = DATA_ACK
+            frame.ack_num = ack_num
+            frame.sender = self.station
+            frame.receiver = self.peer
+            slot = frame.seq_num % self.buffer.capacity
+            if self.buffer.frames[slot] is frame:
+                self.buffer.wire[slot] = None
+        return super().encoded(frame)
+
+
+class DuplexEndpoint:
+    """
+    Stacja pełnodupleksowa Go-Back-N (Nadajnik i Odbiornik jednej strony łącza).
+
+    Attributes:
+        name (str): ID stacji ('A' lub 'B').
+        peer (str): ID stacji przeciwnej.
+        sender (PiggybackSender): Nadajnik stacji (dane z doklejonym ACK).
+        receiver (Receiver): Odbiornik stacji (potwierdza z opóźnieniem, a nie po każdej ramce).
+        outgoing (list): Dane do wysłania do stacji przeciwnej.
+        sent (int): Liczba danych z `outgoing` przekazanych Nadajnikowi.
+        ack_delay (float): Maksymalne opóźnienie potwierdzenia (sekundy).
+        ack_pending (bool): Odebrano dane, których potwierdzenie nie zostało jeszcze wysłane.
+        ack_due (float or None): Termin osobnego ACK (None - brak zaległego potwierdzenia).
+        piggybacked_acks (int): Zaległe potwierdzenia przeniesione w ramkach danych (kilka ramek
+                                odebranych przed wysłaniem danych to jedno potwierdzenie).
+        standalone_acks (int): Osobne ramki ACK wysłane po upływie `ack_delay`.
+    """
+
+    def __init__(self, name, peer, outgoing, clock, sim_config, channel, events=None):
+        self.name = name
+        self.peer = peer
+        self.receiver = Receiver(sender_id=name, receiver_id=peer, sim_config=sim_config, channel=channel,
+                                 events=events, clock=clock)
+        self.sender = PiggybackSender(self._ack_number, name, peer, clock=clock, sim_config=sim_config,
+                                      channel=channel, events=events)
+        self.outgoing = outgoing
+        self.sent = 0
+        self.ack_delay = sim_config.ack_delay
+        self.ack_pending = False
+        self.ack_due = None
+        self.piggybacked_acks = 0
+        self.standalone_acks = 0
+
+    def _ack_number(self):
+        return self.receiver.expected_seq_num
+
+    def on_frame(self, raw_bytes, now):
+        """
+        Obsługuje ramkę od stacji przeciwnej.
+
+        Osobne ACK trafia do Nadajnika (także jako zduplikowane ACK dla szybkiej retransmisji).
+        Z ramki DATA_ACK Nadajnik dostaje doklejony ACK tylko wtedy, gdy przesuwa on okno -
+        każda ramka danych niesie ACK, więc jego powtórzenie nie jest sygnałem utraty.
+        Dane (oraz ramki uszkodzone) przechodzą przez Odbiornik i uruchamiają timer opóźnionego ACK.
+        """
+        sender = self.sender
+        frame = sender.decode(raw_bytes)
+        if not frame.is_corrupt():
+            if frame.type_code == ACK:
+                sender.on_ack(frame.seq_num)
+                return
+            if frame.type_code == DATA_ACK and frame.ack_num != sender.base:
+                sender.on_ack(frame.ack_num)
+        self.receiver.accept(frame)
+        self.ack_pending = True
+        if self.ack_due is None:
+            self.ack_due = now + self.ack_delay
+
+    def ack_carried(self):
+        """Stacja wysłała ramkę danych - zaległe potwierdzenie pojechało w jej nagłówku."""
+        if self.ack_pending:
+            self.piggybacked_acks += 1
+            self.ack_pending = False
+            self.ack_due = None
+
+    def send_standalone_ack(self):
+        """Wysyła osobną ramkę ACK (timer opóźnionego ACK upłynął bez ramki danych)."""
+        self.ack_pending = False
+        self.ack_due = None
+        self.standalone_acks += 1
+        return self.receiver.send_ack('delayed')
+
+
+class DuplexSimulation:
+    """
+    Przebieg dwukierunkowy: stacje A i B jednocześnie wysyłają sobie dane przez wspólny kanał
+    (dwa łącza FIFO - A->B i B->A). Kończy się, gdy obie stacje odebrały wszystkie dane.
+
+    Args:
+        sim_config (SimConfig): Parametry (target_packets - liczba pakietów A->B, ack_delay).
+        reverse_packets (int or None): Liczba pakietów B->A (None - tyle samo co A->B).
+        events: Odbiorca zdarzeń.
+
+    Attributes:
+        endpoints (dict): Stacje według ID ('A', 'B').
+        stats (dict): Liczniki przebiegu.
+    """
+
+    def __init__(self, sim_config=None, reverse_packets=None, events=None):
+        if sim_config is None:
+            sim_config = SimConfig.from_module()
+        if sim_config.arq_mode != 'GBN':
+            raise ValueError("Transmisja dwukierunkowa obsługuje tylko tryb GBN")
+        if reverse_packets is None:
+            reverse_packets = sim_config.target_packets
+        self.sim_config = sim_config
+        self.events = events = sink_or_null(events)
+        self.channel = GilbertChannel(sim_config, events=events)
+        self.scheduler = EventScheduler()
+
+        packets = {'A': sim_config.target_packets, 'B': reverse_packets}
+        self.endpoints = {}
+        self.links = {}
+        for name, peer in (('A', 'B'), ('B', 'A')):
+            outgoing = [f"{name}{peer}_{i + 1}" for i in range(packets[name])]
+            self.endpoints[name] = DuplexEndpoint(name, peer, outgoing, self.scheduler.clock, sim_config,
+                                                  self.channel, events=events)
+            self.links[name] = _Link(self.channel, sim_config.bit_rate)
+        self._timer_armed_for = {'A': None, 'B': None}
+        self._ack_armed_for = {'A': None, 'B': None}
+
+        self.stats = {
+            'transmissions': 0,
+            'retransmissions': 0,
+            'timeouts': 0,
+            'fast_retransmits': 0,
+            'standalone_acks': 0,
+        }
+
+    # --- Wysyłanie ---
+
+    def _transmit(self, endpoint, raw_bytes_out):
+        """Planuje przybycie ramki (już po kanale) do stacji przeciwnej."""
+        _, arrival = self.links[endpoint.name].transmit(self.scheduler.now, len(raw_bytes_out))
+        self.scheduler.schedule_at(arrival, FRAME_ARRIVAL, (self.endpoints[endpoint.peer], raw_bytes_out))
+
+    def _send_data(self, endpoint, raw_bytes_out):
+        self._transmit(endpoint, raw_bytes_out)
+        self.stats['transmissions'] += 1
+        endpoint.ack_carried()
+
+    def _send_new_frames(self, endpoint):
+        sender = endpoint.sender
+        outgoing = endpoint.outgoing
+        while endpoint.sent < len(outgoing) and sender._is_within_window(sender.next_seq_num):
+            _, raw_bytes_out = sender.send_data(outgoing[endpoint.sent])
+            endpoint.sent += 1
+            self._send_data(endpoint, raw_bytes_out)
+
+    def _arm_timers(self, endpoint):
+        """Timer retransmisji (jak w GoBackNSimulation) i timer opóźnionego ACK stacji."""
+        sender = endpoint.sender
+        name = endpoint.name
+        if sender.base != sender.next_seq_num and sender.timer_start is None:
+            sender.start_timer()
+        if sender.base == sender.next_seq_num and endpoint.sent >= len(endpoint.outgoing):
+            sender.stop_timer()
+
+        deadline = sender.timer_deadline()
+        if deadline is not None and deadline != self._timer_armed_for[name]:
+            self._timer_armed_for[name] = deadline
+            self.scheduler.schedule_at(deadline, TIMER_EXPIRY, (endpoint, sender.timer_start))
+
+        if endpoint.ack_due is not None and endpoint.ack_due != self._ack_armed_for[name]:
+            self._ack_armed_for[name] = endpoint.ack_due
+            self.scheduler.schedule_at(endpoint.ack_due, ACK_TIMER, (endpoint, endpoint.ack_due))
+
+    # --- Obsługa zdarzeń ---
+
+    def _on_frame_arrival(self, endpoint, raw_bytes):
+        endpoint.on_frame(raw_bytes, self.scheduler.now)
+        if endpoint.sender.fast_retransmit_pending:
+            self.stats['fast_retransmits'] += 1
+            self._retransmit_window(endpoint, fast=True)
+
+    def _on_timer_expiry(self, endpoint, timer_start):
+        sender = endpoint.sender
+        if timer_start != sender.timer_start or not sender.is_timeout():
+            return
+        self.stats['timeouts'] += 1
+        self._retransmit_window(endpoint, fast=False)
+
+    def _on_ack_timer(self, endpoint, due):
+        # Zdarzenie nieaktualne - potwierdzenie pojechało w ramce danych
+        if endpoint.ack_due != due:
+            return
+        self._transmit(endpoint, endpoint.send_standalone_ack())
+        self.stats['standalone_acks'] += 1
+
+    def _retransmit_window(self, endpoint, fast):
+        """Go-Back-N: retransmituje niepotwierdzone ramki stacji (z aktualnym doklejonym ACK)."""
+        sender = endpoint.sender
+        sender.retransmission_started()
+        outstanding = sender.outstanding_frames()
+        if self.events.enabled:
+            self.events.emit(RETRANSMIT, seq=sender.base, frames=len(outstanding), selective=False, fast=fast)
+        for frame in outstanding:
+            self._send_data(endpoint, sender.send_frame(frame))
+            self.stats['retransmissions'] += 1
+        sender.stop_timer()
+        sender.start_timer()
+
+    def _done(self):
+        a, b = self.endpoints['A'], self.endpoints['B']
+        return (len(a.receiver.received_payload) >= len(b.outgoing)
+                and len(b.receiver.received_payload) >= len(a.outgoing))
+
+    def run(self):
+        """
+        Wykonuje przebieg do odebrania wszystkich danych przez obie stacje.
+
+        Returns:
+            dict: transmissions (ramki danych obu kierunków), standalone_acks, piggybacked_acks,
+                  frames (wszystkie ramki w kanale), frames_per_packet, efficiency, retransmissions,
+                  timeouts, fast_retransmits, sim_time, wall_time, bity łączy (data_bits dla
+                  ramek danych, ack_bits dla osobnych ACK) i channel_bits.
+        """
+        handlers = {
+            FRAME_ARRIVAL: self._on_frame_arrival,
+            TIMER_EXPIRY: self._on_timer_expiry,
+            ACK_TIMER: self._on_ack_timer,
+        }
+        scheduler = self.scheduler
+        wall_start = time.perf_counter()
+
+        for endpoint in self.endpoints.values():
+            self._send_new_frames(endpoint)
+            self._arm_timers(endpoint)
+
+        while not self._done() and len(scheduler):
+            kind, (endpoint, data) = scheduler.pop()
+            handlers[kind](endpoint, data)
+            self._send_new_frames(endpoint)
+            self._arm_timers(endpoint)
+
+        stats = self.stats
+        endpoints = self.endpoints.values()
+        packets = sum(len(endpoint.outgoing) for endpoint in endpoints)
+        transmissions = stats['transmissions']
+        stats['frames'] = transmissions + stats['standalone_acks']
+        stats['piggybacked_acks'] = sum(endpoint.piggybacked_acks for endpoint in endpoints)
+        stats['delivered'] = sum(len(endpoint.receiver.received_payload) for endpoint in endpoints)
+        stats['efficiency'] = packets / transmissions if transmissions else 0
+        stats['frames_per_packet'] = stats['frames'] / packets if packets else 0
+        stats['sim_time'] = scheduler.now
+        stats['wall_time'] = time.perf_counter() - wall_start
+        total_bits = sum(link.bits for link in self.links.values())
+        stats['ack_bits'] = stats['standalone_acks'] * 8 * self._ack_size()
+        stats['data_bits'] = total_bits - stats['ack_bits']
+        stats['channel_bits'] = self.channel.bit_uses
+        return stats
+
+    def _ack_size(self):
+        sender = self.endpoints['A'].sender
+        return len(Frame(ACK, 0).to_bytes(sender.checksum, sender.seq_bytes))
+
+
+def one_way_baseline(sim_config, reverse_packets=None):
+    """
+    Ten sam ruch jako dwie niezależne sesje jednokierunkowe (ACK na każdą ramkę danych).
+
+    Returns:
+        dict: transmissions, acks, frames, frames_per_packet - sumy dla obu kierunków.
+    """
+    from simulation import GoBackNSimulation
+
+    if reverse_packets is None:
+        reverse_packets = sim_config.target_packets
+    runs = [GoBackNSimulation(sim_config).run()]
+    if reverse_packets:
+        reverse_seed = None if sim_config.seed is None else sim_config.seed + 1
+        runs.append(GoBackNSimulation(sim_config.replace(target_packets=reverse_packets, seed=reverse_seed)).run())
+    transmissions = sum(run['transmissions'] for run in runs)
+    acks = sum(run['acks'] for run in runs)
+    packets = sim_config.target_packets + reverse_packets
+    return {
+        'transmissions': transmissions,
+        'acks': acks,
+        'frames': transmissions + acks,
+        'frames_per_packet': (transmissions + acks) / packets if packets else 0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    from colors import Colors
+
+    parser = argparse.ArgumentParser(description="Dwukierunkowy Go-Back-N z potwierdzeniami w ramkach danych")
+    parser.add_argument('--packets', type=int, default=1000, help="Liczba pakietów A->B")
+    parser.add_argument('--reverse', type=int, default=None, help="Liczba pakietów B->A (domyślnie jak A->B)")
+    parser.add_argument('--ack-delay', type=float, default=None, help="Opóźnienie ACK; domyślnie ACK_DELAY")
+    parser.add_argument('--window', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    changes = {'target_packets': args.packets, 'seed': args.seed}
+    if args.ack_delay is not None:
+        changes['ack_delay'] = args.ack_delay
+    if args.window is not None:
+        changes['window_size'] = args.window
+    cfg = SimConfig.from_module(**changes)
+
+    duplex = DuplexSimulation(cfg, reverse_packets=args.reverse).run()
+    baseline = one_way_baseline(cfg, reverse_packets=args.reverse)
+    print(f"{'':<22} {'DATA':>8} {'ACK':>8} {'ramki':>8} {'ramki/pakiet':>13}")
+    print(f"{'dwie sesje GBN':<22} {baseline['transmissions']:>8} {baseline['acks']:>8} "
+          f"{baseline['frames']:>8} {baseline['frames_per_packet']:>13.3f}")
+    print(f"{'duplex (piggybacking)':<22} {duplex['transmissions']:>8} {duplex['standalone_acks']:>8} "
+          f"{duplex['frames']:>8} {duplex['frames_per_packet']:>13.3f}")
+    print(f"{Colors.GRAY}ACK w ramkach danych: {duplex['piggybacked_acks']} | Osobne ACK: {duplex['standalone_acks']} | "
+          f"Ramek mniej o {1 - duplex['frames'] / baseline['frames']:.1%} | "
+          f"Czas symulowany: {duplex['sim_time']:.2f} s{Colors.RESET}")
@@ -0,0 +1,338 @@
+"""
+Moduł zapisu i odtwarzania przebiegów błędów kanału Gilberta-Elliotta.
+
+Przebieg błędów (maska przekłamanych bitów + przedziały stanu B) jest zapisywany
+raz do zwartego pliku binarnego, a potem odczytywany przez mmap - kolejne przebiegi
+symulacji (różne warianty protokołu, różne okna) widzą dokładnie te same błędy,
+a "losowanie" kanału sprowadza się do wycięcia fragmentu maski.
+
+Format pliku (little-endian):
+    nagłówek (64 B): magia b'ARQTRC01', liczba bitów (Q), liczba burz (Q),
+                     P, R, K, H (d), ziarno (q, -1 = brak),
+    maska przekłamań: ceil(bity / 8) B (MSB -> LSB), dopełniona zerami do wielokrotności 8 B,
+    początki burz: liczba_burz * Q,
+    końce burz: liczba_burz * Q.
+"""
+
+# error_trace.py
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from channel import GilbertChannel
+from config import SimConfig
+
+MAGIC = b'ARQTRC01'
+_HEADER = struct.Struct('<8sQQddddq')
+HEADER_SIZE = _HEADER.size
+
+# Domyślna długość przebiegu (10M bitów ~ 1.25 MB maski)
+DEFAULT_TRACE_BITS = 10_000_000
+
+# Długość fragmentu przy generowaniu (wielokrotność 8 - fragmenty kończą się na granicy bajtu)
+CHUNK_BITS = 1 << 20
+
+# Katalog zapamiętanych przebiegów (cached_trace)
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'arq_error_traces')
+
+
+def _padded(nbytes):
+    """Długość maski dopełniona do wielokrotności 8 B (tablice burz zaczynają się wyrównane)."""
+    return (nbytes + 7) & ~7
+
+
+class TraceWriter:
+    """
+    Zapisuje przebieg błędów do pliku porcjami (maska fragmentu + przedziały burz).
+
+    Plik jest tworzony pod nazwą tymczasową i podmieniany atomowo przy `close()`,
+    więc równoległe procesy nigdy nie odczytają niekompletnego przebiegu.
+
+    Attributes:
+        nbits (int): Liczba zapisanych dotąd bitów.
+    """
+
+    def __init__(self, path, sim_config=None):
+        if sim_config is None:
+            sim_config = SimConfig.from_module()
+        self.path = path
+        self.sim_config = sim_config
+        self.nbits = 0
+        self.starts = array('Q')
+        self.ends = array('Q')
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(bytes(HEADER_SIZE))
+
+    def append(self, mask, bursts, nbits):
+        """
+        Dopisuje fragment przebiegu.
+
+        Args:
+            mask (bytes or None): Maska przekłamań fragmentu (None - brak błędów).
+            bursts (list): Przedziały burzy [(start, koniec)] względem początku fragmentu.
+            nbits (int): Długość fragmentu w bitach (wielokrotność 8).
+        """
+        if self.nbits & 7 or nbits & 7:
+            raise ValueError(f"Fragment przebiegu musi mieć pełne bajty (nbits={nbits})")
+        self._file.write(mask if mask is not None else bytes(nbits >> 3))
+
+        offset = self.nbits
+        starts, ends = self.starts, self.ends
+        for start, end in bursts:
+            # Burza przechodząca przez granicę fragmentów jest jednym przedziałem
+            if start == 0 and ends and ends[-1] == offset:
+                ends[-1] = offset + end
+            else:
+                starts.append(offset + start)
+                ends.append(offset + end)
+        self.nbits += nbits
+
+    def close(self):
+        """Dopisuje tablice burz i nagłówek, a następnie publikuje plik pod docelową nazwą."""
+        f = self._file
+        nbytes = self.nbits >> 3
+        f.write(bytes(_padded(nbytes) - nbytes))
+        for column in (self.starts, self.ends):
+            if sys.byteorder != 'little':
+                column = array('Q', column)
+                column.byteswap()
+            f.write(column.tobytes())
+
+        cfg = self.sim_config
+        seed = -1 if cfg.seed is None else cfg.seed
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, self.nbits, len(self.starts),
+                             cfg.gilbert_p, cfg.gilbert_r, cfg.gilbert_k, cfg.gilbert_h, seed))
+        f.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+
+def generate_trace(path, sim_config=None, nbits=DEFAULT_TRACE_BITS):
+    """
+    Generuje przebieg błędów kanału Gilberta (parametry i ziarno z sim_config) i zapisuje go do pliku.
+
+    Returns:
+        str: Ścieżka do zapisanego pliku.
+    """
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
+    nbits = (nbits + 7) & ~7
+    channel = GilbertChannel(sim_config)
+    writer = TraceWriter(path, sim_config)
+    remaining = nbits
+    while remaining > 0:
+        chunk = min(CHUNK_BITS, remaining)
+        mask, bursts, _ = channel._gilbert_mask(chunk)
+        writer.append(mask, bursts, chunk)
+        remaining -= chunk
+    return writer.close()
+
+
+def save_channel_traces(path, traces, sim_config=None):
+    """
+    Zapisuje ramki nagrane przez kanał (GilbertChannel(record=True).traces) jako jeden przebieg.
+    Ramki są sklejane w kolejności przejścia przez kanał - odtworzenie daje te same błędy.
+    """
+    writer = TraceWriter(path, sim_config)
+    for trace in traces:
+        writer.append(trace.mask, trace.bursts, len(trace.data) * 8)
+    return writer.close()
+
+
+def cached_trace(sim_config=None, nbits=DEFAULT_TRACE_BITS, directory=None):
+    """
+    Zwraca ścieżkę do przebiegu dla danych parametrów kanału, generując go tylko przy pierwszym użyciu.
+    Przebieg bez ziarna (seed=None) nie byłby powtarzalny, dlatego ziarno jest wtedy ustawiane na 0.
+    """
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
+    if sim_config.seed is None:
+        sim_config = sim_config.replace(seed=0)
+    if directory is None:
+        directory = CACHE_DIR
+    key = repr((sim_config.gilbert_p, sim_config.gilbert_r, sim_config.gilbert_k, sim_config.gilbert_h,
+                sim_config.seed, nbits))
+    path = os.path.join(directory, f"trace_{hashlib.sha1(key.encode('ascii')).hexdigest()[:16]}.bin")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        generate_trace(path, sim_config, nbits)
+    return path
+
+
+class ErrorTrace:
+    """
+    Przebieg błędów odczytywany z pliku przez mmap (tylko do odczytu, współdzielony między kanałami).
+
+    Attributes:
+        nbits (int): Długość przebiegu w bitach.
+        params (tuple): Parametry kanału (P, R, K, H), z którymi przebieg wygenerowano.
+        seed (int or None): Ziarno generatora.
+        mask (memoryview): Maska przekłamań.
+        starts, ends (memoryview): Posortowane początki i końce przedziałów burzy.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, nbits, nbursts, p, r, k, h, seed = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: to nie jest plik przebiegu błędów")
+        self.nbits = nbits
+        self.params = (p, r, k, h)
+        self.seed = None if seed < 0 else seed
+
+        view = memoryview(self._mmap)
+        nbytes = nbits >> 3
+        self.mask = view[HEADER_SIZE:HEADER_SIZE + nbytes]
+        offset = HEADER_SIZE + _padded(nbytes)
+        if sys.byteorder == 'little':
+            self.starts = view[offset:offset + 8 * nbursts].cast('Q')
+            self.ends = view[offset + 8 * nbursts:offset + 16 * nbursts].cast('Q')
+        else:
+            self.starts, self.ends = array('Q'), array('Q')
+            self.starts.frombytes(view[offset:offset + 8 * nbursts])
+            self.ends.frombytes(view[offset + 8 * nbursts:offset + 16 * nbursts])
+            self.starts.byteswap()
+            self.ends.byteswap()
+        self._views = [view, self.mask, self.starts, self.ends]
+
+    def sim_config(self, **changes):
+        """Konfiguracja z parametrami kanału, z którymi przebieg został wygenerowany."""
+        p, r, k, h = self.params
+        return SimConfig.from_module(gilbert_p=p, gilbert_r=r, gilbert_k=k, gilbert_h=h, seed=self.seed, **changes)
+
+    def window(self, start, nbits):
+        """
+        Wycina fragment przebiegu [start, start + nbits).
+
+        Returns:
+            tuple: (maska jako bytearray lub None przy braku błędów,
+                    lista przedziałów burzy względem początku fragmentu, liczba błędów)
+        """
+        end = start + nbits
+        if not (start & 7 or nbits & 7):
+            value = int.from_bytes(self.mask[start >> 3:end >> 3], 'big')
+        else:
+            # Fragment nie zaczyna się lub nie kończy na granicy bajtu - przesunięcie bitowe
+            lo, hi = start >> 3, (end + 7) >> 3
+            value = int.from_bytes(self.mask[lo:hi], 'big') >> (hi * 8 - end)
+            value &= (1 << nbits) - 1
+
+        bursts = []
+        starts, ends = self.starts, self.ends
+        i = bisect.bisect_right(ends, start)
+        while i < len(starts) and starts[i] < end:
+            bursts.append((max(starts[i], start) - start, min(ends[i], end) - start))
+            i += 1
+
+        if value == 0:
+            return None, bursts, 0
+        # Maska jest wyrównana do lewej (MSB pierwszego bajtu = bit `start`), jak w GilbertChannel
+        mask = (value << (-nbits & 7)).to_bytes((nbits + 7) >> 3, 'big')
+        return bytearray(mask), bursts, value.bit_count()
+
+    @property
+    def closed(self):
+        return self._mmap.closed
+
+    def close(self):
+        """Zwalnia widoki i odwzorowanie pliku (bez tego pliku nie da się usunąć ani podmienić w Windows)."""
+        for view in reversed(self._views):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayChannel(GilbertChannel):
+    """
+    Kanał odtwarzający zapisany przebieg błędów zamiast losować maskę.
+
+    Każda ramka dostaje kolejne bity przebiegu (kursor jest wspólny dla obu kierunków,
+    jak stan kanału Gilberta). Gdy przebieg się skończy, odtwarzanie zaczyna się od początku.
+    Opóźnienia i kanał BSC (propagate_bsc) są nadal losowane z ziarna sim_config.
+
+    Przebieg otwarty przez kanał (podana ścieżka) zamyka close(); przekazany obiekt
+    ErrorTrace pozostaje własnością wywołującego.
+
+    Attributes:
+        trace (ErrorTrace): Odtwarzany przebieg (może być współdzielony przez wiele kanałów).
+        position (int): Kursor - pozycja następnego bitu w przebiegu.
+    """
+
+    def __init__(self, trace, sim_config=None, events=None, record=False, offset=0):
+        self._owns_trace = isinstance(trace, (str, os.PathLike))
+        if self._owns_trace:
+            trace = ErrorTrace(trace)
+        if sim_config is None:
+            sim_config = trace.sim_config()
+        super().__init__(sim_config, events=events, record=record)
+        self.trace = trace
+        self.offset = offset
+        self.position = offset
+
+    def close(self):
+        """Zamyka przebieg otwarty przez kanał."""
+        if self._owns_trace:
+            self.trace.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def seed(self, seed):
+        """Ponownie inicjalizuje generator opóźnień i cofa kursor na początek odtwarzania."""
+        super().seed(seed)
+        self.position = self.offset
+
+    def _gilbert_mask(self, nbits):
+        trace = self.trace
+        if nbits > trace.nbits:
+            raise ValueError(f"Ramka ({nbits} b) jest dłuższa niż przebieg błędów ({trace.nbits} b)")
+        if self.position + nbits > trace.nbits:
+            self.position = 0
+        mask, bursts, errors = trace.window(self.position, nbits)
+        self.position += nbits
+        self.state = 'B' if bursts and bursts[-1][1] == nbits else 'G'
+        return mask, bursts, errors
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from colors import Colors
+
+    parser = argparse.ArgumentParser(description="Generowanie przebiegu błędów kanału Gilberta do odtwarzania")
+    parser.add_argument('path', nargs='?', default=None,
+                        help="Plik wyjściowy (domyślnie zapamiętany przebieg w katalogu tymczasowym)")
+    parser.add_argument('--bits', type=int, default=DEFAULT_TRACE_BITS)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    trace_config = SimConfig.from_module(seed=args.seed)
+    start = time.perf_counter()
+    if args.path is None:
+        out_path = cached_trace(trace_config, args.bits)
+    else:
+        out_path = generate_trace(args.path, trace_config, args.bits)
+    elapsed = time.perf_counter() - start
+
+    with ErrorTrace(out_path) as saved:
+        errors = int.from_bytes(saved.mask, 'big').bit_count()
+        print(f"{Colors.GRAY}Przebieg: {out_path} ({os.path.getsize(out_path):,} B, {elapsed:.2f}s)")
+        print(f"Bity: {saved.nbits:,} | Błędy: {errors:,} | Burze: {len(saved.starts):,}{Colors.RESET}")
@@ -0,0 +1,287 @@
+"""
+Moduł zdarzeń diagnostycznych symulacji (zamiast bezwarunkowego print w gorących ścieżkach).
+
+Nadajnik, Odbiornik, kanał i sterowniki symulacji zgłaszają zdarzenia do wymiennego
+odbiorcy (sink). Każde miejsce zgłoszenia sprawdza najpierw `events.enabled`, więc przy
+wyłączonym logowaniu (NULL_SINK) nie jest budowany żaden napis ani słownik pól.
+
+Odbiorcy:
+    NullSink - wyłączone logowanie (domyślne dla wszystkich komponentów),
+    JsonlSink - buforowany zapis zdarzeń do pliku JSON Lines,
+    ConsoleRenderer - dotychczasowe kolorowe komunikaty w konsoli,
+    MultiSink - rozsyłanie zdarzeń do kilku odbiorców.
+
+Każdy rodzaj zdarzenia ma poziom (EVENT_LEVELS: DEBUG - szczegóły każdej ramki, INFO -
+odrzucenia i ważniejsze zmiany stanu, WARNING - timeouty i retransmisje). JsonlSink
+i ConsoleRenderer pomijają zdarzenia poniżej swojego progu `level`.
+"""
+
+# events.py
+import json
+import sys
+import time
+from colors import Colors
+
+# --- Rodzaje zdarzeń ---
+FRAME_SENT = 'frame_sent'  # Nadajnik wysłał ramkę DATA (seq)
+FRAME_ACCEPTED = 'frame_accepted'  # Odbiornik przyjął oczekiwaną ramkę (seq)
+FRAME_CORRUPT = 'frame_corrupt'  # Odbiornik odrzucił ramkę z błędem CRC (seq)
+FRAME_OUT_OF_ORDER = 'frame_out_of_order'  # GBN: ramka poza kolejnością odrzucona (seq, expected)
+FRAME_BUFFERED = 'frame_buffered'  # SR: ramka w oknie zbuforowana (seq, expected)
+FRAME_DUPLICATE = 'frame_duplicate'  # SR: duplikat ramki (seq, buffered)
+ACK_SENT = 'ack_sent'  # Odbiornik wysłał potwierdzenie (seq, kind, reason)
+ACK_SUPPRESSED = 'ack_suppressed'  # Odbiornik pominął zduplikowane ACK ponad limit (seq, count)
+ACK_MOVED = 'ack_moved'  # Nadajnik przesunął okno (ack, old_base, new_base, kind, frames)
+ACK_IGNORED = 'ack_ignored'  # Nadajnik odrzucił ACK spoza okna (ack, base, next_seq)
+TIMEOUT = 'timeout'  # Upłynął timer Nadajnika (seq, selective)
+RETRANSMIT = 'retransmit'  # Sterownik retransmituje ramki (seq, frames, selective, fast)
+DUP_ACK = 'dup_ack'  # Nadajnik otrzymał zduplikowane ACK dla Base (seq, count)
+FAST_RETRANSMIT = 'fast_retransmit'  # Próg zduplikowanych ACK - szybka retransmisja (seq, suppressed)
+CHANNEL_ERRORS = 'channel_errors'  # Kanał przekłamał bity ramki (bits, data, mask, bursts)
+BURST_START = 'burst_start'  # Kanał wszedł w stan burzy (bit - pozycja w ramce)
+BURST_END = 'burst_end'  # Kanał wyszedł ze stanu burzy (bit - pozycja w ramce)
+FLOW_DONE = 'flow_done'  # Przepływ dostarczył wszystkie pakiety (flow, time) - multiflow.py
+
+# --- Poziomy zdarzeń (wartości jak w module logging) ---
+DEBUG = 10
+INFO = 20
+WARNING = 30
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING}
+
+# Rodzaj zdarzenia -> poziom (rodzaje spoza słownika mają poziom INFO)
+EVENT_LEVELS = {
+    FRAME_SENT: DEBUG,
+    FRAME_ACCEPTED: DEBUG,
+    FRAME_BUFFERED: DEBUG,
+    FRAME_DUPLICATE: DEBUG,
+    ACK_SENT: DEBUG,
+    ACK_SUPPRESSED: DEBUG,
+    ACK_MOVED: DEBUG,
+    DUP_ACK: DEBUG,
+    CHANNEL_ERRORS: DEBUG,
+    BURST_START: DEBUG,
+    BURST_END: DEBUG,
+    FRAME_CORRUPT: INFO,
+    FRAME_OUT_OF_ORDER: INFO,
+    ACK_IGNORED: INFO,
+    FLOW_DONE: INFO,
+    TIMEOUT: WARNING,
+    RETRANSMIT: WARNING,
+    FAST_RETRANSMIT: WARNING,
+}
+
+
+def get_level(level):
+    """Zwraca poziom liczbowy dla nazwy z LEVELS (lub liczby)."""
+    if isinstance(level, str):
+        try:
+            return LEVELS[level.lower()]
+        except KeyError:
+            raise ValueError(f"Nieznany poziom zdarzeń: {level!r} (dostępne: {', '.join(LEVELS)})") from None
+    return level
+
+
+class NullSink:
+    """Odbiorca wyłączony - miejsca zgłoszeń pomijają zdarzenia po sprawdzeniu `enabled`."""
+
+    enabled = False
+
+    def emit(self, kind, /, **fields):
+        pass
+
+    def close(self):
+        pass
+
+
+# Współdzielona instancja (odbiorca domyślny)
+NULL_SINK = NullSink()
+
+
+def sink_or_null(events):
+    """Zwraca `events` lub NULL_SINK, gdy odbiorca nie został podany."""
+    return NULL_SINK if events is None else events
+
+
+class JsonlSink:
+    """
+    Zapisuje zdarzenia jako JSON Lines ({"t": ..., "event": ..., pola...}) w buforowanym pliku.
+
+    Pola typu bytes są zapisywane szesnastkowo.
+
+    Attributes:
+        clock (callable): Źródło znacznika czasu `t` (domyślnie time.perf_counter).
+        level (int): Próg poziomu zdarzeń (domyślnie DEBUG - wszystkie zdarzenia).
+        count (int): Liczba zapisanych zdarzeń.
+    """
+
+    enabled = True
+
+    def __init__(self, path_or_file, clock=time.perf_counter, buffer_size=1 << 16, level=DEBUG):
+        if isinstance(path_or_file, str):
+            self._file = open(path_or_file, 'w', encoding='utf-8', buffering=buffer_size)
+            self._owns_file = True
+        else:
+            self._file = path_or_file
+            self._owns_file = False
+        self.clock = clock
+        self.level = get_level(level)
+        self.count = 0
+        self._encoder = json.JSONEncoder(separators=(',', ':'), default=_encode_default)
+
+    def emit(self, kind, /, **fields):
+        if EVENT_LEVELS.get(kind, INFO) < self.level:
+            return
+        record = {'t': self.clock(), 'event': kind}
+        record.update(fields)
+        self._file.write(self._encoder.encode(record))
+        self._file.write('\n')
+        self.count += 1
+
+    def close(self):
+        self._file.flush()
+        if self._owns_file:
+            self._file.close()
+
+
+def _encode_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    raise TypeError(f"Nie można zapisać wartości typu {type(value).__name__}")
+
+
+def read_jsonl(path):
+    """Wczytuje zdarzenia zapisane przez JsonlSink (lista słowników)."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class MultiSink:
+    """Przekazuje każde zdarzenie do wszystkich podanych odbiorców."""
+
+    enabled = True
+
+    def __init__(self, *sinks):
+        self.sinks = [sink for sink in sinks if sink.enabled]
+        self.enabled = bool(self.sinks)
+
+    def emit(self, kind, /, **fields):
+        for sink in self.sinks:
+            sink.emit(kind, **fields)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class ConsoleRenderer:
+    """
+    Wypisuje zdarzenia jako dotychczasowe kolorowe komunikaty konsoli (Colors).
+    Zdarzenia bez odpowiednika w konsoli (np. frame_sent, burst_start) są pomijane.
+    Zdarzenia z polem `flow` (multiflow.py) są poprzedzane numerem przepływu.
+    Zdarzenia poniżej progu `level` (domyślnie DEBUG - wszystkie) są pomijane.
+    """
+
+    enabled = True
+
+    def __init__(self, stream=None, level=DEBUG):
+        self.stream = stream
+        self.level = get_level(level)
+        self._prefix = ""
+
+    def _print(self, text):
+        print(self._prefix + text, file=self.stream if self.stream is not None else sys.stdout)
+
+    def emit(self, kind, /, **fields):
+        if EVENT_LEVELS.get(kind, INFO) < self.level:
+            return
+        render = getattr(self, '_render_' + kind, None)
+        if render is not None:
+            flow = fields.pop('flow', None)
+            self._prefix = "" if flow is None else f"[P{flow}] "
+            render(**fields)
+
+    def close(self):
+        pass
+
+    # --- Odbiornik ---
+
+    def _render_frame_corrupt(self, seq):
+        self._print(f"{Colors.RED}[ODBIORNIK]: Otrzymano USZKODZONĄ ramkę DATA SN={seq} (Błąd CRC). ODRZUCAM.{Colors.RESET}")
+
+    def _render_frame_accepted(self, seq):
+        self._print(f"{Colors.for_sn(seq)}[ODBIORNIK]: Otrzymano POPRAWNĄ i OCZEKIWANĄ ramkę DATA SN={seq}.{Colors.RESET}")
+
+    def _render_frame_out_of_order(self, seq, expected):
+        self._print(f"{Colors.for_sn(seq)}[ODBIORNIK]: Otrzymano ramkę DATA SN={seq} poza kolejnością. "
+                    f"Oczekiwano SN={expected}. ODRZUCAM.{Colors.RESET}")
+
+    def _render_frame_buffered(self, seq, expected):
+        self._print(f"{Colors.for_sn(seq)}[ODBIORNIK]: Otrzymano POPRAWNĄ ramkę DATA SN={seq} "
+                    f"(oczekiwano SN={expected}). BUFORUJĘ.{Colors.RESET}")
+
+    def _render_frame_duplicate(self, seq, buffered):
+        if buffered:
+            self._print(f"{Colors.GRAY}[ODBIORNIK]: Ramka DATA SN={seq} jest już w buforze.{Colors.RESET}")
+        else:
+            self._print(f"{Colors.GRAY}[ODBIORNIK]: Duplikat ramki DATA SN={seq}. Powtarzam SACK.{Colors.RESET}")
+
+    def _render_ack_sent(self, seq, kind, reason=None, data_seq=None):
+        if kind == 'SACK':
+            self._print(f"{Colors.for_sn(seq)}[ODBIORNIK]: Wysyłam SACK SN={seq}{Colors.RESET}")
+        elif reason == 'crc':
+            self._print(f"{Colors.RED}[ODBIORNIK]: Powtarzam ACK SN={seq} (po błędzie CRC w DATA).{Colors.RESET}")
+        elif reason == 'order':
+            self._print(f"{Colors.GRAY}[ODBIORNIK]: Powtarzam ACK SN={seq} (by wrócił do Base={seq}).{Colors.RESET}")
+        else:
+            # Kolor ACK n odpowiada ramce danych, którą to ACK potwierdza (n - 1)
+            color = Colors.for_sn(data_seq if data_seq is not None else seq - 1)
+            self._print(f"{color}[ODBIORNIK]: Wysyłam ACK SN={seq}{Colors.RESET}")
+
+    def _render_ack_suppressed(self, seq, count):
+        self._print(f"{Colors.GRAY}[ODBIORNIK]: ACK SN={seq} wysłano już {count + 1} razy. POMIJAM duplikat.{Colors.RESET}")
+
+    # --- Nadajnik ---
+
+    def _render_ack_moved(self, ack, old_base, new_base, kind='ACK', frames=None):
+        if kind == 'SACK':
+            self._print(f"{Colors.GRAY}[NADAJNIK]: Otrzymano SACK SN={ack}. Przesuwam BASE z {old_base} do {new_base}.{Colors.RESET}")
+        else:
+            self._print(f"{Colors.GRAY}[NADAJNIK]: Otrzymano POPRAWNE ACK SN={ack}. Przesuwam BASE z {old_base} do {new_base}.{Colors.RESET}")
+
+    def _render_ack_ignored(self, ack, base, next_seq):
+        self._print(f"{Colors.GRAY}[NADAJNIK]: ACK SN={ack} spoza okna [{base}, {next_seq}]. IGNORUJĘ.{Colors.RESET}")
+
+    def _render_timeout(self, seq, selective=False):
+        label = 'SN' if selective else 'Base'
+        self._print(f"{Colors.GRAY}[NADAJNIK]: TIMEOUT! dla {label}={seq}{Colors.RESET}")
+
+    def _render_fast_retransmit(self, seq, suppressed):
+        if suppressed:
+            self._print(f"{Colors.GRAY}[NADAJNIK]: Zduplikowane ACK SN={seq} w trakcie odzyskiwania - "
+                        f"pomijam szybką retransmisję.{Colors.RESET}")
+        else:
+            self._print(f"{Colors.GRAY}[NADAJNIK]: Próg zduplikowanych ACK SN={seq} - szybka retransmisja.{Colors.RESET}")
+
+    def _render_retransmit(self, seq, frames, selective=False, fast=False):
+        if fast:
+            self._print(f"{Colors.RED}[STOP] Zduplikowane ACK dla SN={seq}. Szybka retransmisja okna...{Colors.RESET}")
+        elif selective:
+            self._print(f"{Colors.RED}[STOP] Timeout na pakiecie SN={seq}. Brak SACK. Retransmisja ramki...{Colors.RESET}")
+        else:
+            self._print(f"{Colors.RED}[STOP] Timeout na pakiecie SN={seq}. Brak ACK. Retransmisja...{Colors.RESET}")
+
+    # --- Wiele przepływów ---
+
+    def _render_flow_done(self, time):
+        self._print(f"{Colors.GRAY}[PRZEPŁYW]: Dostarczono wszystkie pakiety w chwili {time:.3f}s.{Colors.RESET}")
+
+    # --- Kanał ---
+
+    def _render_channel_errors(self, bits, data, mask, bursts):
+        from channel import ChannelTrace
+
+        visual_input_str, visual_output_str = ChannelTrace(data, mask, bursts, bits).render()
+        self._print(f"   [WEJŚCIE]: {visual_input_str}")
+        self._print(f"   [WYJŚCIE]: {visual_output_str}")
+        self._print(
+            f"{Colors.RED}  [KANAŁ]: Zmieniono {bits} bitów (Legenda: {Colors.RED}Błąd{Colors.RESET}, {Colors.MAGENTA}Wiązka{Colors.RESET}).{Colors.RESET}")
@@ -1,6 +1,51 @@
 # frame.py
 import struct
 import zlib
+from checksum import CRC32
+
+# Prekompilowane struktury kodeka (format sieciowy, Big Endian)
+_CRC = struct.Struct('!I')
+_HEADER = struct.Struct('!BBcc')
+_FRAME_PREFIX = struct.Struct('!IBBcc')
+
+# Warianty nagłówka według szerokości numeru sekwencyjnego w bajtach (SEQ_BITS > 8):
+# [SN (1/2/4 B)][typ][nadawca][odbiorca]. Wariant 1-bajtowy to format domyślny.
+_HEADERS = {1: _HEADER, 2: struct.Struct('!HBcc'), 4: struct.Struct('!IBcc')}
+
+# Pole numeru ACK doklejanego w ramkach DATA_ACK (ta sama szerokość co pole SN)
+_ACK_FIELDS = {1: struct.Struct('!B'), 2: struct.Struct('!H'), 4: struct.Struct('!I')}
+
+# Stały narzut ramki: CRC + nagłówek (w bajtach) - dla domyślnej sumy CRC-32
+FRAME_OVERHEAD = _FRAME_PREFIX.size
+HEADER_SIZE = _HEADER.size
+
+
+def seq_width(max_seq):
+    """Szerokość pola SN w bajtach (1, 2 lub 4) potrzebna dla numerów 0 .. max_seq - 1."""
+    for width in _HEADERS:
+        if max_seq <= 1 << (8 * width):
+            return width
+    raise ValueError(f"Zakres numeracji {max_seq} przekracza 32-bitowe pole SN")
+
+
+def header_size(seq_bytes=1):
+    """Rozmiar nagłówka w bajtach dla danej szerokości pola SN."""
+    return _HEADERS[seq_bytes].size
+
+
+def frame_overhead(checksum=None, seq_bytes=1):
+    """Narzut ramki (suma kontrolna + nagłówek) w bajtach dla danej sumy (None - CRC-32) i szerokości SN."""
+    if checksum is None and seq_bytes == 1:
+        return FRAME_OVERHEAD
+    return (CRC32 if checksum is None else checksum).size + header_size(seq_bytes)
+
+# Kody typów ramek (tak jak w nagłówku na łączu)
+DATA = 0
+ACK = 1  # Potwierdzenie kumulacyjne (Go-Back-N): numer następnej oczekiwanej ramki
+SACK = 2  # Potwierdzenie selektywne (Selective Repeat): numer odebranej ramki
+DATA_ACK = 3  # Dane z doklejonym potwierdzeniem kumulacyjnym (piggybacking, duplex.py)
+TYPE_NAMES = ('DATA', 'ACK', 'SACK', 'DATA_ACK')
+_TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
 
 
 class Frame:
@@ -9,103 +54,177 @@ class Frame:
     Klasa odpowiada za przechowywanie danych, numeru sekwencyjnego oraz
     za serializację (pakowanie do bajtów) i deserializację (rozpakowanie).
 
+    Klasa używa __slots__ (bez słownika atrybutów na każdą ramkę), a typ
+    przechowywany jest jako kod liczbowy - ten sam, który trafia do nagłówka.
+
+    Ramka DATA_ACK to ramka danych niosąca dodatkowo potwierdzenie kumulacyjne dla
+    przeciwnego kierunku: pole ACK (szerokości pola SN) leży między nagłówkiem a danymi.
+
     Attributes:
-        type (str): Typ ramki ('DATA' lub 'ACK').
+        type_code (int): Kod typu ramki (DATA=0, ACK=1, SACK=2, DATA_ACK=3).
+        type (str): Nazwa typu ramki ('DATA', 'ACK', 'SACK' lub 'DATA_ACK') - wyliczana z type_code.
         seq_num (int): Numer sekwencyjny ramki.
-        payload (str): Dane użytkowe (tylko dla ramek DATA).
+        payload (str): Dane użytkowe (tylko dla ramek DATA i DATA_ACK).
         sender (str): ID nadawcy (np. 'A').
         receiver (str): ID odbiorcy (np. 'B').
+        ack_num (int or None): Doklejony numer ACK (tylko dla ramek DATA_ACK).
         corrupt_flag (bool): Flaga ustawiana na True, jeśli suma kontrolna CRC się nie zgadza.
     """
 
-    def __init__(self, frame_type, seq_num, payload="", sender_id="A", receiver_id="B"):
-        self.type = frame_type
+    __slots__ = ('type_code', 'seq_num', 'payload', 'sender', 'receiver', 'ack_num', 'corrupt_flag')
+
+    def __init__(self, frame_type, seq_num, payload="", sender_id="A", receiver_id="B", ack_num=None):
+        # Typ można podać nazwą ('DATA'/'ACK'/'SACK'/'DATA_ACK') albo kodem (frame.DATA, frame.ACK, ...)
+        self.type_code = _TYPE_CODES.get(frame_type, frame_type)
         self.seq_num = seq_num
         self.payload = payload if payload is not None else ""
         self.sender = sender_id
         self.receiver = receiver_id
+        self.ack_num = ack_num
         self.corrupt_flag = False
 
-    def to_bytes(self) -> bytes:
+    @property
+    def type(self):
+        """Nazwa typu ramki ('DATA', 'ACK', 'SACK' lub 'DATA_ACK')."""
+        return TYPE_NAMES[self.type_code]
+
+    def to_bytes(self, checksum=None, seq_bytes=1) -> bytes:
         """
         Serializuje obiekt ramki do ciągu bajtów gotowych do wysłania przez kanał.
-        Oblicza sumę kontrolną CRC-32 i dokleja ją na początku ramki.
+        Oblicza sumę kontrolną (domyślnie CRC-32) i dokleja ją na początku ramki.
+
+        CRC liczone jest przyrostowo (nagłówek, potem dane), więc cała ramka powstaje
+        jednym wywołaniem prekompilowanej struktury i jednym sklejeniem z danymi.
+
+        Args:
+            checksum: Suma kontrolna z checksum.py (None - CRC-32).
+            seq_bytes (int): Szerokość pola SN w bajtach (1, 2 lub 4 - patrz seq_width).
 
         Returns:
-            bytes: Zserializowana ramka w formacie: [CRC(4b)][Header(4b)][Payload...].
+            bytes: Zserializowana ramka w formacie: [CRC(4b)][Header(4b)][Payload...]
+                   (dla innych sum pole sumy ma jej szerokość, a nagłówek rośnie z polem SN).
         """
-        # Mapowanie typu na liczbę (DATA=0, ACK=1) - oszczędzamy bity
-        type_code = 0 if self.type == 'DATA' else 1
+        if seq_bytes != 1 or checksum is not None and checksum is not CRC32 or self.type_code == DATA_ACK:
+            return self._to_bytes_with(CRC32 if checksum is None else checksum, seq_bytes)
+
+        # Typ jest już kodem liczbowym (DATA=0, ACK=1, SACK=2) - oszczędzamy bity
+        type_code = self.type_code
 
         # Kodowanie stringów na bajty
         payload_bytes = self.payload.encode('utf-8')
         sender_bytes = self.sender.encode('utf-8')
         receiver_bytes = self.receiver.encode('utf-8')
 
-        # Budowa nagłówka (bez CRC)
         # Format '!BBcc': Network (Big Endian), Byte, Byte, char, char
-        header = struct.pack('!BBcc', self.seq_num, type_code, sender_bytes, receiver_bytes)
+        header = _HEADER.pack(self.seq_num, type_code, sender_bytes, receiver_bytes)
+        crc = zlib.crc32(payload_bytes, zlib.crc32(header))
 
-        content = header + payload_bytes
+        # [CRC][Header] jednym pakowaniem + dane
+        return _FRAME_PREFIX.pack(crc, self.seq_num, type_code, sender_bytes, receiver_bytes) + payload_bytes
 
-        # Obliczenie CRC-32
-        crc = zlib.crc32(content)
-
-        # Doklejenie CRC na początek
-        return struct.pack('!I', crc) + content
+    def _to_bytes_with(self, checksum, seq_bytes=1):
+        """Serializacja z wybraną sumą kontrolną i szerokością SN: [suma][nagłówek][ACK - tylko DATA_ACK][dane]."""
+        content = _HEADERS[seq_bytes].pack(self.seq_num, self.type_code, self.sender.encode('utf-8'),
+                               self.receiver.encode('utf-8'))
+        if self.type_code == DATA_ACK:
+            content += _ACK_FIELDS[seq_bytes].pack(self.ack_num)
+        content += self.payload.encode('utf-8')
+        return checksum.struct.pack(checksum.compute(content)) + content
 
     @staticmethod
-    def from_bytes(data: bytes):
+    def from_bytes(data: bytes, checksum=None, seq_bytes=1):
         """
         Deserializuje ciąg bajtów z powrotem do obiektu Frame.
-        Weryfikuje sumę kontrolną CRC-32.
+        Weryfikuje sumę kontrolną (domyślnie CRC-32). CRC i nagłówek są czytane jednym
+        unpack_from (bez wycinania fragmentów), a obiekt ramki tworzony jest tylko raz.
 
         Args:
             data (bytes): Surowe dane odebrane z kanału.
+            checksum: Suma kontrolna z checksum.py (None - CRC-32).
+            seq_bytes (int): Szerokość pola SN w bajtach (jak przy serializacji).
 
         Returns:
             Frame: Obiekt ramki. Jeśli CRC jest błędne, ustawia flagę frame.corrupt_flag = True.
         """
-        frame = Frame('DATA', 0)
+        if seq_bytes != 1 or checksum is not None and checksum is not CRC32:
+            return Frame._from_bytes_with(data, CRC32 if checksum is None else checksum, seq_bytes)
+        if len(data) < FRAME_OVERHEAD:
+            return Frame._corrupt(0)
 
         try:
-            if len(data) < 8:
-                frame.corrupt_flag = True
-                return frame
-
-            # 1. Wyciągnij CRC (pierwsze 4 bajty)
-            received_crc = struct.unpack('!I', data[:4])[0]
-            content = data[4:]
-
-            # 2. Oblicz CRC ponownie z danych
-            calculated_crc = zlib.crc32(content)
-
-            # 3. Weryfikacja integralności
-            if received_crc != calculated_crc:
-                frame.corrupt_flag = True
-                # Próba odzyskania SN dla logów (może być śmieciem)
-                try:
-                    frame.seq_num = struct.unpack('!B', content[:1])[0]
-                except:
-                    pass
-                return frame
+            # 1. Wyciągnij CRC i nagłówek jednym odczytem
+            received_crc, seq_num, type_code, sender_b, receiver_b = _FRAME_PREFIX.unpack_from(data)
 
-            # 4. Rozpakowanie poprawnej ramki
-            seq_num, type_code, sender_b, receiver_b = struct.unpack('!BBcc', content[:4])
-            payload_bytes = content[4:]
+            # 2-3. Weryfikacja integralności
+            if received_crc != zlib.crc32(data[_CRC.size:]):
+                # SN dla logów (może być śmieciem)
+                return Frame._corrupt(seq_num)
 
-            frame.seq_num = seq_num
-            frame.type = 'DATA' if type_code == 0 else 'ACK'
-            frame.sender = sender_b.decode('utf-8', errors='ignore')
-            frame.receiver = receiver_b.decode('utf-8', errors='ignore')
-            frame.payload = payload_bytes.decode('utf-8', errors='ignore')
+            # 4. Rozpakowanie poprawnej ramki
+            if type_code == DATA_ACK:
+                return Frame._with_ack(data, FRAME_OVERHEAD, 1, seq_num, sender_b, receiver_b)
+            return Frame(type_code if type_code <= SACK else ACK, seq_num,
+                         data[FRAME_OVERHEAD:].decode('utf-8', errors='ignore'),
+                         sender_b.decode('utf-8', errors='ignore'),
+                         receiver_b.decode('utf-8', errors='ignore'))
 
-            return frame
+        except Exception:
+            return Frame._corrupt(0)
 
+    @staticmethod
+    def _from_bytes_with(data, checksum, seq_bytes=1):
+        """Deserializacja z wybraną sumą kontrolną (pole sumy o szerokości checksum.size) i szerokością SN."""
+        size = checksum.size
+        header = _HEADERS[seq_bytes]
+        if len(data) < size + header.size:
+            return Frame._corrupt(0)
+        try:
+            seq_num, type_code, sender_b, receiver_b = header.unpack_from(data, size)
+            if checksum.struct.unpack_from(data)[0] != checksum.compute(data[size:]):
+                return Frame._corrupt(seq_num)
+            if type_code == DATA_ACK:
+                return Frame._with_ack(data, size + header.size, seq_bytes, seq_num, sender_b, receiver_b)
+            return Frame(type_code if type_code <= SACK else ACK, seq_num,
+                         data[size + header.size:].decode('utf-8', errors='ignore'),
+                         sender_b.decode('utf-8', errors='ignore'),
+                         receiver_b.decode('utf-8', errors='ignore'))
         except Exception:
-            f = Frame('DATA', 0)
-            f.corrupt_flag = True
-            return f
+            return Frame._corrupt(0)
+
+    @staticmethod
+    def _with_ack(data, offset, seq_bytes, seq_num, sender_b, receiver_b):
+        """Rozpakowuje ramkę DATA_ACK (pole ACK od `offset`, dane za nim) o już sprawdzonej sumie."""
+        field = _ACK_FIELDS[seq_bytes]
+        if len(data) < offset + field.size:
+            return Frame._corrupt(seq_num)
+        return Frame(DATA_ACK, seq_num, data[offset + field.size:].decode('utf-8', errors='ignore'),
+                     sender_b.decode('utf-8', errors='ignore'), receiver_b.decode('utf-8', errors='ignore'),
+                     ack_num=field.unpack_from(data, offset)[0])
+
+    @staticmethod
+    def crc_ok(data, checksum=None, seq_bytes=1) -> bool:
+        """
+        Sprawdza samą sumę kontrolną ramki bez tworzenia obiektu Frame
+        (ten sam werdykt co `Frame.from_bytes(data, checksum, seq_bytes).is_corrupt()`, zanegowany).
+        Przyjmuje bytes, bytearray lub memoryview.
+        """
+        if seq_bytes == 1 and (checksum is None or checksum is CRC32):
+            if len(data) < FRAME_OVERHEAD:
+                return False
+            return _CRC.unpack_from(data)[0] == zlib.crc32(data[_CRC.size:])
+        if checksum is None:
+            checksum = CRC32
+        size = checksum.size
+        if len(data) < size + header_size(seq_bytes):
+            return False
+        return checksum.struct.unpack_from(data)[0] == checksum.compute(data[size:])
+
+    @staticmethod
+    def _corrupt(seq_num):
+        """Tworzy ramkę oznaczoną jako uszkodzona (błąd CRC lub za krótka)."""
+        frame = Frame(DATA, seq_num)
+        frame.corrupt_flag = True
+        return frame
 
     def is_corrupt(self):
         """Zwraca informację, czy ramka jest uszkodzona (błąd sumy kontrolnej)."""
@@ -0,0 +1,269 @@
+"""
+Moduł instrumentacji gorących ścieżek symulacji (liczniki, histogramy czasów, profilowanie).
+
+Instrumentacja podmienia na czas pomiaru metody etapów (STAGES) na wersje mierzące
+czas wywołania, a po pomiarze przywraca oryginały. Kod protokołu nie zawiera żadnych
+sprawdzeń ani liczników - bez aktywnej instrumentacji koszt jest zerowy, więc może
+ona pozostać dostępna w każdym przebiegu (także w przeglądach parametrów).
+
+Dla każdego etapu zbierane są: liczba wywołań, czas łączny (z wywołaniami zagnieżdżonych
+etapów), czas własny (bez nich), minimum/maksimum i histogram czasów w przedziałach
+potęg dwójki (w nanosekundach). Opcjonalnie cały blok jest profilowany cProfile
+i/lub śledzony tracemalloc. Raport jest słownikiem gotowym do zapisu w JSON.
+
+Przykład:
+    with Instrumentation(profile=True) as probe:
+        main.simulate(sim_config)
+    probe.write_json('raport.json')
+"""
+
+# instrument.py
+import cProfile
+import functools
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+from frame import Frame
+from channel import GilbertChannel
+from sender import Sender, SelectiveRepeatSender
+from receiver import Receiver, SelectiveRepeatReceiver
+from events import JsonlSink, ConsoleRenderer
+from colors import Colors
+
+# Etapy: nazwa -> metody (klasa, nazwa metody) mierzone łącznie
+STAGES = {
+    'frame.to_bytes': ((Frame, 'to_bytes'),),
+    'frame.from_bytes': ((Frame, 'from_bytes'),),
+    'channel.propagate': ((GilbertChannel, 'propagate'), (GilbertChannel, 'propagate_batch')),
+    'receiver.receive_frame': ((Receiver, 'receive_frame'), (SelectiveRepeatReceiver, 'receive_frame')),
+    'sender.timer': ((Sender, 'is_timeout'), (SelectiveRepeatSender, 'is_frame_timeout')),
+    'events.emit': ((JsonlSink, 'emit'), (ConsoleRenderer, 'emit')),
+}
+
+# Liczba przedziałów histogramu (przedział b: czasy z [2^(b-1), 2^b) ns)
+HISTOGRAM_BUCKETS = 48
+
+# Aktywna instrumentacja (podmiana metod jest globalna, więc naraz może działać tylko jedna)
+_active = None
+
+
+class StageStats:
+    """
+    Statystyki jednego etapu.
+
+    Attributes:
+        calls (int): Liczba wywołań.
+        total_ns (int): Czas łączny (z zagnieżdżonymi etapami).
+        self_ns (int): Czas własny (bez zagnieżdżonych etapów).
+        min_ns (int or None): Najkrótsze wywołanie.
+        max_ns (int): Najdłuższe wywołanie.
+        histogram (list): Liczba wywołań w przedziałach potęg dwójki (indeks = długość bitowa czasu w ns).
+    """
+
+    __slots__ = ('calls', 'total_ns', 'self_ns', 'min_ns', 'max_ns', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.self_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def record(self, elapsed, own):
+        self.calls += 1
+        self.total_ns += elapsed
+        self.self_ns += own
+        if self.min_ns is None or elapsed < self.min_ns:
+            self.min_ns = elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+        self.histogram[min(elapsed.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        """Górna granica przedziału histogramu zawierającego kwantyl `q` (w ns; przybliżenie z dokładnością do 2x)."""
+        if not self.calls:
+            return 0
+        rank = q * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= rank:
+                return 1 << bucket
+        return self.max_ns
+
+    def to_dict(self):
+        calls = self.calls
+        return {
+            'calls': calls,
+            'total_s': self.total_ns / 1e9,
+            'self_s': self.self_ns / 1e9,
+            'mean_us': self.total_ns / calls / 1e3 if calls else 0.0,
+            'min_us': (self.min_ns or 0) / 1e3,
+            'max_us': self.max_ns / 1e3,
+            'p50_us': self.percentile(0.50) / 1e3,
+            'p99_us': self.percentile(0.99) / 1e3,
+            'histogram_ns': {str(1 << bucket): count for bucket, count in enumerate(self.histogram) if count},
+        }
+
+
+def _timed(func, stats, stack):
+    """Opakowuje `func` pomiarem czasu; stos sumuje czas zagnieżdżonych etapów (czas własny)."""
+    perf_ns = time.perf_counter_ns
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stack.append(0)
+        start = perf_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_ns() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            stats.record(elapsed, elapsed - nested)
+
+    return wrapper
+
+
+class Instrumentation:
+    """
+    Pomiar etapów gorącej ścieżki w bloku `with` (lub między start() i stop()).
+
+    Args:
+        stages (iterable): Nazwy etapów z STAGES (domyślnie wszystkie).
+        profile (bool): Profilowanie całego bloku przez cProfile.
+        memory (bool): Śledzenie alokacji przez tracemalloc (szczyt i największe miejsca alokacji).
+        top (int): Liczba pozycji w zestawieniach profilu i pamięci.
+
+    Attributes:
+        stats (dict): Nazwa etapu -> StageStats.
+        wall_time (float): Czas trwania bloku (sekundy).
+    """
+
+    def __init__(self, stages=None, profile=False, memory=False, top=20):
+        names = list(STAGES) if stages is None else list(stages)
+        for name in names:
+            if name not in STAGES:
+                raise ValueError(f"Nieznany etap: {name} (dostępne: {', '.join(STAGES)})")
+        self.stats = {name: StageStats() for name in names}
+        self.profile = profile
+        self.memory = memory
+        self.top = top
+        self.wall_time = 0.0
+        self._patched = []
+        self._profiler = None
+        self._profile_rows = None
+        self._memory_report = None
+        self._started = None
+
+    def start(self):
+        """Podmienia metody etapów i uruchamia profilery."""
+        global _active
+        if _active is not None:
+            raise RuntimeError("Instrumentacja jest już aktywna")
+        _active = self
+        stack = []
+        for name, stats in self.stats.items():
+            for cls, attr in STAGES[name]:
+                # Podklasy bez własnej implementacji korzystają z podmienionej metody klasy bazowej
+                if attr not in cls.__dict__:
+                    continue
+                original = cls.__dict__[attr]
+                if isinstance(original, staticmethod):
+                    replacement = staticmethod(_timed(original.__func__, stats, stack))
+                else:
+                    replacement = _timed(original, stats, stack)
+                self._patched.append((cls, attr, original))
+                setattr(cls, attr, replacement)
+
+        if self.memory:
+            tracemalloc.start()
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._started = time.perf_counter()
+        return self
+
+    def stop(self):
+        """Przywraca oryginalne metody i zbiera wyniki profilerów."""
+        global _active
+        self.wall_time = time.perf_counter() - self._started
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profile_rows = _profile_rows(self._profiler, self.top)
+            self._profiler = None
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._memory_report = {
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'top': [{'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                         'size_bytes': stat.size, 'count': stat.count}
+                        for stat in snapshot.statistics('lineno')[:self.top]],
+            }
+        for cls, attr, original in reversed(self._patched):
+            setattr(cls, attr, original)
+        self._patched.clear()
+        _active = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def report(self):
+        """
+        Raport w postaci słownika (gotowy do zapisu w JSON).
+
+        Returns:
+            dict: wall_time, stages (statystyki etapów), unaccounted_s (czas poza etapami),
+                  profile (lista funkcji wg czasu łącznego lub None), memory (lub None).
+        """
+        stages = {name: stats.to_dict() for name, stats in self.stats.items()}
+        measured = sum(stats.self_ns for stats in self.stats.values()) / 1e9
+        return {
+            'wall_time': self.wall_time,
+            'stages': stages,
+            'unaccounted_s': max(0.0, self.wall_time - measured),
+            'profile': self._profile_rows,
+            'memory': self._memory_report,
+        }
+
+    def write_json(self, path):
+        """Zapisuje raport do pliku JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def _profile_rows(profiler, top):
+    """Najdroższe funkcje profilu (wg czasu łącznego) jako lista słowników."""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, lineno, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({'function': f"{filename}:{lineno}({function})", 'calls': calls,
+                     'tottime': tottime, 'cumtime': cumtime})
+    rows.sort(key=lambda row: row['cumtime'], reverse=True)
+    return rows[:top]
+
+
+def format_report(report):
+    """Tabela etapów do wypisania w konsoli (czasy własne i ich udział w czasie bloku)."""
+    wall = report['wall_time'] or 1.0
+    lines = [f"{'etap':<24} {'wywołania':>10} {'własny [s]':>11} {'udział':>7} {'średnio [us]':>13} {'p99 [us]':>9}"]
+    for name, stage in report['stages'].items():
+        lines.append(f"{name:<24} {stage['calls']:>10} {stage['self_s']:>11.4f} {stage['self_s'] / wall:>7.1%} "
+                     f"{stage['mean_us']:>13.2f} {stage['p99_us']:>9.1f}")
+    lines.append(f"{Colors.GRAY}{'poza etapami':<24} {'':>10} {report['unaccounted_s']:>11.4f} "
+                 f"{report['unaccounted_s'] / wall:>7.1%}{Colors.RESET}")
+    if report['memory'] is not None:
+        lines.append(f"{Colors.GRAY}Pamięć: szczyt {report['memory']['peak_bytes'] / 1024:.0f} KiB{Colors.RESET}")
+    return "\n".join(lines)
@@ -1,86 +1,226 @@
-import time
-import config
-from sender import Sender
-from receiver import Receiver
-from frame import Frame
+import argparse
+import functools
+from config import SimConfig, ACK_POLICIES
 from colors import Colors
-import channel
-
-
-def run_go_back_n_simulation(override_p=None, override_r=None):
+from events import ConsoleRenderer, JsonlSink, MultiSink, LEVELS
+from simulation import create_simulation
+from checksum import CHECKSUMS
+from instrument import Instrumentation, format_report
+
+
+def simulate(sim_config=None, override_p=None, override_r=None, realtime=False, seed=None, events=None, trace=None):
+    """
+    Uruchamia jeden przebieg symulacji ARQ (tryb z sim_config.arq_mode) i zwraca jego statystyki.
+
+    Args:
+        sim_config (SimConfig): Parametry przebiegu (domyślnie bieżące wartości modułu config).
+        override_p (float): Opcjonalna zmiana GILBERT_P dla tego przebiegu.
+        override_r (float): Opcjonalna zmiana GILBERT_R dla tego przebiegu.
+        realtime (bool): Tempo czasu rzeczywistego (dawny tryb z czekaniem) zamiast
+                         najszybszego możliwego przeliczenia zdarzeń.
+        seed (int): Ziarno generatora kanału (powtarzalne przebiegi).
+        events: Odbiorca zdarzeń (events.py); domyślnie przebieg nic nie wypisuje.
+        trace: Przebieg błędów do odtworzenia (ścieżka lub error_trace.ErrorTrace) zamiast losowania kanału.
+
+    Returns:
+        dict: Statystyki z GoBackNSimulation.run() / SelectiveRepeatSimulation.run().
+    """
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
     if override_p is not None:
-        config.GILBERT_P = override_p
+        sim_config = sim_config.replace(gilbert_p=override_p)
     if override_r is not None:
-        config.GILBERT_R = override_r
-
-    sender = Sender(config.WINDOW_SIZE, config.MAX_SEQ)
-    receiver = Receiver(config.MAX_SEQ)
+        sim_config = sim_config.replace(gilbert_r=override_r)
+    if seed is not None:
+        sim_config = sim_config.replace(seed=seed)
 
-    data_to_send = [f"Pakiet_{i + 1}" for i in range(config.TARGET_PACKETS)]
-    sent_data_idx = 0
+    return create_simulation(sim_config, realtime=realtime, events=events, trace=trace).run()
 
-    total_transmissions = 0
-    retransmissions = 0
 
-    print(f"\n{Colors.GRAY}--- START SYMULACJI (P={config.GILBERT_P}, R={config.GILBERT_R}) ---{Colors.RESET}")
+@functools.lru_cache(maxsize=None)
+def _simulate_cached(sim_config):
+    return simulate(sim_config)
 
-    start_time = time.time()
 
-    while len(receiver.received_payload) < config.TARGET_PACKETS:
-        time.sleep(0.001)
+def simulate_memoized(sim_config):
+    """
+    Wersja `simulate` zapamiętująca wyniki według konfiguracji.
 
-        ack_bytes_from_receiver = None
+    Ma sens tylko dla przebiegów powtarzalnych, dlatego wymaga ustalonego ziarna.
+    Zwracana jest kopia statystyk, aby wywołujący nie zmienił zapamiętanego wyniku.
+    """
+    if sim_config.seed is None:
+        raise ValueError("Zapamiętywanie wyników wymaga konfiguracji z ustalonym ziarnem (seed)")
+    stats = dict(_simulate_cached(sim_config))
+    stats['latencies'] = list(stats['latencies'])
+    return stats
 
-        # A) Nadajnik: Wysyłanie nowych danych
-        if sender._is_within_window(sender.next_seq_num) and sent_data_idx < config.TARGET_PACKETS:
-            data = data_to_send[sent_data_idx]
-            frame_obj = sender.process_data(data)
 
-            raw_bytes_out = channel.channel_simulate(frame_obj.to_bytes())
-
-            sent_data_idx += 1
-            total_transmissions += 1
-
-            ack_bytes_from_receiver = receiver.receive_frame(raw_bytes_out)
+def run_go_back_n_simulation(override_p=None, override_r=None, realtime=False, seed=None, sim_config=None,
+                             events=None, trace=None):
+    # Przebieg interaktywny - domyślnie z kolorowymi komunikatami w konsoli
+    if events is None:
+        events = ConsoleRenderer()
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
+    if override_p is not None:
+        sim_config = sim_config.replace(gilbert_p=override_p)
+    if override_r is not None:
+        sim_config = sim_config.replace(gilbert_r=override_r)
 
-        # Watchdog: Log informujący o restarcie
-        if sender.base != sender.next_seq_num and sender.timer_start is None:
-            print(f"{Colors.GRAY}[INFO] Watchdog restartuje timer (brak postępu)...{Colors.RESET}")
-            sender.start_timer()
+    print(f"\n{Colors.GRAY}--- START SYMULACJI {sim_config.arq_mode} "
+          f"(P={sim_config.gilbert_p}, R={sim_config.gilbert_r}) ---{Colors.RESET}")
 
-        # B) Nadajnik: Obsługa Timeout
-        if sender.is_timeout():
-            # Log informujący o przyczynie zatrzymania
-            print(f"{Colors.RED}[STOP] Timeout na pakiecie SN={sender.base}. Brak ACK. Retransmisja...{Colors.RESET}")
+    stats = simulate(sim_config, realtime=realtime, seed=seed, events=events, trace=trace)
+    efficiency = stats['efficiency']
 
-            added_transmissions = sender.retransmit_window(receiver)
-            total_transmissions += added_transmissions
-            retransmissions += added_transmissions
+    print(f"{Colors.GRAY}--- KONIEC PRZEBIEGU ---")
+    print(f"Czas symulowany: {stats['sim_time']:.3f}s (obliczenia: {stats['wall_time']:.2f}s) | "
+          f"Retransmisje: {stats['retransmissions']}")
+    if stats['rto'] is not None:
+        rto = stats['rto']
+        print(f"RTO: {rto['rto'] * 1000:.1f} ms (SRTT {rto['srtt'] * 1000 if rto['srtt'] is not None else 0:.1f} ms, "
+              f"próbki {rto['samples']}, pominięte (Karn) {rto['karn_skipped']}, podwojenia {rto['backoffs']})")
+    ack = stats['ack']
+    if sim_config.ack_policy != 'each' or sim_config.dup_ack_limit:
+        if ack['policy'] == 'SACK':
+            print(f"Potwierdzenia (SACK): wysłane {ack['acks_sent']} - ack_policy={sim_config.ack_policy} "
+                  f"i dup_ack_limit dotyczą tylko GBN")
+        else:
+            print(f"Potwierdzenia ({ack['policy']}): wysłane {ack['acks_sent']}, wstrzymane {ack['acks_deferred']}, "
+                  f"pominięte duplikaty {ack['dup_acks_suppressed']} | "
+                  f"Średni czas odzyskiwania: {ack['mean_recovery_time'] * 1000:.1f} ms")
+    if sim_config.dup_ack_threshold:
+        print(f"Szybkie retransmisje: {stats['fast_retransmits']} (pominięte w trakcie odzyskiwania: "
+              f"{stats['fast_retransmits_suppressed']}) | Timeouty: {stats['timeouts']}")
+    print(f"Użycie kanału: A->B {stats['data_bits']} b, B->A {stats['ack_bits']} b | "
+          f"Goodput na bit kanału: {stats['bit_efficiency']:.3f}")
+    print(f"Wydajność: {efficiency:.2f} | Narzut ({stats['checksum']}): nagłówki {stats['header_bits']} b, "
+          f"sumy kontrolne {stats['checksum_bits']} b{Colors.RESET}")
 
-            sender.stop_timer()
-            sender.start_timer()
+    return efficiency
 
-        # C) Nadajnik: Obsługa ACK
-        if ack_bytes_from_receiver is not None:
-            ack_frame = Frame.from_bytes(ack_bytes_from_receiver)
-            if not ack_frame.is_corrupt():
-                sender.on_ack(ack_frame.seq_num)
 
-        # D) Zarządzanie timerem
-        if sender.base == sender.next_seq_num and sent_data_idx >= config.TARGET_PACKETS:
-            sender.stop_timer()
+def compare_ack_policies(sim_config, seed=0, trace=None):
+    """
+    Uruchamia przebieg GBN z każdą polityką potwierdzeń na tym samym ziarnie kanału.
 
-    end_time = time.time()
-    duration = end_time - start_time
+    Polityki 'each' (bez limitu i z limitem duplikatów), 'every_k' i 'timer' korzystają
+    z ack_every, ack_delay i dup_ack_limit z `sim_config` (limit 1, gdy nie został ustawiony).
 
-    efficiency = config.TARGET_PACKETS / total_transmissions if total_transmissions > 0 else 0
+    Returns:
+        dict: Etykieta polityki -> statystyki przebiegu (liczniki polityki w stats['ack']).
+    """
+    sim_config = sim_config.replace(arq_mode='GBN', seed=seed)
+    dup_ack_limit = sim_config.dup_ack_limit or 1
+    variants = {
+        'each': dict(ack_policy='each', dup_ack_limit=0),
+        f'each+limit {dup_ack_limit}': dict(ack_policy='each', dup_ack_limit=dup_ack_limit),
+        f'every_k ({sim_config.ack_every})': dict(ack_policy='every_k', dup_ack_limit=0),
+        f'timer ({sim_config.ack_delay * 1000:g} ms)': dict(ack_policy='timer', dup_ack_limit=0),
+    }
+    return {label: simulate(sim_config.replace(**changes), trace=trace) for label, changes in variants.items()}
 
-    print(f"{Colors.GRAY}--- KONIEC PRZEBIEGU ---")
-    print(f"Czas: {duration:.2f}s | Retransmisje: {retransmissions}")
-    print(f"Wydajność: {efficiency:.2f}{Colors.RESET}")
 
-    return efficiency
+def format_ack_comparison(results):
+    """Tabela porównania polityk: oszczędność kanału zwrotnego kontra czas odzyskiwania po błędach."""
+    lines = [f"{'polityka':<20} {'ACK':>7} {'B->A [b]':>10} {'pominięte':>10} {'odzyskiwanie [ms]':>18} "
+             f"{'czas [s]':>9} {'wydajność':>10}"]
+    for label, stats in results.items():
+        ack = stats['ack']
+        lines.append(f"{label:<20} {ack['acks_sent']:>7} {stats['ack_bits']:>10} {ack['dup_acks_suppressed']:>10} "
+                     f"{ack['mean_recovery_time'] * 1000:>18.1f} {stats['sim_time']:>9.3f} {stats['efficiency']:>10.2f}")
+    return "\n".join(lines)
 
 
 if __name__ == "__main__":
-    run_go_back_n_simulation()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Symulacja protokołu ARQ w kanale Gilberta-Elliotta")
+    parser.add_argument('--mode', choices=['GBN', 'SR'], type=str.upper, default=None,
+                        help="Tryb ARQ: GBN (Go-Back-N) lub SR (Selective Repeat); domyślnie ARQ_MODE z config.py")
+    parser.add_argument('--compare', action='store_true',
+                        help="Uruchamia oba tryby na tym samym ziarnie kanału i porównuje wydajność")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--checksum', choices=list(CHECKSUMS), default=None,
+                        help="Suma kontrolna ramek; domyślnie CHECKSUM z config.py")
+    parser.add_argument('--trace', default=None, help="Zapisuje zdarzenia przebiegu do pliku JSON Lines")
+    parser.add_argument('--adaptive-rto', action='store_true',
+                        help="TIMEOUT wyliczany z pomiarów RTT (Jacobson/Karn) zamiast stałego TIMEOUT z config.py")
+    parser.add_argument('--seq-bits', type=int, default=None,
+                        help="Liczba bitów numeru sekwencyjnego (1-32); domyślnie SEQ_BITS z config.py")
+    parser.add_argument('--window', type=int, default=None, help="Rozmiar okna; domyślnie WINDOW_SIZE z config.py")
+    parser.add_argument('--fast-retransmit', type=int, default=None, metavar='N',
+                        help="Szybka retransmisja GBN po N zduplikowanych ACK (0 - wyłączona); domyślnie DUP_ACK_THRESHOLD")
+    parser.add_argument('--ack-policy', choices=list(ACK_POLICIES), default=None,
+                        help="Polityka potwierdzeń Odbiornika GBN; domyślnie ACK_POLICY z config.py")
+    parser.add_argument('--ack-every', type=int, default=None, metavar='K',
+                        help="ACK co K ramek w kolejności (polityka every_k); domyślnie ACK_EVERY")
+    parser.add_argument('--ack-delay', type=float, default=None,
+                        help="Maksymalne opóźnienie wstrzymanego ACK w sekundach; domyślnie ACK_DELAY")
+    parser.add_argument('--dup-ack-limit', type=int, default=None, metavar='N',
+                        help="Najwyżej N powtórzeń tego samego zduplikowanego ACK (0 - bez limitu); domyślnie DUP_ACK_LIMIT")
+    parser.add_argument('--compare-acks', action='store_true',
+                        help="Porównuje polityki potwierdzeń GBN na tym samym ziarnie kanału")
+    parser.add_argument('--replay', default=None,
+                        help="Odtwarza przebieg błędów z pliku (error_trace.py) zamiast losować kanał")
+    parser.add_argument('--quiet', action='store_true', help="Bez komunikatów protokołu i kanału w konsoli")
+    parser.add_argument('--log-level', choices=list(LEVELS), default='debug',
+                        help="Próg zdarzeń w konsoli i w pliku --trace (debug - wszystkie, info - odrzucenia ramek, "
+                             "warning - tylko timeouty i retransmisje)")
+    parser.add_argument('--instrument', default=None, metavar='PLIK',
+                        help="Mierzy etapy gorącej ścieżki (instrument.py) i zapisuje raport JSON do pliku")
+    parser.add_argument('--profile', action='store_true', help="Dołącza do raportu instrumentacji profil cProfile")
+    parser.add_argument('--trace-memory', action='store_true', help="Dołącza do raportu instrumentacji alokacje (tracemalloc)")
+    args = parser.parse_args()
+
+    sinks = [] if args.quiet else [ConsoleRenderer(level=args.log_level)]
+    if args.trace:
+        sinks.append(JsonlSink(args.trace, level=args.log_level))
+    run_events = MultiSink(*sinks)
+
+    base_config = SimConfig.from_module()
+    if args.mode is not None:
+        base_config = base_config.replace(arq_mode=args.mode)
+    if args.checksum is not None:
+        base_config = base_config.replace(checksum=args.checksum)
+    if args.adaptive_rto:
+        base_config = base_config.replace(adaptive_timeout=True)
+    # Numeracja i okno zmieniane razem - pośrednia konfiguracja mogłaby nie przejść walidacji
+    window_changes = {name: value for name, value in (('seq_bits', args.seq_bits), ('window_size', args.window))
+                      if value is not None}
+    if window_changes:
+        base_config = base_config.replace(**window_changes)
+    if args.fast_retransmit is not None:
+        base_config = base_config.replace(dup_ack_threshold=args.fast_retransmit)
+    ack_changes = {name: value for name, value in (('ack_policy', args.ack_policy), ('ack_every', args.ack_every),
+                                                   ('ack_delay', args.ack_delay), ('dup_ack_limit', args.dup_ack_limit))
+                   if value is not None}
+    if ack_changes:
+        base_config = base_config.replace(**ack_changes)
+
+    instrumentation = None
+    if args.instrument or args.profile or args.trace_memory:
+        instrumentation = Instrumentation(profile=args.profile, memory=args.trace_memory).start()
+
+    if args.compare_acks:
+        seed = args.seed if args.seed is not None else 0
+        print(f"\n{Colors.GRAY}--- POLITYKI POTWIERDZEŃ GBN (ziarno {seed}) ---{Colors.RESET}")
+        print(format_ack_comparison(compare_ack_policies(base_config, seed=seed, trace=args.replay)))
+    elif args.compare:
+        seed = args.seed if args.seed is not None else 0
+        results = {mode: run_go_back_n_simulation(seed=seed, sim_config=base_config.replace(arq_mode=mode),
+                                                  events=run_events, trace=args.replay)
+                   for mode in ('GBN', 'SR')}
+        print(f"\n{Colors.GRAY}--- PORÓWNANIE (ziarno {seed}) ---")
+        for mode, efficiency in results.items():
+            print(f"{mode:>4}: wydajność {efficiency:.2f}")
+        print(Colors.RESET, end="")
+    else:
+        run_go_back_n_simulation(seed=args.seed, sim_config=base_config, events=run_events, trace=args.replay)
+    run_events.close()
+
+    if instrumentation is not None:
+        instrumentation.stop()
+        print(f"\n{Colors.GRAY}--- INSTRUMENTACJA ---{Colors.RESET}")
+        print(format_report(instrumentation.report()))
+        if args.instrument:
+            instrumentation.write_json(args.instrument)
@@ -0,0 +1,177 @@
+"""
+Moduł z analitycznym modelem wydajności protokołów ARQ w kanale Gilberta-Elliotta.
+Prawdopodobieństwo błędu ramki jest liczone z dwustanowego łańcucha Markowa
+(potęgowanie macierzy 2x2 przez kwadraty), a wydajność Go-Back-N i Selective Repeat
+ze wzorów zamkniętych. Pozwala odpowiedzieć na pytanie o wydajność bez symulacji;
+symulacja służy wtedy tylko do walidacji modelu.
+"""
+
+# model.py
+from config import SimConfig
+from frame import Frame, DATA, ACK, frame_overhead, seq_width
+from checksum import get_checksum
+
+
+def _mat_mul(a, b):
+    """Iloczyn macierzy 2x2 zapisanych jako krotki ((a00, a01), (a10, a11))."""
+    return ((a[0][0] * b[0][0] + a[0][1] * b[1][0], a[0][0] * b[0][1] + a[0][1] * b[1][1]),
+            (a[1][0] * b[0][0] + a[1][1] * b[1][0], a[1][0] * b[0][1] + a[1][1] * b[1][1]))
+
+
+def _mat_pow(m, n):
+    """Potęga macierzy 2x2 (potęgowanie przez kwadraty - O(log n) mnożeń)."""
+    result = ((1.0, 0.0), (0.0, 1.0))
+    while n:
+        if n & 1:
+            result = _mat_mul(result, m)
+        m = _mat_mul(m, m)
+        n >>= 1
+    return result
+
+
+def stationary(p, r):
+    """
+    Rozkład stacjonarny łańcucha stanów (G, B).
+    Dla p = r = 0 łańcuch nie zmienia stanu - kanał pozostaje w stanie początkowym G.
+    """
+    if p + r == 0:
+        return 1.0, 0.0
+    return r / (p + r), p / (p + r)
+
+
+def frame_error_rate(p, r, k, h, nbits):
+    """
+    Prawdopodobieństwo, że w ramce o długości `nbits` przekłamany zostanie co najmniej jeden bit.
+
+    Przejście stanu poprzedza każdy bit (jak w GilbertChannel._gilbert_mask), a stan
+    przed ramką ma rozkład stacjonarny. Macierz A[i][j] = T[i][j] * (1 - błąd_j)
+    opisuje jeden bit bez błędu, więc P(ramka bez błędu) = pi * A^nbits * 1.
+    """
+    ok_g, ok_b = 1.0 - k, 1.0 - h
+    step = (((1.0 - p) * ok_g, p * ok_b),
+            (r * ok_g, (1.0 - r) * ok_b))
+    power = _mat_pow(step, nbits)
+    pi_g, pi_b = stationary(p, r)
+    success = pi_g * (power[0][0] + power[0][1]) + pi_b * (power[1][0] + power[1][1])
+    return min(1.0, max(0.0, 1.0 - success))
+
+
+def frame_bits(payload="Pakiet_1", checksum=None, seq_bytes=1):
+    """Długość ramki DATA z danym ładunkiem w bitach (zgodnie z Frame.to_bytes)."""
+    return len(Frame(DATA, 0, payload).to_bytes(checksum, seq_bytes)) * 8
+
+
+def ack_bits(checksum=None, seq_bytes=1):
+    """Długość ramki ACK/SACK w bitach (sam nagłówek z sumą kontrolną)."""
+    return len(Frame(ACK, 0).to_bytes(checksum, seq_bytes)) * 8
+
+
+def _mean_data_bits(target_packets, checksum=None, seq_bytes=1):
+    """Średnia długość ramki DATA dla ładunków "Pakiet_1" .. "Pakiet_N" używanych przez symulację."""
+    if target_packets <= 0:
+        return frame_bits(checksum=checksum, seq_bytes=seq_bytes)
+    total = sum(len(f"Pakiet_{i + 1}".encode('utf-8')) for i in range(target_packets))
+    return round((frame_overhead(checksum, seq_bytes) * target_packets + total) * 8 / target_packets)
+
+
+def gbn_efficiency(data_error, ack_error, window_size):
+    """
+    Wydajność Go-Back-N (pakiety / transmisje DATA).
+
+    Błąd ramki powoduje retransmisję całego okna (W ramek), stąd klasyczny wzór
+    (1 - P) / (1 + (W - 1) P). ACK jest kumulacyjny - zgubione ACK zastępuje każde
+    kolejne ACK z okna, więc timeout wymusza dopiero utrata wszystkich W potwierdzeń (P_ack^W).
+    Model zakłada niezależność błędów kolejnych ramek - zaniża wydajność, gdy burze są
+    dłuższe niż ramka (1/R rzędu długości ramki w bitach i więcej).
+    """
+    error = 1.0 - (1.0 - data_error) * (1.0 - ack_error ** window_size)
+    return (1.0 - error) / (1.0 + (window_size - 1) * error)
+
+
+def sr_efficiency(data_error, ack_error):
+    """
+    Wydajność Selective Repeat (pakiety / transmisje DATA).
+    Ramka jest powtarzana, dopóki ona i jej SACK nie przejdą bez błędu: (1 - P_data)(1 - P_ack).
+    """
+    return (1.0 - data_error) * (1.0 - ack_error)
+
+
+def predict(sim_config=None, nbits=None):
+    """
+    Przewiduje wyniki przebiegu bez symulacji.
+
+    Args:
+        sim_config (SimConfig): Parametry (kanał, okno, tryb ARQ, TIMEOUT, liczba pakietów).
+        nbits (int): Długość ramki DATA w bitach (domyślnie średnia dla ładunków symulacji).
+
+    Returns:
+        dict: data_error, ack_error, efficiency, transmissions, retransmissions, timeouts,
+              sim_time - szacunek czasu symulowanego (TIMEOUT na każdą serię retransmisji
+              plus czas serializacji wszystkich transmisji) oraz bit_efficiency - udział
+              bitów dostarczonych danych we wszystkich bitach ramek DATA i ACK.
+    """
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
+    checksum = get_checksum(sim_config.checksum)
+    seq_bytes = seq_width(sim_config.max_seq)
+    if nbits is None:
+        nbits = _mean_data_bits(sim_config.target_packets, checksum, seq_bytes)
+    ack_nbits = ack_bits(checksum, seq_bytes)
+    params = (sim_config.gilbert_p, sim_config.gilbert_r, sim_config.gilbert_k, sim_config.gilbert_h)
+    data_error = frame_error_rate(*params, nbits)
+    ack_error = frame_error_rate(*params, ack_nbits)
+
+    if sim_config.arq_mode == 'SR':
+        efficiency = sr_efficiency(data_error, ack_error)
+    else:
+        efficiency = gbn_efficiency(data_error, ack_error, sim_config.window_size)
+
+    packets = sim_config.target_packets
+    transmissions = packets / efficiency if efficiency > 0 else float('inf')
+    retransmissions = transmissions - packets
+    # Go-Back-N powtarza po timeoucie całe okno, Selective Repeat - pojedynczą ramkę
+    per_timeout = 1 if sim_config.arq_mode == 'SR' else sim_config.window_size
+    timeouts = retransmissions / per_timeout
+    sim_time = timeouts * sim_config.timeout + transmissions * nbits / sim_config.bit_rate
+    # Odbiornik GBN potwierdza każdą ramkę, a SR - tylko ramki bez błędu
+    acks = transmissions if sim_config.arq_mode == 'GBN' else transmissions * (1.0 - data_error)
+    payload_bits = packets * (nbits - frame_overhead(checksum, seq_bytes) * 8)
+    channel_bits = transmissions * nbits + acks * ack_nbits
+
+    return {
+        'data_error': data_error,
+        'ack_error': ack_error,
+        'efficiency': efficiency,
+        'transmissions': transmissions,
+        'retransmissions': retransmissions,
+        'timeouts': timeouts,
+        'sim_time': sim_time,
+        'bit_efficiency': payload_bits / channel_bits if channel_bits else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import main
+
+    parser = argparse.ArgumentParser(description="Analityczny model wydajności ARQ (z opcjonalną walidacją symulacją)")
+    parser.add_argument('--mode', choices=['GBN', 'SR'], type=str.upper, default=None)
+    parser.add_argument('--validate', type=int, default=0,
+                        help="Liczba przebiegów symulacji (różne ziarna) do porównania z modelem")
+    parser.add_argument('--packets', type=int, default=1000)
+    args = parser.parse_args()
+
+    base_config = SimConfig.from_module(target_packets=args.packets)
+    if args.mode is not None:
+        base_config = base_config.replace(arq_mode=args.mode)
+
+    scenarios = [(0.0, 1.0, 0.0), (0.0003, 0.05, base_config.gilbert_k), (0.001, 0.02, base_config.gilbert_k)]
+    print(f"{'P':>8} {'R':>6} {'K':>8} {'FER':>8} {'model':>7} {'symulacja':>10}")
+    for p, r, k in scenarios:
+        cfg = base_config.replace(gilbert_p=p, gilbert_r=r, gilbert_k=k)
+        prediction = predict(cfg)
+        simulated = ""
+        if args.validate:
+            runs = [main.simulate(cfg, seed=seed)['efficiency'] for seed in range(args.validate)]
+            simulated = f"{sum(runs) / len(runs):.3f}"
+        print(f"{p:>8} {r:>6} {k:>8} {prediction['data_error']:>8.4f} {prediction['efficiency']:>7.3f} {simulated:>10}")
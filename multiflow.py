@@ -0,0 +1,380 @@
+"""
+Moduł symulacji wielu równoległych przepływów Go-Back-N we wspólnym kanale.
+
+Każdy przepływ to para Nadajnik/Odbiornik z własną numeracją, buforem i timerem.
+Wszystkie przepływy dzielą jednego planistę zdarzeń (jeden kopiec - koszt zdarzenia
+O(log liczby zdarzeń), niezależnie od liczby przepływów), a po każdym zdarzeniu
+obsługiwany jest wyłącznie przepływ, którego ono dotyczy - nie ma pętli po wszystkich
+przepływach, więc symulacja skaluje się do dziesiątek tysięcy przepływów.
+
+Tryby kanału:
+    wspólny (shared_channel=True) - jeden kanał Gilberta-Elliotta i jedna para łączy FIFO
+        dla wszystkich przepływów (wspólne medium: ramki przepływów kolejkują się na łączu,
+        a stan burzy przechodzi z ramek jednego przepływu na ramki kolejnego),
+    osobny (shared_channel=False) - każdy przepływ ma własny kanał (ziarno wyprowadzone
+        z ziarna przebiegu i numeru przepływu) i własne łącza.
+
+Stan przepływu jest zwarty (_Flow ze __slots__): liczniki zamiast list pakietów, a spośród
+chwil wysłania pamiętane są tylko te dla pakietów jeszcze niedostarczonych. Sprawiedliwość
+podziału łącza mierzy indeks Jaina przepustowości przepływów.
+"""
+
+# multiflow.py
+import time
+from collections import deque
+from channel import GilbertChannel
+from config import SimConfig
+from sender import Sender
+from receiver import Receiver
+from simulation import _Link
+from events import sink_or_null, NULL_SINK, RETRANSMIT, FLOW_DONE
+from scheduler import EventScheduler, FRAME_ARRIVAL, ACK_ARRIVAL, TIMER_EXPIRY, FLOW_START, ACK_TIMER
+
+
+def jain_index(values):
+    """
+    Indeks sprawiedliwości Jaina: (suma x)^2 / (n * suma x^2).
+    1.0 - równy podział, 1/n - całość przypada jednemu przepływowi (0.0 dla pustej lub zerowej listy).
+    """
+    total = sum(values)
+    squares = sum(x * x for x in values)
+    if not squares:
+        return 0.0
+    return total * total / (len(values) * squares)
+
+
+class _FlowSink:
+    """Dodaje numer przepływu (pole `flow`) do zdarzeń przekazywanych odbiorcy."""
+
+    enabled = True
+
+    __slots__ = ('sink', 'flow')
+
+    def __init__(self, sink, flow):
+        self.sink = sink
+        self.flow = flow
+
+    def emit(self, kind, /, **fields):
+        self.sink.emit(kind, flow=self.flow, **fields)
+
+    def close(self):
+        pass
+
+
+class _Flow:
+    """
+    Stan jednego przepływu.
+
+    Attributes:
+        flow_id (int): Numer przepływu.
+        sender (Sender): Nadajnik przepływu.
+        receiver (Receiver): Odbiornik przepływu.
+        forward (_Link): Łącze danych (wspólne lub własne).
+        reverse (_Link): Łącze potwierdzeń (wspólne lub własne).
+        started_at (float or None): Chwila rozpoczęcia nadawania (None - jeszcze nie wystartował).
+        finished_at (float or None): Chwila dostarczenia ostatniego pakietu.
+        sent (int): Liczba pakietów przekazanych Nadajnikowi.
+        delivered (int): Liczba pakietów dostarczonych przez Odbiornik.
+        sent_at (deque): Chwile pierwszego wysłania pakietów jeszcze niedostarczonych.
+        latency_sum (float): Suma opóźnień dostarczonych pakietów.
+    """
+
+    __slots__ = ('flow_id', 'sender', 'receiver', 'forward', 'reverse', 'started_at', 'finished_at', 'sent',
+                 'delivered', 'sent_at', 'latency_sum', 'timer_armed_for', 'transmissions', 'retransmissions',
+                 'timeouts', 'fast_retransmits')
+
+    def __init__(self, flow_id, sender, receiver, forward, reverse):
+        self.flow_id = flow_id
+        self.sender = sender
+        self.receiver = receiver
+        self.forward = forward
+        self.reverse = reverse
+        self.started_at = None
+        self.finished_at = None
+        self.sent = 0
+        self.delivered = 0
+        self.sent_at = deque()
+        self.latency_sum = 0.0
+        self.timer_armed_for = None
+        self.transmissions = 0
+        self.retransmissions = 0
+        self.timeouts = 0
+        self.fast_retransmits = 0
+
+    def throughput(self, now):
+        """Pakiety dostarczone na sekundę od startu przepływu (do jego końca lub do chwili `now`)."""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else now
+        elapsed = end - self.started_at
+        return self.delivered / elapsed if elapsed > 0 else 0.0
+
+
+class MultiFlowSimulation:
+    """
+    N niezależnych sesji Go-Back-N multipleksowanych na wspólnym (lub osobnym) kanale.
+
+    Args:
+        sim_config (SimConfig): Parametry kanału i protokołu wspólne dla wszystkich przepływów
+                                (target_packets - liczba pakietów każdego przepływu).
+        flows (int): Liczba przepływów.
+        shared_channel (bool): Jeden kanał i para łączy dla wszystkich przepływów (wspólne medium)
+                               zamiast osobnych kanałów i łączy.
+        start_spread (float): Starty przepływów rozłożone równomiernie w [0, start_spread) sekund
+                              (0 - wszystkie startują jednocześnie).
+        until (float or None): Koniec pomiaru w czasie symulowanym (None - do dostarczenia
+                               wszystkich pakietów wszystkich przepływów).
+        events: Odbiorca zdarzeń; zdarzenia Nadajników i Odbiorników mają pole `flow`.
+
+    Attributes:
+        flows (list): Stan przepływów (_Flow).
+        scheduler (EventScheduler): Wspólna kolejka zdarzeń.
+        stats (dict): Liczniki zbiorcze przebiegu.
+    """
+
+    def __init__(self, sim_config=None, flows=100, shared_channel=True, start_spread=0.0, until=None,
+                 events=None):
+        if sim_config is None:
+            sim_config = SimConfig.from_module()
+        if sim_config.arq_mode != 'GBN':
+            raise ValueError("Symulacja wielu przepływów obsługuje tylko tryb GBN")
+        if flows < 1:
+            raise ValueError("Liczba przepływów musi być dodatnia")
+        if start_spread < 0:
+            raise ValueError("start_spread nie może być ujemne")
+        self.sim_config = sim_config
+        self.events = events = sink_or_null(events)
+        self.shared_channel = shared_channel
+        self.until = until
+        self.target_packets = sim_config.target_packets
+        self.scheduler = EventScheduler()
+
+        if shared_channel:
+            self.channel = GilbertChannel(sim_config, events=events)
+            forward = _Link(self.channel, sim_config.bit_rate)
+            reverse = _Link(self.channel, sim_config.bit_rate)
+        else:
+            self.channel = None
+        self.flows = []
+        for flow_id in range(flows):
+            flow_events = _FlowSink(events, flow_id) if events.enabled else NULL_SINK
+            if shared_channel:
+                channel = self.channel
+            else:
+                seed = None if sim_config.seed is None else f"{sim_config.seed}:{flow_id}"
+                channel = GilbertChannel(sim_config, seed=seed, events=flow_events)
+                forward = _Link(channel, sim_config.bit_rate)
+                reverse = _Link(channel, sim_config.bit_rate)
+            sender = Sender(clock=self.scheduler.clock, sim_config=sim_config, channel=channel, events=flow_events)
+            receiver = Receiver(sim_config=sim_config, channel=channel, events=flow_events,
+                                clock=self.scheduler.clock)
+            flow = _Flow(flow_id, sender, receiver, forward, reverse)
+            self.flows.append(flow)
+            self.scheduler.schedule_at(start_spread * flow_id / flows, FLOW_START, (flow, None))
+        self.unfinished = flows if self.target_packets > 0 else 0
+
+        self.stats = {
+            'flows': flows,
+            'transmissions': 0,
+            'retransmissions': 0,
+            'timeouts': 0,
+            'fast_retransmits': 0,
+            'acks': 0,
+        }
+
+    # --- Wysyłanie ---
+
+    def _transmit(self, flow, raw_bytes_out):
+        """Planuje przybycie ramki DATA przepływu do jego odbiornika."""
+        departure, arrival = flow.forward.transmit(self.scheduler.now, len(raw_bytes_out))
+        self.scheduler.schedule_at(arrival, FRAME_ARRIVAL, (flow, raw_bytes_out))
+        flow.transmissions += 1
+        return departure
+
+    def _send_new_frames(self, flow):
+        sender = flow.sender
+        target = self.target_packets
+        while flow.sent < target and sender._is_within_window(sender.next_seq_num):
+            flow.sent += 1
+            _, raw_bytes_out = sender.send_data(f"Pakiet_{flow.sent}")
+            flow.sent_at.append(self._transmit(flow, raw_bytes_out))
+
+    def _arm_timer(self, flow):
+        """Jak GoBackNSimulation._arm_timer, dla jednego przepływu."""
+        sender = flow.sender
+        if sender.base != sender.next_seq_num and sender.timer_start is None:
+            sender.start_timer()
+        if sender.base == sender.next_seq_num and flow.sent >= self.target_packets:
+            sender.stop_timer()
+
+        deadline = sender.timer_deadline()
+        if deadline is not None and deadline != flow.timer_armed_for:
+            flow.timer_armed_for = deadline
+            self.scheduler.schedule_at(deadline, TIMER_EXPIRY, (flow, sender.timer_start))
+
+    # --- Obsługa zdarzeń ---
+
+    def _on_flow_start(self, flow, _):
+        flow.started_at = self.scheduler.now
+
+    def _on_frame_arrival(self, flow, raw_bytes):
+        receiver = flow.receiver
+        ack_due = receiver.ack_due
+        ack_bytes = receiver.receive_frame(raw_bytes)
+        now = self.scheduler.now
+
+        # Dane dostarczone są tylko zliczane - bufor Odbiornika nie rośnie z liczbą pakietów
+        payload = receiver.received_payload
+        if payload:
+            for _ in payload:
+                flow.latency_sum += now - flow.sent_at.popleft()
+            flow.delivered += len(payload)
+            payload.clear()
+            if flow.delivered >= self.target_packets and flow.finished_at is None:
+                flow.finished_at = now
+                self.unfinished -= 1
+                if self.events.enabled:
+                    self.events.emit(FLOW_DONE, flow=flow.flow_id, time=now)
+
+        self._send_ack(flow, ack_bytes)
+
+        # Polityka potwierdzeń wstrzymała ACK - termin ustawiany jest tylko raz na wstrzymanie
+        if receiver.ack_due is not None and receiver.ack_due != ack_due:
+            self.scheduler.schedule_at(receiver.ack_due, ACK_TIMER, (flow, receiver.ack_due))
+
+    def _send_ack(self, flow, ack_bytes):
+        """Planuje przybycie ramki ACK przepływu do jego nadajnika."""
+        if ack_bytes is not None:
+            self.stats['acks'] += 1
+            _, arrival = flow.reverse.transmit(self.scheduler.now, len(ack_bytes))
+            self.scheduler.schedule_at(arrival, ACK_ARRIVAL, (flow, ack_bytes))
+
+    def _on_ack_timer(self, flow, ack_due):
+        # Zdarzenie nieaktualne - wstrzymane ACK zostało już wysłane
+        if ack_due == flow.receiver.ack_due:
+            self._send_ack(flow, flow.receiver.flush_ack())
+
+    def _on_ack_arrival(self, flow, ack_bytes):
+        sender = flow.sender
+        ack_frame = sender.decode(ack_bytes)
+        if not ack_frame.is_corrupt():
+            sender.on_ack(ack_frame.seq_num)
+            if sender.fast_retransmit_pending:
+                flow.fast_retransmits += 1
+                self._retransmit_window(flow, fast=True)
+
+    def _on_timer_expiry(self, flow, timer_start):
+        sender = flow.sender
+        if timer_start != sender.timer_start or not sender.is_timeout():
+            return
+        flow.timeouts += 1
+        self._retransmit_window(flow, fast=False)
+
+    def _retransmit_window(self, flow, fast):
+        """Go-Back-N: retransmituje niepotwierdzone ramki przepływu i restartuje jego timer."""
+        sender = flow.sender
+        sender.retransmission_started()
+        outstanding = sender.outstanding_frames()
+        if self.events.enabled:
+            self.events.emit(RETRANSMIT, flow=flow.flow_id, seq=sender.base, frames=len(outstanding),
+                             selective=False, fast=fast)
+        for frame in outstanding:
+            self._transmit(flow, sender.send_frame(frame))
+            flow.retransmissions += 1
+        sender.stop_timer()
+        sender.start_timer()
+
+    def run(self):
+        """
+        Wykonuje symulację do dostarczenia wszystkich pakietów (lub do chwili `until`).
+
+        Returns:
+            dict: Statystyki zbiorcze - transmisje, retransmisje, timeouty, efficiency,
+                  throughput (pakiety/s wszystkich przepływów), mean_latency,
+                  flow_throughput (przepustowość każdego przepływu), fairness (indeks Jaina),
+                  completed (liczba przepływów, które dostarczyły wszystkie pakiety).
+        """
+        handlers = {
+            FLOW_START: self._on_flow_start,
+            FRAME_ARRIVAL: self._on_frame_arrival,
+            ACK_ARRIVAL: self._on_ack_arrival,
+            TIMER_EXPIRY: self._on_timer_expiry,
+            ACK_TIMER: self._on_ack_timer,
+        }
+        scheduler = self.scheduler
+        until = self.until
+        wall_start = time.perf_counter()
+
+        while self.unfinished and len(scheduler):
+            kind, (flow, data) = scheduler.pop()
+            if until is not None and scheduler.now > until:
+                scheduler.now = until
+                break
+            handlers[kind](flow, data)
+            if flow.started_at is not None:
+                self._send_new_frames(flow)
+                self._arm_timer(flow)
+
+        return self._collect(time.perf_counter() - wall_start)
+
+    def _collect(self, wall_time):
+        stats = self.stats
+        now = self.scheduler.now
+        flows = self.flows
+        delivered = 0
+        latency_sum = 0.0
+        for flow in flows:
+            delivered += flow.delivered
+            latency_sum += flow.latency_sum
+            stats['transmissions'] += flow.transmissions
+            stats['retransmissions'] += flow.retransmissions
+            stats['timeouts'] += flow.timeouts
+            stats['fast_retransmits'] += flow.fast_retransmits
+        flow_throughput = [flow.throughput(now) for flow in flows]
+
+        stats['delivered'] = delivered
+        stats['completed'] = sum(1 for flow in flows if flow.finished_at is not None)
+        stats['efficiency'] = delivered / stats['transmissions'] if stats['transmissions'] else 0
+        stats['sim_time'] = now
+        stats['wall_time'] = wall_time
+        stats['throughput'] = delivered / now if now > 0 else 0.0
+        stats['mean_latency'] = latency_sum / delivered if delivered else 0.0
+        stats['flow_throughput'] = flow_throughput
+        stats['fairness'] = jain_index(flow_throughput)
+        return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    from colors import Colors
+
+    parser = argparse.ArgumentParser(description="Wiele przepływów Go-Back-N we wspólnym kanale")
+    parser.add_argument('--flows', type=int, default=100)
+    parser.add_argument('--packets', type=int, default=20, help="Liczba pakietów każdego przepływu")
+    parser.add_argument('--window', type=int, default=None, help="Rozmiar okna; domyślnie WINDOW_SIZE z config.py")
+    parser.add_argument('--per-link', action='store_true', help="Osobny kanał i łącza dla każdego przepływu")
+    parser.add_argument('--spread', type=float, default=0.0, help="Starty przepływów rozłożone w [0, spread) s")
+    parser.add_argument('--until', type=float, default=None, help="Koniec pomiaru w czasie symulowanym (s)")
+    parser.add_argument('--bit-rate', type=float, default=None, help="Przepływność łącza; domyślnie BIT_RATE")
+    parser.add_argument('--adaptive-rto', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    changes = {'target_packets': args.packets, 'seed': args.seed, 'adaptive_timeout': args.adaptive_rto}
+    if args.window is not None:
+        changes['window_size'] = args.window
+    if args.bit_rate is not None:
+        changes['bit_rate'] = args.bit_rate
+    cfg = SimConfig.from_module(**changes)
+
+    result = MultiFlowSimulation(cfg, flows=args.flows, shared_channel=not args.per_link,
+                                 start_spread=args.spread, until=args.until).run()
+    rates = sorted(result['flow_throughput'])
+    print(f"{Colors.GRAY}Przepływy: {result['flows']} (ukończone {result['completed']}) | "
+          f"Dostarczono: {result['delivered']} | Transmisje: {result['transmissions']} | "
+          f"Timeouty: {result['timeouts']}{Colors.RESET}")
+    print(f"Wydajność: {result['efficiency']:.3f} | Przepustowość łączna: {result['throughput']:.1f} pakietów/s | "
+          f"Średnie opóźnienie: {result['mean_latency'] * 1000:.1f} ms")
+    print(f"Przepustowość przepływu [pakiety/s]: min {rates[0]:.2f}, mediana {rates[len(rates) // 2]:.2f}, "
+          f"max {rates[-1]:.2f} | Indeks Jaina: {result['fairness']:.3f}")
+    print(f"{Colors.GRAY}Czas symulowany: {result['sim_time']:.2f} s | Czas obliczeń: {result['wall_time']:.2f} s{Colors.RESET}")
@@ -1,6 +1,11 @@
-from frame import Frame
-from channel import channel_simulate
+import time
+from frame import Frame, ACK, SACK, seq_width
+from checksum import get_checksum
+from channel import GilbertChannel
+from config import SimConfig
 from colors import Colors
+from events import (sink_or_null, FRAME_ACCEPTED, FRAME_CORRUPT, FRAME_OUT_OF_ORDER, FRAME_BUFFERED,
+                    FRAME_DUPLICATE, ACK_SENT, ACK_SUPPRESSED)
 
 
 class Receiver:
@@ -20,22 +25,74 @@ class Receiver:
         receiver (str): Identyfikator odbiorcy (używany w nagłówkach ACK).
         received_payload (list): Bufor przechowujący dane użytkowe z poprawnie zdekodowanych i
                                  ułożonych w kolejności ramek.
+        channel (GilbertChannel): Kanał, przez który odsyłane są potwierdzenia.
+        events: Odbiorca zdarzeń (events.py); domyślnie wyłączony.
+        checksum: Suma kontrolna ramek (checksum.py, z konfiguracji symulacji).
+        seq_bytes (int): Szerokość pola SN w nagłówku (1, 2 lub 4 bajty - wynika z max_seq).
+        clock (callable): Źródło czasu (timer opóźnionego ACK, czasy odzyskiwania po błędach).
+        ack_policy (str): Polityka potwierdzeń ('each', 'every_k' lub 'timer' - patrz config.py).
+        ack_every (int or None): Liczba ramek w kolejności na jedno ACK (None - tylko timer).
+        ack_delay (float): Maksymalne opóźnienie wstrzymanego ACK (sekundy).
+        dup_ack_limit (int): Limit powtórzeń tego samego zduplikowanego ACK (0 - bez limitu);
+                             nie dotyczy powtórzeń ramek już przyjętych.
+        window_size (int): Rozmiar okna Nadajnika (rozpoznawanie powtórzeń ramek już przyjętych).
+        ack_due (float or None): Termin wysłania wstrzymanego ACK (sterownik planuje wtedy flush_ack).
+        unacked (int): Ramki przyjęte w kolejności, których ACK jest wstrzymane.
+        last_ack (int or None): Numer ostatnio wysłanego ACK.
+        dup_count (int): Ile razy z rzędu wysłano ACK o numerze `last_ack` ponad pierwsze wysłanie.
+        acks_sent (int): Liczba wysłanych ramek ACK.
+        acks_deferred (int): Ramki przyjęte w kolejności bez natychmiastowego ACK (objęte późniejszym).
+        dup_acks_suppressed (int): Pominięte zduplikowane ACK (ponad dup_ack_limit).
+        recoveries (int): Liczba naprawionych luk (ramka oczekiwana przyjęta po odrzuceniu innych).
+        recovery_time (float): Łączny czas od pierwszej odrzuconej ramki do naprawy luki (sekundy).
     """
 
-    def __init__(self, max_seq, sender_id="B", receiver_id="A"):
+    def __init__(self, max_seq=None, sender_id="B", receiver_id="A", sim_config=None, channel=None, events=None,
+                 clock=time.time):
         """
         Inicjalizuje stan odbiornika.
 
         Args:
-            max_seq (int): Zakres numeracji sekwencyjnej (np. 8 dla 3 bitów).
+            max_seq (int): Zakres numeracji sekwencyjnej (np. 8 dla 3 bitów). Domyślnie z konfiguracji.
             sender_id (str): ID strony wysyłającej ACK (czyli tego odbiornika).
             receiver_id (str): ID strony odbierającej ACK (czyli nadajnika danych).
+            sim_config (SimConfig): Konfiguracja symulacji (domyślnie bieżące wartości modułu config).
+            channel (GilbertChannel): Kanał zwrotny (domyślnie nowy GilbertChannel z parametrami `sim_config`).
+            events: Odbiorca zdarzeń (domyślnie NULL_SINK - bez logowania).
+            clock (callable): Źródło czasu (w symulacji zdarzeń dyskretnych - zegar planisty).
         """
+        if sim_config is None:
+            sim_config = SimConfig.from_module()
         self.expected_seq_num = 0
-        self.max_seq = max_seq
+        self.max_seq = max_seq if max_seq is not None else sim_config.max_seq
+        self.channel = channel if channel is not None else GilbertChannel(sim_config)
         self.sender = sender_id
         self.receiver = receiver_id
         self.received_payload = []
+        self.events = sink_or_null(events)
+        self.checksum = get_checksum(sim_config.checksum)
+        self.seq_bytes = seq_width(self.max_seq)
+        self.clock = clock
+
+        self.ack_policy = sim_config.ack_policy
+        self.ack_every = {'each': 1, 'every_k': sim_config.ack_every, 'timer': None}[self.ack_policy]
+        self.ack_delay = sim_config.ack_delay
+        self.dup_ack_limit = sim_config.dup_ack_limit
+        self.window_size = sim_config.window_size
+        # Klasyczna polityka bez limitu duplikatów - ACK od razu, bez stanu polityki (wstrzymane ACK,
+        # powtórzenia duplikatu); liczniki acks_sent i czasy odzyskiwania są zbierane zawsze,
+        # bo ta polityka jest punktem odniesienia przy porównaniu (main.py --compare-acks)
+        self._immediate = self.ack_every == 1 and not self.dup_ack_limit
+        self.ack_due = None
+        self.unacked = 0
+        self.last_ack = None
+        self.dup_count = 0
+        self.acks_sent = 0
+        self.acks_deferred = 0
+        self.dup_acks_suppressed = 0
+        self.recoveries = 0
+        self.recovery_time = 0.0
+        self._gap_start = None
 
     def _ack_color_for_data_sn(self, ack_sn: int):
         """
@@ -63,47 +120,235 @@ class Receiver:
         Args:
             raw_bytes (bytes): Surowy ciąg bajtów odebrany z symulatora kanału.
 
+        Polityka potwierdzeń (ack_policy, dup_ack_limit) może wstrzymać ACK - wtedy metoda
+        zwraca None, a sterownik wywołuje flush_ack() w chwili `ack_due`.
+
         Returns:
             bytes: Zserializowana ramka ACK gotowa do wysłania zwrotnego przez kanał.
-                   Zwraca None, jeśli wejściowe dane były puste (utrata w kanale).
+                   Zwraca None, jeśli wejściowe dane były puste (utrata w kanale) lub ACK
+                   zostało wstrzymane albo pominięte przez politykę potwierdzeń.
         """
         if raw_bytes is None:
             return None
 
-        frame = Frame.from_bytes(raw_bytes)
+        frame = Frame.from_bytes(raw_bytes, self.checksum, self.seq_bytes)
+        reason = self.accept(frame)
+        if self._immediate:
+            return self.send_ack(reason, frame.seq_num)
+        return self._apply_policy(reason, frame.seq_num)
+
+    def _apply_policy(self, reason, sn):
+        """Decyduje, czy ACK po ramce `sn` wysłać od razu, wstrzymać, czy pominąć."""
+        if reason is None:
+            self.unacked += 1
+            if self.ack_every is not None and self.unacked >= self.ack_every:
+                return self.send_ack(None, sn)
+            self.acks_deferred += 1
+            if self.ack_due is None:
+                self.ack_due = self.clock() + self.ack_delay
+            return None
+
+        # Duplikat ACK (sygnał utraty) wysyłany od razu - chyba że przekroczył limit powtórzeń.
+        # Ramka już przyjęta (z ostatniego okna) oznacza, że Nadajnik nie dostał ACK - takie
+        # potwierdzenie jest wysyłane zawsze, inaczej każda jego retransmisja byłaby pomijana.
+        if (self.dup_ack_limit and self.last_ack == self.expected_seq_num and self.dup_count >= self.dup_ack_limit
+                and not (reason == 'order' and self._is_accepted_duplicate(sn))):
+            self.dup_acks_suppressed += 1
+            if self.events.enabled:
+                self.events.emit(ACK_SUPPRESSED, seq=self.expected_seq_num, count=self.dup_count)
+            return None
+        return self.send_ack(reason, sn)
+
+    def _is_accepted_duplicate(self, sn):
+        """
+        Czy `sn` może być powtórzeniem ramki już przyjętej (jednej z `window_size` przed oczekiwaną).
+        Przy max_seq < 2 * window_size zakres ten zachodzi na ramki z przyszłości - wtedy ACK
+        jest wysyłane (bezpieczniej potwierdzić nadmiarowo niż zablokować Nadajnik).
+        """
+        return 0 < (self.expected_seq_num - sn) % self.max_seq <= self.window_size
+
+    def flush_ack(self):
+        """
+        Wysyła wstrzymane ACK (timer opóźnionego potwierdzenia upłynął).
+
+        Returns:
+            bytes or None: Ramka ACK po przejściu przez kanał (None - nic nie było wstrzymane).
+        """
+        if not self.unacked:
+            self.ack_due = None
+            return None
+        return self.send_ack('delayed')
+
+    def ack_snapshot(self):
+        """Liczniki polityki potwierdzeń jako słownik (do statystyk przebiegu)."""
+        return {
+            'policy': self.ack_policy,
+            'acks_sent': self.acks_sent,
+            'acks_deferred': self.acks_deferred,
+            'dup_acks_suppressed': self.dup_acks_suppressed,
+            'recoveries': self.recoveries,
+            'mean_recovery_time': self.recovery_time / self.recoveries if self.recoveries else 0.0,
+        }
+
+    def accept(self, frame):
+        """
+        Maszyna stanów odbiornika GBN bez wysyłania potwierdzenia (kroki 2-3 z receive_frame).
+        Używana bezpośrednio przez stacje, które potwierdzają później (duplex.py).
+
+        Returns:
+            str or None: None - ramka przyjęta w kolejności, 'crc' - ramka uszkodzona,
+                         'order' - ramka poza kolejnością (odrzucona).
+        """
         sn = frame.seq_num
+        events = self.events
 
         # 1. Sprawdzenie CRC - priorytetowa weryfikacja integralności
         if frame.is_corrupt():
-            print(
-                f"{Colors.RED}[ODBIORNIK]: Otrzymano USZKODZONĄ ramkę DATA SN={sn} (Błąd CRC). ODRZUCAM.{Colors.RESET}")
-            # Wysłanie duplikatu ACK (Duplicate ACK) informuje nadawcę, że coś poszło nie tak
-            ack_sn = self.expected_seq_num
-            ack_frame = Frame('ACK', ack_sn, sender_id=self.sender, receiver_id=self.receiver)
-            print(f"{Colors.RED}[ODBIORNIK]: Powtarzam ACK SN={ack_sn} (po błędzie CRC w DATA).{Colors.RESET}")
-            return channel_simulate(ack_frame.to_bytes())
+            if self._gap_start is None:
+                self._gap_start = self.clock()
+            if events.enabled:
+                events.emit(FRAME_CORRUPT, seq=sn)
+            return 'crc'
 
         # 2. Sprawdzenie Kolejności (Logika "Sliding Window" rozmiar 1)
         if sn == self.expected_seq_num:
             # SUKCES: Ramka jest tą, na którą czekaliśmy
-            print(f"{Colors.for_sn(sn)}[ODBIORNIK]: Otrzymano POPRAWNĄ i OCZEKIWANĄ ramkę DATA SN={sn}.{Colors.RESET}")
             self.received_payload.append(frame.payload)
             self.expected_seq_num = (self.expected_seq_num + 1) % self.max_seq
+            if self._gap_start is not None:
+                # Koniec odzyskiwania - luka po odrzuconych ramkach została wypełniona
+                self.recoveries += 1
+                self.recovery_time += self.clock() - self._gap_start
+                self._gap_start = None
+            if events.enabled:
+                events.emit(FRAME_ACCEPTED, seq=sn)
+            return None
+
+        # BŁĄD KOLEJNOŚCI: Ramka z przyszłości lub duplikat starej
+        if self._gap_start is None:
+            self._gap_start = self.clock()
+        if events.enabled:
+            events.emit(FRAME_OUT_OF_ORDER, seq=sn, expected=self.expected_seq_num)
+        return 'order'
+
+    def send_ack(self, reason=None, data_seq=None):
+        """
+        Wysyła ACK dla NASTĘPNEGO oczekiwanego numeru (Next Expected) przez kanał zwrotny.
+
+        Po ramce uszkodzonej ('crc') lub poza kolejnością ('order') jest to duplikat ACK -
+        informuje nadawcę, że coś poszło nie tak (wymuszenie retransmisji).
+
+        Args:
+            reason (str or None): Powód wysłania (jak wynik accept; 'delayed' - ACK po timerze).
+            data_seq (int): Numer przyjętej ramki DATA (dla reason=None - kolor w konsoli).
+
+        Wysłane ACK obejmuje wszystkie wstrzymane potwierdzenia (kasuje timer opóźnionego ACK).
+
+        Returns:
+            bytes: Zserializowana ramka ACK po przejściu przez kanał.
+        """
+        ack_sn = self.expected_seq_num
+        self.acks_sent += 1
+        if not self._immediate:
+            self.unacked = 0
+            self.ack_due = None
+            if ack_sn == self.last_ack:
+                self.dup_count += 1
+            else:
+                self.last_ack = ack_sn
+                self.dup_count = 0
+        ack_frame = Frame(ACK, ack_sn, sender_id=self.sender, receiver_id=self.receiver)
+        if self.events.enabled:
+            if reason is None:
+                self.events.emit(ACK_SENT, seq=ack_sn, kind='ACK', reason=None, data_seq=data_seq)
+            else:
+                self.events.emit(ACK_SENT, seq=ack_sn, kind='ACK', reason=reason)
+        return self.channel.propagate(ack_frame.to_bytes(self.checksum, self.seq_bytes))
+
+
+class SelectiveRepeatReceiver(Receiver):
+    """
+    Implementuje warstwę odbiorczą protokołu Selective Repeat ARQ.
+
+    Odbiornik ma okno o rozmiarze WINDOW_SIZE: ramki spoza kolejności, ale mieszczące się
+    w oknie, są **buforowane** (a nie odrzucane) i potwierdzane selektywnie (SACK n).
+    Dane przekazywane są dalej w kolejności, gdy tylko luka przed nimi zostanie wypełniona.
+    Ramki uszkodzone są odrzucane bez potwierdzenia - nadajnik powtórzy je po upływie timera.
+    Każda ramka w oknie ma własny SACK, więc polityka potwierdzeń (ack_policy) dotyczy tylko GBN
+    (ack_policy odbiornika SR to zawsze 'SACK').
+
+    Attributes:
+        window_size (int): Rozmiar okna odbiorczego.
+        out_of_order (dict): Bufor ramek odebranych poza kolejnością (SeqNum -> dane), co najwyżej
+                             window_size wpisów.
+    """
+
+    def __init__(self, max_seq=None, sender_id="B", receiver_id="A", sim_config=None, channel=None,
+                 window_size=None, events=None, clock=time.time):
+        if sim_config is None:
+            sim_config = SimConfig.from_module()
+        super().__init__(max_seq, sender_id, receiver_id, sim_config=sim_config, channel=channel, events=events,
+                         clock=clock)
+        self.window_size = window_size if window_size is not None else sim_config.window_size
+        self.out_of_order = {}
+        # Polityka potwierdzeń z konfiguracji nie działa w SR - statystyki podają faktyczną
+        self.ack_policy = 'SACK'
+        self.ack_every = 1
+        self.dup_ack_limit = 0
+        self._immediate = True
+
+    def _send_sack(self, sn):
+        """Buduje potwierdzenie selektywne ramki `sn` i wysyła je kanałem zwrotnym."""
+        ack_frame = Frame(SACK, sn, sender_id=self.sender, receiver_id=self.receiver)
+        self.acks_sent += 1
+        if self.events.enabled:
+            self.events.emit(ACK_SENT, seq=sn, kind='SACK')
+        return self.channel.propagate(ack_frame.to_bytes(self.checksum, self.seq_bytes))
+
+    def receive_frame(self, raw_bytes):
+        """
+        Przetwarza ramkę odebraną z kanału (maszyna stanów odbiornika SR).
+
+        1. Ramka uszkodzona - odrzucana bez potwierdzenia.
+        2. Ramka w oknie [expected, expected + W) - buforowana i potwierdzana; dane z początku
+           okna są przekazywane dalej w kolejności.
+        3. Ramka z poprzedniego okna (duplikat, którego SACK zaginął) - ponowne potwierdzenie.
+        4. Pozostałe ramki są ignorowane.
+
+        Returns:
+            bytes: Zserializowana ramka SACK po przejściu przez kanał lub None (brak potwierdzenia).
+        """
+        if raw_bytes is None:
+            return None
+
+        frame = Frame.from_bytes(raw_bytes, self.checksum, self.seq_bytes)
+        sn = frame.seq_num
+
+        events = self.events
+        if frame.is_corrupt():
+            if events.enabled:
+                events.emit(FRAME_CORRUPT, seq=sn)
+            return None
+
+        offset = (sn - self.expected_seq_num) % self.max_seq
+        if offset < self.window_size:
+            if sn in self.out_of_order:
+                if events.enabled:
+                    events.emit(FRAME_DUPLICATE, seq=sn, buffered=True)
+            else:
+                if events.enabled:
+                    events.emit(FRAME_BUFFERED, seq=sn, expected=self.expected_seq_num)
+                self.out_of_order[sn] = frame.payload
+
+            # Przekazanie danych w kolejności, o ile luka na początku okna została wypełniona
+            while self.expected_seq_num in self.out_of_order:
+                self.received_payload.append(self.out_of_order.pop(self.expected_seq_num))
+                self.expected_seq_num = (self.expected_seq_num + 1) % self.max_seq
+            return self._send_sack(sn)
+
+        if offset >= self.max_seq - self.window_size:
+            if events.enabled:
+                events.emit(FRAME_DUPLICATE, seq=sn, buffered=False)
+            return self._send_sack(sn)
 
-            # Wysłanie ACK dla NASTĘPNEGO oczekiwanego numeru (Next Expected)
-            ack_sn = self.expected_seq_num
-            ack_frame = Frame('ACK', ack_sn, sender_id=self.sender, receiver_id=self.receiver)
-            print(f"{self._ack_color_for_data_sn(ack_sn)}[ODBIORNIK]: Wysyłam ACK SN={ack_sn}{Colors.RESET}")
-            return channel_simulate(ack_frame.to_bytes())
-
-        else:
-            # BŁĄD KOLEJNOŚCI: Ramka z przyszłości lub duplikat starej
-            print(
-                f"{Colors.for_sn(sn)}[ODBIORNIK]: Otrzymano ramkę DATA SN={sn} poza kolejnością. "
-                f"Oczekiwano SN={self.expected_seq_num}. ODRZUCAM.{Colors.RESET}"
-            )
-            # Ponowne wysłanie ACK dla oczekiwanego numeru (wymuszenie retransmisji u nadawcy)
-            ack_sn = self.expected_seq_num
-            ack_frame = Frame('ACK', ack_sn, sender_id=self.sender, receiver_id=self.receiver)
-            print(f"{Colors.GRAY}[ODBIORNIK]: Powtarzam ACK SN={ack_sn} (by wrócił do Base={ack_sn}).{Colors.RESET}")
-            return channel_simulate(ack_frame.to_bytes())
\ No newline at end of file
+        return None
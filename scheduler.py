@@ -0,0 +1,75 @@
+"""
+Moduł z kolejką zdarzeń dyskretnych (Discrete-Event Simulation).
+Zastępuje czekanie w czasie rzeczywistym (time.sleep, time.time) wirtualnym zegarem,
+dzięki czemu symulacja trwa tyle, ile zajmuje jej policzenie przez procesor.
+"""
+
+# scheduler.py
+import heapq
+import itertools
+import time
+
+# Rodzaje zdarzeń
+FRAME_ARRIVAL = 'FRAME_ARRIVAL'  # Ramka DATA dotarła do odbiornika
+ACK_ARRIVAL = 'ACK_ARRIVAL'  # Ramka ACK dotarła do nadajnika
+TIMER_EXPIRY = 'TIMER_EXPIRY'  # Upłynął czas timera retransmisji
+FLOW_START = 'FLOW_START'  # Przepływ rozpoczyna nadawanie (multiflow.py)
+ACK_TIMER = 'ACK_TIMER'  # Upłynął timer opóźnionego potwierdzenia (duplex.py)
+
+
+class EventScheduler:
+    """
+    Kopiec zdarzeń uporządkowanych według znacznika czasu (wirtualnego).
+
+    Zdarzenia o tym samym czasie są obsługiwane w kolejności dodania.
+    W trybie `realtime` planista "dogania" zegar ścienny przed wydaniem
+    każdego zdarzenia - to opcjonalna warstwa odtwarzająca dawne tempo symulacji.
+
+    Attributes:
+        now (float): Bieżący czas wirtualny w sekundach.
+        realtime (bool): Czy synchronizować czas wirtualny z rzeczywistym.
+    """
+
+    def __init__(self, realtime=False):
+        self.now = 0.0
+        self.realtime = realtime
+        self._queue = []
+        self._counter = itertools.count()
+        self._wall_start = None
+
+    def clock(self):
+        """Zwraca bieżący czas wirtualny (do przekazania jako zegar Nadajnika)."""
+        return self.now
+
+    def schedule_at(self, when, kind, data=None):
+        """Planuje zdarzenie `kind` na chwilę `when` (nie wcześniej niż teraz)."""
+        if when < self.now:
+            when = self.now
+        heapq.heappush(self._queue, (when, next(self._counter), kind, data))
+        return when
+
+    def schedule(self, delay, kind, data=None):
+        """Planuje zdarzenie `kind` za `delay` sekund czasu wirtualnego."""
+        return self.schedule_at(self.now + delay, kind, data)
+
+    def pop(self):
+        """
+        Wyjmuje najbliższe zdarzenie i przesuwa zegar do jego czasu.
+
+        Returns:
+            tuple: (rodzaj zdarzenia, dane zdarzenia).
+        """
+        when, _, kind, data = heapq.heappop(self._queue)
+
+        if self.realtime:
+            if self._wall_start is None:
+                self._wall_start = time.perf_counter() - self.now
+            lag = when - (time.perf_counter() - self._wall_start)
+            if lag > 0:
+                time.sleep(lag)
+
+        self.now = when
+        return kind, data
+
+    def __len__(self):
+        return len(self._queue)
@@ -1,10 +1,176 @@
-from frame import Frame
-from channel import channel_simulate
-from config import TIMEOUT
-from colors import Colors
+from frame import Frame, DATA, seq_width
+from checksum import get_checksum
+from channel import GilbertChannel
+from config import SimConfig
+from events import sink_or_null, FRAME_SENT, ACK_MOVED, ACK_IGNORED, TIMEOUT, DUP_ACK, FAST_RETRANSMIT
 import time
 
 
+class SendBuffer:
+    """
+    Bufor retransmisji Nadajnika w postaci pierścienia o stałym rozmiarze.
+
+    Ramka o numerze `seq` trafia do komórki `seq % capacity`. Pojemność to najmniejszy
+    dzielnik `max_seq` nie mniejszy niż rozmiar okna (dla max_seq = 2^n jest to
+    najbliższa potęga dwójki - wyliczana bez przeszukiwania, także dla 32-bitowej
+    numeracji), więc numery z jednego okna nigdy nie kolidują, a wszystkie operacje
+    są O(1) bez haszowania.
+    Obok ramek pierścień przechowuje ich zserializowane bajty (pamięć dla retransmisji).
+
+    Attributes:
+        capacity (int): Liczba komórek pierścienia (prealokowana).
+        frames (list): Ramki w komórkach (None - komórka wolna).
+        wire (list): Zserializowane bajty ramek (None - jeszcze nie serializowano).
+    """
+
+    __slots__ = ('capacity', 'frames', 'wire')
+
+    def __init__(self, window_size, max_seq):
+        capacity = max(1, window_size)
+        if max_seq & (max_seq - 1) == 0:
+            capacity = min(max_seq, 1 << (capacity - 1).bit_length())
+        while max_seq % capacity:
+            capacity += 1
+        self.capacity = capacity
+        self.frames = [None] * capacity
+        self.wire = [None] * capacity
+
+    def __setitem__(self, seq, frame):
+        slot = seq % self.capacity
+        self.frames[slot] = frame
+        self.wire[slot] = None
+
+    def get(self, seq, default=None):
+        """Zwraca ramkę o numerze `seq` (lub `default`, gdy jej nie ma w buforze)."""
+        frame = self.frames[seq % self.capacity]
+        if frame is None or frame.seq_num != seq:
+            return default
+        return frame
+
+    def __getitem__(self, seq):
+        frame = self.get(seq)
+        if frame is None:
+            raise KeyError(seq)
+        return frame
+
+    def __contains__(self, seq):
+        return self.get(seq) is not None
+
+    def pop(self, seq, default=None):
+        """Usuwa ramkę o numerze `seq` z bufora (wraz z jej bajtami) i ją zwraca."""
+        frame = self.get(seq)
+        if frame is None:
+            return default
+        slot = seq % self.capacity
+        self.frames[slot] = None
+        self.wire[slot] = None
+        return frame
+
+    def release(self, seq, count):
+        """
+        Zwalnia `count` kolejnych komórek począwszy od ramki `seq` (potwierdzenie kumulacyjne).
+        Zakres jest czyszczony przypisaniem wycinków (co najwyżej dwóch - przy przejściu
+        przez koniec pierścienia) zamiast pętli po komórkach.
+        """
+        first = seq % self.capacity
+        end = first + count
+        if end <= self.capacity:
+            self.frames[first:end] = self.wire[first:end] = [None] * count
+        else:
+            _clear_range(self.frames, first, count, None)
+            _clear_range(self.wire, first, count, None)
+
+    def __len__(self):
+        return self.capacity - self.frames.count(None)
+
+
+def _clear_range(ring, first, count, value):
+    """Wpisuje `value` do `count` kolejnych komórek pierścienia `ring` od komórki `first`."""
+    end = first + count
+    capacity = len(ring)
+    if end <= capacity:
+        ring[first:end] = [value] * count
+    else:
+        ring[first:] = [value] * (capacity - first)
+        ring[:end - capacity] = [value] * (end - capacity)
+
+
+class RtoEstimator:
+    """
+    Estymator czasu retransmisji (RTO) w stylu Jacobsona/Karelsa z regułą Karna.
+
+    Po każdej próbce RTT (tylko z ramek wysłanych raz - próbki z retransmisji są
+    niejednoznaczne i pomijane) aktualizowane są wygładzone RTT i jego zmienność:
+        RTTVAR = (1 - BETA) RTTVAR + BETA |SRTT - R|,   SRTT = (1 - ALPHA) SRTT + ALPHA R,
+        RTO = SRTT + K * RTTVAR   (obcięte do [min_rto, max_rto]).
+    Po timeoucie RTO jest podwajane (wykładnicze wycofanie) - najwyżej raz na czas
+    życia timera uzbrojonego z bieżącym RTO, aby seria timerów SR nie mnożyła wycofań.
+    Wycofanie trwa tylko do pierwszego nowego potwierdzenia (także ramki retransmitowanej,
+    z której nie ma próbki) - w burzy błędów kanał Gilberta gubi większość ramek, więc
+    czekanie na czystą próbkę utrzymywałoby RTO przy max_rto długo po końcu burzy.
+
+    Attributes:
+        rto (float): Bieżący czas retransmisji (sekundy).
+        base_rto (float): RTO wyliczone z próbek (bez wycofania).
+        srtt (float or None): Wygładzone RTT (None - brak próbek).
+        rttvar (float or None): Wygładzona zmienność RTT.
+        samples (int): Liczba przyjętych próbek.
+        karn_skipped (int): Liczba próbek pominiętych (potwierdzenie ramki retransmitowanej).
+        backoffs (int): Liczba podwojeń RTO.
+    """
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    __slots__ = ('rto', 'base_rto', 'srtt', 'rttvar', 'min_rto', 'max_rto', 'samples', 'karn_skipped', 'backoffs',
+                 '_backoff_epoch')
+
+    def __init__(self, initial_rto, min_rto, max_rto):
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.rto = self.base_rto = min(max(initial_rto, min_rto), max_rto)
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self.karn_skipped = 0
+        self.backoffs = 0
+        self._backoff_epoch = float('-inf')
+
+    def sample(self, rtt):
+        """Przyjmuje próbkę RTT (sekundy) i przelicza RTO (kasuje wycofanie)."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += self.BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.ALPHA * (rtt - self.srtt)
+        self.rto = self.base_rto = min(max(self.srtt + self.K * self.rttvar, self.min_rto), self.max_rto)
+        self.samples += 1
+
+    def on_timeout(self, timer_start, now):
+        """Podwaja RTO po timeoucie timera uruchomionego w chwili `timer_start`."""
+        if timer_start >= self._backoff_epoch:
+            self.rto = min(self.rto * 2, self.max_rto)
+            self.backoffs += 1
+            self._backoff_epoch = now
+
+    def on_progress(self):
+        """Nowe ACK przesunęło okno - kasuje wycofanie (RTO wraca do wartości z próbek RTT)."""
+        self.rto = self.base_rto
+
+    def snapshot(self):
+        """Stan estymatora jako słownik (do statystyk przebiegu)."""
+        return {
+            'rto': self.rto,
+            'srtt': self.srtt,
+            'rttvar': self.rttvar,
+            'samples': self.samples,
+            'karn_skipped': self.karn_skipped,
+            'backoffs': self.backoffs,
+        }
+
+
 class Sender:
     """
     Implementuje warstwę nadawczą protokołu Go-Back-N ARQ.
@@ -16,34 +182,95 @@ class Sender:
     Attributes:
         window_size (int): Rozmiar okna nadawczego (N). Definiuje przepustowość łącza.
         max_seq (int): Maksymalny numer sekwencyjny. Po jego osiągnięciu licznik wraca do 0.
+        seq_bytes (int): Szerokość pola SN w nagłówku (1, 2 lub 4 bajty - wynika z max_seq).
         base (int): Numer sekwencyjny najstarszej, wysłanej, ale jeszcze NIEpotwierdzonej ramki.
                     Jest to początek okna przesuwnego.
         next_seq_num (int): Numer sekwencyjny dla następnej nowej ramki danych (koniec okna).
-        buffer (dict): Bufor retransmisji. Przechowuje kopie obiektów Frame indeksowane przez SeqNum.
-        timer_start (float or None): Czas systemowy uruchomienia timera dla ramki o numerze `base`.
+        buffer (SendBuffer): Bufor retransmisji (pierścień prealokowany na rozmiar okna).
+                             Przechowuje ramki indeksowane przez SeqNum oraz ich zserializowane
+                             bajty - retransmisja niezmienionej ramki nie wymaga ponownej
+                             serializacji ani liczenia CRC.
+        timer_start (float or None): Czas uruchomienia timera dla ramki o numerze `base`.
+        clock (callable): Źródło czasu dla timera. Domyślnie zegar systemowy (time.time),
+                          w symulacji zdarzeń dyskretnych - zegar wirtualny planisty.
+        timeout (float): Czas oczekiwania na ACK (z konfiguracji symulacji; przy adaptacyjnym
+                         TIMEOUT - bieżące RTO estymatora).
+        rtt (RtoEstimator or None): Estymator RTT/RTO (tylko przy sim_config.adaptive_timeout).
+        send_time (list): Chwila pierwszego wysłania ramki w danej komórce bufora (próbki RTT).
+        retransmitted (list): Czy ramka w danej komórce była retransmitowana (reguła Karna).
+        dup_ack_threshold (int): Próg zduplikowanych ACK dla szybkiej retransmisji (0 - wyłączona).
+        dup_acks (int): Liczba kolejnych zduplikowanych ACK dla bieżącego `base`.
+        recover (int or None): Koniec okna w chwili ostatniej retransmisji. Do czasu potwierdzenia
+                               wszystkich ramek sprzed tej chwili kolejna szybka retransmisja jest
+                               blokowana (ochrona przed lawiną retransmisji).
+        fast_retransmit_pending (bool): Sterownik powinien natychmiast retransmitować okno.
+        fast_retransmits (int): Liczba wyzwolonych szybkich retransmisji.
+        fast_retransmits_suppressed (int): Liczba progów pominiętych w trakcie odzyskiwania.
+        ignored_acks (int): Liczba ACK spoza zakresu [base, next_seq_num] (np. przekłamanych
+                            mimo poprawnej sumy kontrolnej lub opóźnionych z poprzedniego cyklu numeracji).
+        channel (GilbertChannel): Kanał, przez który wysyłane są ramki.
+        events: Odbiorca zdarzeń (events.py); domyślnie wyłączony.
+        checksum: Suma kontrolna ramek (checksum.py, z konfiguracji symulacji).
     """
 
-    def __init__(self, window_size, max_seq):
-        self.window_size = window_size
-        self.max_seq = max_seq
+    def __init__(self, window_size=None, max_seq=None, clock=time.time, sim_config=None, channel=None,
+                 events=None):
+        """
+        Args:
+            window_size (int): Rozmiar okna (domyślnie z konfiguracji).
+            max_seq (int): Zakres numeracji (domyślnie z konfiguracji).
+            clock (callable): Źródło czasu dla timera.
+            sim_config (SimConfig): Konfiguracja symulacji (domyślnie bieżące wartości modułu config).
+            channel (GilbertChannel): Kanał nadawczy (domyślnie nowy GilbertChannel z parametrami `sim_config`).
+            events: Odbiorca zdarzeń (domyślnie NULL_SINK - bez logowania).
+        """
+        if sim_config is None:
+            sim_config = SimConfig.from_module()
+        self.window_size = window_size if window_size is not None else sim_config.window_size
+        self.max_seq = max_seq if max_seq is not None else sim_config.max_seq
+        self.seq_bytes = seq_width(self.max_seq)
+        self.timeout = sim_config.timeout
+        self.channel = channel if channel is not None else GilbertChannel(sim_config)
         self.base = 0
         self.next_seq_num = 0
-        self.buffer = {}
+        self.buffer = SendBuffer(self.window_size, self.max_seq)
         self.timer_start = None
+        self._deadline = None
+        self.clock = clock
+        self.events = sink_or_null(events)
+        self.checksum = get_checksum(sim_config.checksum)
+        self.rtt = None
+        if sim_config.adaptive_timeout:
+            self.rtt = RtoEstimator(sim_config.timeout, sim_config.min_timeout, sim_config.max_timeout)
+            self.timeout = self.rtt.rto
+        self.send_time = [None] * self.buffer.capacity
+        self.retransmitted = [False] * self.buffer.capacity
+        self.dup_ack_threshold = sim_config.dup_ack_threshold
+        self.dup_acks = 0
+        self.recover = None
+        self.fast_retransmit_pending = False
+        self.fast_retransmits = 0
+        self.fast_retransmits_suppressed = 0
+        self.ignored_acks = 0
 
     def _is_within_window(self, seq_num):
         """
         Weryfikuje, czy dany numer sekwencyjny mieści się w bieżącym oknie logicznym.
 
-        Uwzględnia cykliczność numeracji (modulo max_seq).
+        Uwzględnia cykliczność numeracji (modulo max_seq) - jedno odejmowanie modulo,
+        niezależnie od rozmiaru okna i szerokości numeracji.
         Warunek: (seq_num - base) % max_seq < window_size.
         """
         return (seq_num - self.base) % self.max_seq < self.window_size
 
     def start_timer(self):
-        """Inicjalizuje odliczanie czasu dla najstarszej niepotwierdzonej ramki (Base)."""
+        """
+        Inicjalizuje odliczanie czasu dla najstarszej niepotwierdzonej ramki (Base).
+        Termin jest ustalany przy starcie - późniejsza zmiana RTO nie przesuwa działającego timera.
+        """
         if self.timer_start is None:
-            self.timer_start = time.time()
+            self.timer_start = self.clock()
+            self._deadline = self.timer_start + self.timeout
             # print(f"{Colors.GRAY}[NADAJNIK]: STARTUJĘ timer dla Base={self.base}{Colors.RESET}")
 
     def stop_timer(self):
@@ -52,24 +279,78 @@ class Sender:
             self.timer_start = None
             # print(f"{Colors.GRAY}[NADAJNIK]: Okno puste – STOP timer.{Colors.RESET}")
 
+    def timer_deadline(self):
+        """Zwraca chwilę, w której upłynie timer (lub None, gdy timer jest zatrzymany)."""
+        if self.timer_start is None:
+            return None
+        return self._deadline
+
     def is_timeout(self):
         """
         Sprawdza stan timera.
 
         Returns:
-            bool: True, jeśli czas oczekiwania przekroczył stałą TIMEOUT zdefiniowaną w konfiguracji.
+            bool: True, jeśli czas oczekiwania osiągnął TIMEOUT zdefiniowany w konfiguracji symulacji.
                   Sygnalizuje to konieczność retransmisji.
         """
-        if self.timer_start is not None and (time.time() - self.timer_start) > TIMEOUT:
-            print(f"{Colors.GRAY}[NADAJNIK]: TIMEOUT! dla Base={self.base}{Colors.RESET}")
+        if self.timer_start is not None and self.clock() >= self.timer_deadline():
+            if self.events.enabled:
+                self.events.emit(TIMEOUT, seq=self.base, selective=False)
+            self._backoff(self.timer_start)
             return True
         return False
 
+    def _backoff(self, timer_start):
+        """Wykładnicze wycofanie RTO po timeoucie (tylko przy adaptacyjnym TIMEOUT)."""
+        if self.rtt is not None:
+            self.rtt.on_timeout(timer_start, self.clock())
+            self.timeout = self.rtt.rto
+
+    def _rtt_sample(self, slot):
+        """Przekazuje estymatorowi próbkę RTT ramki z komórki `slot` (z pominięciem retransmisji)."""
+        rtt = self.rtt
+        sent = self.send_time[slot]
+        if rtt is None or sent is None:
+            return
+        if self.retransmitted[slot]:
+            # Próbka niejednoznaczna, ale ACK dotarło - wycofanie nie jest już potrzebne
+            rtt.karn_skipped += 1
+            rtt.on_progress()
+        else:
+            rtt.sample(self.clock() - sent)
+        self.timeout = rtt.rto
+
+    def encoded(self, frame):
+        """
+        Zwraca zserializowaną postać ramki.
+        Dla ramek z bufora retransmisji korzysta z zapamiętanych bajtów (serializacja tylko raz).
+        """
+        buffer = self.buffer
+        slot = frame.seq_num % buffer.capacity
+        if buffer.frames[slot] is frame:
+            raw_bytes = buffer.wire[slot]
+            if raw_bytes is None:
+                raw_bytes = buffer.wire[slot] = frame.to_bytes(self.checksum, self.seq_bytes)
+            return raw_bytes
+        return frame.to_bytes(self.checksum, self.seq_bytes)
+
+    def decode(self, raw_bytes):
+        """Deserializuje ramkę (np. ACK) sumą kontrolną Nadajnika."""
+        return Frame.from_bytes(raw_bytes, self.checksum, self.seq_bytes)
+
     def send_frame(self, frame):
         """Metoda pomocnicza serializująca ramkę i przekazująca ją do symulatora kanału."""
-        color = Colors.for_sn(frame.seq_num)
-        # print(f"{color}[NADAJNIK]: Wysyłam [DATA: SN={frame.seq_num}, Pkt={frame.payload}]{Colors.RESET}")
-        return channel_simulate(frame.to_bytes())
+        if self.events.enabled:
+            self.events.emit(FRAME_SENT, seq=frame.seq_num)
+        if self.rtt is not None:
+            slot = frame.seq_num % self.buffer.capacity
+            if self.buffer.frames[slot] is frame:
+                # Pierwsze wysłanie ustala chwilę próbki RTT, kolejne oznaczają retransmisję
+                if self.send_time[slot] is None:
+                    self.send_time[slot] = self.clock()
+                else:
+                    self.retransmitted[slot] = True
+        return self.channel.propagate(self.encoded(frame))
 
     def process_data(self, data):
         """
@@ -77,19 +358,38 @@ class Sender:
 
         Tworzy ramkę, nadaje jej numer sekwencyjny `next_seq_num`, dodaje do bufora retransmisji
         i wysyła w kanał. Po wysłaniu przesuwa wskaźnik `next_seq_num`.
+
+        Returns:
+            Frame: Wysłana ramka (dane po przejściu przez kanał zwraca `send_data`).
+        """
+        return self.send_data(data)[0]
+
+    def send_data(self, data):
+        """
+        Jak `process_data`, ale zwraca również bajty ramki po przejściu przez kanał.
+        Sterowniki przekazują je dalej bez ponownej serializacji i ponownego przejścia
+        przez kanał - każda transmisja zużywa stan kanału dokładnie raz.
+
+        Returns:
+            tuple: (ramka, bajty po przejściu przez kanał).
         """
-        frame = Frame('DATA', self.next_seq_num, data)
+        frame = Frame(DATA, self.next_seq_num, data)
 
-        # Buforowanie ramki jest kluczowe dla mechanizmu ARQ
-        self.buffer[self.next_seq_num] = frame
+        # Buforowanie ramki jest kluczowe dla mechanizmu ARQ (bezpośrednio w komórce pierścienia)
+        buffer = self.buffer
+        slot = self.next_seq_num % buffer.capacity
+        buffer.frames[slot] = frame
+        buffer.wire[slot] = None
+        self.send_time[slot] = None
+        self.retransmitted[slot] = False
 
-        self.send_frame(frame)
+        raw_bytes_out = self.send_frame(frame)
 
         if self.base == self.next_seq_num:
             self.start_timer()
 
         self.next_seq_num = (self.next_seq_num + 1) % self.max_seq
-        return frame
+        return frame, raw_bytes_out
 
     def on_ack(self, ack_num):
         """
@@ -100,26 +400,106 @@ class Sender:
         o numerach sekwencyjnych wcześniejszych niż n (w sensie modulo).
 
         Działanie:
-        1. Przesuwa krawędź okna (`base`) do wartości `ack_num`.
-        2. Usuwa potwierdzone ramki z bufora retransmisji (zwalnia pamięć).
-        3. Restartuje timer dla nowej ramki `base` (jeśli okno nie jest puste).
+        1. Sprawdza, czy `ack_num` leży w zakresie (base, next_seq_num] - ACK spoza niego
+           jest odrzucany (zliczany w `ignored_acks`) i nie zmienia stanu Nadajnika.
+        2. Przesuwa krawędź okna (`base`) od razu do `ack_num` - koszt nie zależy od liczby
+           potwierdzonych ramek.
+        3. Zwalnia potwierdzone komórki bufora retransmisji jednym wywołaniem SendBuffer.release.
+        4. Restartuje timer dla nowej ramki `base` (jeśli okno nie jest puste).
+        5. ACK, które nie przesuwa okna (duplikat dla `base`), jest zliczane na potrzeby
+           szybkiej retransmisji (przy dup_ack_threshold > 0).
+
+        Zdarzenie ACK_MOVED jest jedno na potwierdzenie (podsumowanie z liczbą ramek),
+        niezależnie od tego, ile ramek zostało potwierdzonych.
+
+        Returns:
+            int: Liczba pozycji, o które przesunęło się okno.
         """
-        moved = 0
-        while self.base != ack_num:
-            print(
-                f"{Colors.GRAY}[NADAJNIK]: Otrzymano POPRAWNE ACK SN={ack_num}. Przesuwam BASE z {self.base} do {ack_num}.{Colors.RESET}")
-            self.buffer.pop(self.base, None)
-            self.base = (self.base + 1) % self.max_seq
-            moved += 1
+        old_base = self.base
+        max_seq = self.max_seq
+        moved = (ack_num - old_base) % max_seq
+
+        if moved == 0:
+            if self.dup_ack_threshold and old_base != self.next_seq_num:
+                self._on_dup_ack()
+            return 0
 
-        if moved > 0:
-            if self.base == self.next_seq_num:
-                self.stop_timer()
-            else:
-                self.stop_timer()  # Timer musi liczyć czas dla nowej najstarszej ramki
-                self.start_timer()
+        if moved > (self.next_seq_num - old_base) % max_seq:
+            # ACK dla ramki, która nie została jeszcze wysłana (lub z poprzedniego cyklu numeracji)
+            self.ignored_acks += 1
+            if self.events.enabled:
+                self.events.emit(ACK_IGNORED, ack=ack_num, base=old_base, next_seq=self.next_seq_num)
+            return 0
+
+        buffer = self.buffer
+        if moved == 1:
+            # Najczęstszy przypadek (ACK na każdą ramkę) - bez wywołania i budowania wycinków
+            slot = old_base % buffer.capacity
+            buffer.frames[slot] = None
+            buffer.wire[slot] = None
+        else:
+            buffer.release(old_base, moved)
+        self.base = ack_num % max_seq
+
+        self.dup_acks = 0
+        if self.recover is not None and (self.recover - old_base) % max_seq <= moved:
+            # Potwierdzono wszystko, co było w oknie w chwili retransmisji - koniec odzyskiwania
+            self.recover = None
+
+        # Próbka RTT z najnowszej potwierdzonej ramki (ACK jest odpowiedzią właśnie na nią)
+        if self.rtt is not None:
+            self._rtt_sample((ack_num - 1) % buffer.capacity)
+        if self.events.enabled:
+            self.events.emit(ACK_MOVED, ack=ack_num, old_base=old_base, new_base=self.base, kind='ACK',
+                             frames=moved)
+        if self.base == self.next_seq_num:
+            self.stop_timer()
+        else:
+            self.stop_timer()  # Timer musi liczyć czas dla nowej najstarszej ramki
+            self.start_timer()
         return moved
 
+    def _on_dup_ack(self):
+        """
+        Zlicza zduplikowane ACK dla `base`. Po osiągnięciu progu zgłasza sterownikowi szybką
+        retransmisję - chyba że trwa odzyskiwanie po poprzedniej retransmisji (wtedy
+        duplikaty są echem ramek już powtórzonych, a ponowna retransmisja tylko dokłada ruchu).
+        """
+        self.dup_acks += 1
+        events = self.events
+        if events.enabled:
+            events.emit(DUP_ACK, seq=self.base, count=self.dup_acks)
+        if self.dup_acks != self.dup_ack_threshold:
+            return
+        suppressed = self.recover is not None
+        if suppressed:
+            self.fast_retransmits_suppressed += 1
+        else:
+            self.fast_retransmit_pending = True
+            self.fast_retransmits += 1
+        if events.enabled:
+            events.emit(FAST_RETRANSMIT, seq=self.base, suppressed=suppressed)
+
+    def retransmission_started(self):
+        """
+        Informuje Nadajnika, że sterownik retransmituje okno (po timeoucie lub szybko).
+        Zeruje licznik duplikatów i ustala punkt `recover` blokujący kolejne szybkie retransmisje.
+        """
+        self.fast_retransmit_pending = False
+        self.dup_acks = 0
+        self.recover = self.next_seq_num
+
+    def outstanding_frames(self):
+        """Zwraca listę zbuforowanych ramek od `base` do `next_seq_num - 1` (kolejność wysyłki)."""
+        frames = []
+        current_seq = self.base
+        while current_seq != self.next_seq_num:
+            frame = self.buffer.get(current_seq)
+            if frame:
+                frames.append(frame)
+            current_seq = (current_seq + 1) % self.max_seq
+        return frames
+
     def retransmit_window(self, receiver):
         """
         Procedura obsługi błędu (Timeout).
@@ -141,10 +521,161 @@ class Sender:
 
                 ack_bytes = receiver.receive_frame(raw_bytes_out)
                 if ack_bytes is not None:
-                    ack_frame = Frame.from_bytes(ack_bytes)
+                    ack_frame = self.decode(ack_bytes)
                     if not ack_frame.is_corrupt():
                         self.on_ack(ack_frame.seq_num)
 
             current_seq = (current_seq + 1) % self.max_seq
 
-        return retransmitted_count
\ No newline at end of file
+        return retransmitted_count
+
+class SelectiveRepeatSender(Sender):
+    """
+    Implementuje warstwę nadawczą protokołu Selective Repeat ARQ.
+
+    W odróżnieniu od Go-Back-N każda wysłana ramka ma **własny timer**, a potwierdzenia
+    są selektywne (SACK n potwierdza wyłącznie ramkę n). Po timeoucie retransmitowana jest
+    tylko ramka, której timer upłynął - ramki już potwierdzone nie są wysyłane ponownie.
+    Okno przesuwa się, gdy potwierdzona zostanie ramka `base` (wraz z kolejnymi potwierdzonymi).
+
+    Attributes:
+        sent_at (list): Chwila uruchomienia timera ramki w danej komórce bufora (None - brak timera).
+        acked (list): Czy ramka w danej komórce bufora została potwierdzona.
+        deadlines (list): Termin timera ramki w danej komórce bufora (ustalany przy starcie timera).
+        started_timers (list): Timery (SeqNum, start, termin) uruchomione od ostatniego odczytu
+                               przez sterownik symulacji (do zaplanowania zdarzeń TIMER_EXPIRY).
+    """
+
+    def __init__(self, window_size=None, max_seq=None, clock=time.time, sim_config=None, channel=None,
+                 events=None):
+        super().__init__(window_size, max_seq, clock=clock, sim_config=sim_config, channel=channel, events=events)
+        if self.window_size > self.max_seq // 2:
+            raise ValueError(f"Selective Repeat wymaga okna <= max_seq / 2 ({self.max_seq // 2}), "
+                             f"podano {self.window_size}")
+        capacity = self.buffer.capacity
+        self.sent_at = [None] * capacity
+        self.deadlines = [None] * capacity
+        self.acked = [False] * capacity
+        self.started_timers = []
+
+    def start_frame_timer(self, seq_num):
+        """Uruchamia (lub restartuje) timer pojedynczej ramki z bieżącym TIMEOUT."""
+        start = self.clock()
+        slot = seq_num % self.buffer.capacity
+        deadline = start + self.timeout
+        self.sent_at[slot] = start
+        self.deadlines[slot] = deadline
+        self.started_timers.append((seq_num, start, deadline))
+
+    def is_frame_timeout(self, seq_num, start):
+        """
+        Sprawdza, czy upłynął timer ramki `seq_num` uruchomiony w chwili `start`.
+        Timer nieaktualny (ramka potwierdzona lub timer zrestartowany) nigdy nie zgłasza timeoutu.
+        """
+        slot = seq_num % self.buffer.capacity
+        if self.sent_at[slot] != start or self.buffer.get(seq_num) is None:
+            return False
+        if self.clock() >= self.deadlines[slot]:
+            if self.events.enabled:
+                self.events.emit(TIMEOUT, seq=seq_num, selective=True)
+            self._backoff(start)
+            return True
+        return False
+
+    def send_data(self, data):
+        """
+        Przetwarza dane warstwy wyższej.
+
+        Tworzy ramkę `next_seq_num`, buforuje ją, wysyła w kanał i uruchamia jej własny timer.
+
+        Returns:
+            tuple: (ramka, bajty po przejściu przez kanał).
+        """
+        seq_num = self.next_seq_num
+        frame = Frame(DATA, seq_num, data)
+
+        buffer = self.buffer
+        slot = seq_num % buffer.capacity
+        buffer.frames[slot] = frame
+        buffer.wire[slot] = None
+        self.acked[slot] = False
+        self.send_time[slot] = None
+        self.retransmitted[slot] = False
+
+        raw_bytes_out = self.send_frame(frame)
+        self.start_frame_timer(seq_num)
+
+        self.next_seq_num = (seq_num + 1) % self.max_seq
+        return frame, raw_bytes_out
+
+    def on_ack(self, ack_num):
+        """
+        Obsługuje potwierdzenie selektywne (SACK).
+
+        Działanie:
+        1. Ignoruje SACK spoza zakresu [base, next_seq_num) lub dla ramki już potwierdzonej.
+        2. Oznacza ramkę jako potwierdzoną i zatrzymuje jej timer.
+        3. Przesuwa `base` przez wszystkie kolejne potwierdzone ramki, zwalniając ich komórki.
+
+        Returns:
+            int: Liczba pozycji, o które przesunęło się okno.
+        """
+        if (ack_num - self.base) % self.max_seq >= (self.next_seq_num - self.base) % self.max_seq:
+            return 0
+
+        capacity = self.buffer.capacity
+        slot = ack_num % capacity
+        if self.acked[slot]:
+            return 0
+        self.acked[slot] = True
+        self.sent_at[slot] = None
+        self._rtt_sample(slot)
+
+        # Długość ciągu potwierdzonych ramek od `base`; komórki zwalniane są potem jednym zakresem
+        acked = self.acked
+        old_base = self.base
+        outstanding = (self.next_seq_num - old_base) % self.max_seq
+        moved = 0
+        while moved < outstanding and acked[(old_base + moved) % capacity]:
+            moved += 1
+        if moved == 0:
+            return 0
+
+        self.buffer.release(old_base, moved)
+        _clear_range(acked, old_base % capacity, moved, False)
+        self.base = (old_base + moved) % self.max_seq
+        if self.events.enabled:
+            self.events.emit(ACK_MOVED, ack=ack_num, old_base=old_base, new_base=self.base, kind='SACK',
+                             frames=moved)
+        return moved
+
+    def outstanding_frames(self):
+        """Zwraca listę wysłanych, ale jeszcze niepotwierdzonych ramek (kolejność wysyłki)."""
+        return [frame for frame in super().outstanding_frames()
+                if not self.acked[frame.seq_num % self.buffer.capacity]]
+
+    def retransmit_frame(self, seq_num):
+        """
+        Retransmituje pojedynczą ramkę (po upływie jej timera) i restartuje jej timer.
+
+        Returns:
+            bytes: Dane ramki po przejściu przez kanał.
+        """
+        raw_bytes_out = self.send_frame(self.buffer[seq_num])
+        self.start_frame_timer(seq_num)
+        return raw_bytes_out
+
+    def retransmit_window(self, receiver):
+        """
+        Retransmituje wyłącznie niepotwierdzone ramki z okna (wariant synchroniczny,
+        z natychmiastowym odbiorem potwierdzeń - jak w Go-Back-N).
+        """
+        retransmitted_count = 0
+        for frame in self.outstanding_frames():
+            ack_bytes = receiver.receive_frame(self.retransmit_frame(frame.seq_num))
+            retransmitted_count += 1
+            if ack_bytes is not None:
+                ack_frame = self.decode(ack_bytes)
+                if not ack_frame.is_corrupt():
+                    self.on_ack(ack_frame.seq_num)
+        return retransmitted_count
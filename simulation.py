@@ -0,0 +1,321 @@
+"""
+Moduł realizujący symulację Go-Back-N (oraz Selective Repeat) sterowaną zdarzeniami dyskretnymi.
+Nadajnik i Odbiornik są napędzane zdarzeniami z kolejki planisty (przybycie ramki,
+przybycie ACK, upływ timera), a opóźnienie propagacji, czas serializacji i TIMEOUT
+są odmierzane zegarem wirtualnym.
+"""
+
+# simulation.py
+import time
+from channel import GilbertChannel
+from error_trace import ReplayChannel
+from frame import header_size
+from config import SimConfig
+from sender import Sender, SelectiveRepeatSender
+from receiver import Receiver, SelectiveRepeatReceiver
+from events import sink_or_null, RETRANSMIT
+from scheduler import EventScheduler, FRAME_ARRIVAL, ACK_ARRIVAL, TIMER_EXPIRY, ACK_TIMER
+
+
+class _Link:
+    """
+    Jednokierunkowe łącze FIFO: czas serializacji + opóźnienie propagacji.
+    Ramki nie wyprzedzają się nawzajem (przybywają w kolejności wysłania).
+    Łącze zlicza ramki i bity wysłane w swoim kierunku (użycia kanału).
+    """
+
+    def __init__(self, channel, bit_rate):
+        self.channel = channel
+        self.bit_rate = bit_rate
+        self.free_at = 0.0
+        self.last_arrival = 0.0
+        self.frames = 0
+        self.bits = 0
+
+    def transmit(self, now, size_bytes):
+        """Zwraca (chwila wysłania, chwila przybycia) ramki o danym rozmiarze."""
+        self.frames += 1
+        self.bits += size_bytes * 8
+        departure = max(now, self.free_at)
+        self.free_at = departure + (size_bytes * 8) / self.bit_rate
+        arrival = max(self.free_at + self.channel.sample_delay(), self.last_arrival)
+        self.last_arrival = arrival
+        return departure, arrival
+
+
+class GoBackNSimulation:
+    """
+    Przebieg protokołu Go-Back-N napędzany planistą zdarzeń.
+
+    Każdy przebieg ma własny kanał (ziarno z konfiguracji), więc kilka symulacji
+    może działać jednocześnie bez wzajemnego wpływu.
+
+    Attributes:
+        sim_config (SimConfig): Parametry przebiegu.
+        channel (GilbertChannel): Kanał przebiegu (wspólny dla obu kierunków).
+        scheduler (EventScheduler): Kolejka zdarzeń z zegarem wirtualnym.
+        sender (Sender): Nadajnik (timer liczy czas wirtualny planisty).
+        receiver (Receiver): Odbiornik.
+        stats (dict): Liczniki przebiegu (transmisje, retransmisje, opóźnienia pakietów).
+                      Po przebiegu także bity ramek DATA i ACK z liczników łączy (data_bits,
+                      ack_bits) oraz bity przepuszczone przez kanał (channel_bits).
+        events: Odbiorca zdarzeń przekazywany Nadajnikowi, Odbiornikowi i kanałowi
+                (domyślnie wyłączony - przebieg nic nie wypisuje).
+
+    Przy podanym `trace` (ścieżka lub error_trace.ErrorTrace) kanał odtwarza zapisany
+    przebieg błędów zamiast go losować - warianty protokołu widzą te same błędy.
+    """
+
+    sender_class = Sender
+    receiver_class = Receiver
+
+    def __init__(self, sim_config=None, realtime=False, events=None, trace=None):
+        if sim_config is None:
+            sim_config = SimConfig.from_module()
+        self.sim_config = sim_config
+        self.events = events = sink_or_null(events)
+        if trace is None:
+            self.channel = GilbertChannel(sim_config, events=events)
+        else:
+            self.channel = ReplayChannel(trace, sim_config, events=events)
+        self.scheduler = EventScheduler(realtime=realtime)
+        self.sender = self.sender_class(clock=self.scheduler.clock, sim_config=sim_config, channel=self.channel,
+                                        events=events)
+        self.receiver = self.receiver_class(sim_config=sim_config, channel=self.channel, events=events,
+                                            clock=self.scheduler.clock)
+        self.target_packets = target_packets = sim_config.target_packets
+
+        self.data_to_send = [f"Pakiet_{i + 1}" for i in range(target_packets)]
+        self.sent_data_idx = 0
+        self.first_sent_at = []
+
+        self.forward = _Link(self.channel, sim_config.bit_rate)
+        self.reverse = _Link(self.channel, sim_config.bit_rate)
+        self._timer_armed_for = None
+        self._ack_armed_for = None
+
+        self.stats = {
+            'transmissions': 0,
+            'retransmissions': 0,
+            'timeouts': 0,
+            'fast_retransmits': 0,
+            'latencies': [],
+        }
+
+    # --- Wysyłanie ---
+
+    def _transmit(self, raw_bytes_out):
+        """Planuje przybycie (już przepuszczonej przez kanał) ramki DATA do odbiornika."""
+        departure, arrival = self.forward.transmit(self.scheduler.now, len(raw_bytes_out))
+        self.scheduler.schedule_at(arrival, FRAME_ARRIVAL, raw_bytes_out)
+        self.stats['transmissions'] += 1
+        return departure
+
+    def _send_new_frames(self):
+        """
+        A) Nadajnik: wysyła nowe dane, dopóki okno na to pozwala.
+        Ramka jest serializowana i przepuszczana przez kanał raz - w Sender.send_data.
+        """
+        sender = self.sender
+        while sender._is_within_window(sender.next_seq_num) and self.sent_data_idx < self.target_packets:
+            _, raw_bytes_out = sender.send_data(self.data_to_send[self.sent_data_idx])
+            self.first_sent_at.append(self._transmit(raw_bytes_out))
+            self.sent_data_idx += 1
+
+    def _arm_timer(self):
+        """Pilnuje, aby dla działającego timera nadajnika istniało zdarzenie TIMER_EXPIRY."""
+        sender = self.sender
+
+        # Watchdog: timer musi działać, dopóki są niepotwierdzone ramki
+        if sender.base != sender.next_seq_num and sender.timer_start is None:
+            sender.start_timer()
+
+        # D) Zarządzanie timerem
+        if sender.base == sender.next_seq_num and self.sent_data_idx >= self.target_packets:
+            sender.stop_timer()
+
+        # Zdarzenie jest planowane dla każdego nowego terminu (timer zrestartowany w tej samej chwili
+        # może mieć inny termin, gdy adaptacyjny TIMEOUT zmienił się w międzyczasie)
+        deadline = sender.timer_deadline()
+        if deadline is not None and deadline != self._timer_armed_for:
+            self._timer_armed_for = deadline
+            self.scheduler.schedule_at(deadline, TIMER_EXPIRY, sender.timer_start)
+
+    # --- Obsługa zdarzeń ---
+
+    def _on_frame_arrival(self, raw_bytes):
+        delivered_before = len(self.receiver.received_payload)
+        ack_bytes = self.receiver.receive_frame(raw_bytes)
+
+        now = self.scheduler.now
+        for idx in range(delivered_before, len(self.receiver.received_payload)):
+            self.stats['latencies'].append(now - self.first_sent_at[idx])
+
+        self._send_ack(ack_bytes)
+
+        # Polityka potwierdzeń wstrzymała ACK - zdarzenie ACK_TIMER dla nowego terminu
+        ack_due = self.receiver.ack_due
+        if ack_due is not None and ack_due != self._ack_armed_for:
+            self._ack_armed_for = ack_due
+            self.scheduler.schedule_at(ack_due, ACK_TIMER, ack_due)
+
+    def _send_ack(self, ack_bytes):
+        """Planuje przybycie (już przepuszczonej przez kanał) ramki ACK do nadajnika."""
+        if ack_bytes is not None:
+            _, arrival = self.reverse.transmit(self.scheduler.now, len(ack_bytes))
+            self.scheduler.schedule_at(arrival, ACK_ARRIVAL, ack_bytes)
+
+    def _on_ack_timer(self, ack_due):
+        # Zdarzenie nieaktualne - wstrzymane ACK zostało już wysłane
+        if ack_due != self.receiver.ack_due:
+            return
+        self._send_ack(self.receiver.flush_ack())
+
+    def _on_ack_arrival(self, ack_bytes):
+        # C) Nadajnik: Obsługa ACK
+        sender = self.sender
+        ack_frame = sender.decode(ack_bytes)
+        if not ack_frame.is_corrupt():
+            sender.on_ack(ack_frame.seq_num)
+            if sender.fast_retransmit_pending:
+                self.stats['fast_retransmits'] += 1
+                self._retransmit_window(fast=True)
+
+    def _on_timer_expiry(self, timer_start):
+        sender = self.sender
+        # Zdarzenie nieaktualne - timer został w międzyczasie zatrzymany lub zrestartowany
+        if timer_start != sender.timer_start or not sender.is_timeout():
+            return
+
+        # B) Nadajnik: Obsługa Timeout
+        self.stats['timeouts'] += 1
+        self._retransmit_window(fast=False)
+
+    def _retransmit_window(self, fast):
+        """Go-Back-N: retransmituje wszystkie niepotwierdzone ramki i restartuje timer."""
+        sender = self.sender
+        sender.retransmission_started()
+        outstanding = sender.outstanding_frames()
+        if self.events.enabled:
+            self.events.emit(RETRANSMIT, seq=sender.base, frames=len(outstanding), selective=False, fast=fast)
+
+        for frame in outstanding:
+            self._transmit(sender.send_frame(frame))
+            self.stats['retransmissions'] += 1
+
+        sender.stop_timer()
+        sender.start_timer()
+
+    def run(self):
+        """
+        Wykonuje symulację do momentu odebrania `target_packets` pakietów.
+
+        Returns:
+            dict: Statystyki przebiegu (m.in. efficiency, sim_time, wall_time, latencies).
+        """
+        handlers = {
+            FRAME_ARRIVAL: self._on_frame_arrival,
+            ACK_ARRIVAL: self._on_ack_arrival,
+            TIMER_EXPIRY: self._on_timer_expiry,
+            ACK_TIMER: self._on_ack_timer,
+        }
+        wall_start = time.perf_counter()
+
+        try:
+            self._send_new_frames()
+            self._arm_timer()
+
+            while len(self.receiver.received_payload) < self.target_packets and len(self.scheduler):
+                kind, data = self.scheduler.pop()
+                handlers[kind](data)
+                self._send_new_frames()
+                self._arm_timer()
+        finally:
+            self.close()
+
+        stats = self.stats
+        transmissions = stats['transmissions']
+        stats['delivered'] = len(self.receiver.received_payload)
+        stats['efficiency'] = self.target_packets / transmissions if transmissions > 0 else 0
+        stats['sim_time'] = self.scheduler.now
+        stats['wall_time'] = time.perf_counter() - wall_start
+        stats['fast_retransmits_suppressed'] = self.sender.fast_retransmits_suppressed
+        # Stan estymatora RTT/RTO (None przy stałym TIMEOUT)
+        stats['rto'] = self.sender.rtt.snapshot() if self.sender.rtt is not None else None
+        # Liczniki polityki potwierdzeń Odbiornika (wysłane, wstrzymane, pominięte ACK, czasy odzyskiwania)
+        stats['ack'] = self.receiver.ack_snapshot()
+        self._overhead_stats(stats)
+        return stats
+
+    def close(self):
+        """Zwalnia przebieg błędów otwarty z pliku (kanał odtwarzający); wywoływane na końcu run()."""
+        if isinstance(self.channel, ReplayChannel):
+            self.channel.close()
+
+    def _overhead_stats(self, stats):
+        """
+        Rozlicza bity wysłane w kanał (liczniki łączy w obu kierunkach): nagłówki, sumy
+        kontrolne i dostarczone dane użytkowe.
+        bit_efficiency = goodput na bit kanału: bity dostarczonych danych / wszystkie bity
+        ramek DATA i ACK. channel_bits to bity, które faktycznie przeszły przez model kanału -
+        przy jednym przejściu na transmisję równe data_bits + ack_bits.
+        """
+        stats['acks'] = self.reverse.frames
+        stats['data_bits'] = self.forward.bits
+        stats['ack_bits'] = self.reverse.bits
+        stats['channel_bits'] = self.channel.bit_uses
+        frames = stats['transmissions'] + stats['acks']
+        checksum = self.sender.checksum
+        stats['checksum'] = checksum.name
+        stats['header_bits'] = frames * header_size(self.sender.seq_bytes) * 8
+        stats['checksum_bits'] = frames * checksum.size * 8
+        stats['payload_bits'] = sum(len(p.encode('utf-8')) for p in self.receiver.received_payload) * 8
+        channel_bits = stats['data_bits'] + stats['ack_bits']
+        stats['bit_efficiency'] = stats['payload_bits'] / channel_bits if channel_bits else 0
+
+
+class SelectiveRepeatSimulation(GoBackNSimulation):
+    """
+    Przebieg protokołu Selective Repeat na tym samym planiście, łączach i kanale co Go-Back-N.
+
+    Każda ramka ma własne zdarzenie TIMER_EXPIRY, a po timeoucie retransmitowana
+    jest wyłącznie ta jedna ramka.
+    """
+
+    sender_class = SelectiveRepeatSender
+    receiver_class = SelectiveRepeatReceiver
+
+    def _arm_timer(self):
+        """Planuje zdarzenia TIMER_EXPIRY dla timerów ramek uruchomionych od ostatniego wywołania."""
+        sender = self.sender
+        for seq_num, start, deadline in sender.started_timers:
+            self.scheduler.schedule_at(deadline, TIMER_EXPIRY, (seq_num, start))
+        sender.started_timers.clear()
+
+    def _on_timer_expiry(self, timer):
+        seq_num, start = timer
+        sender = self.sender
+        # Zdarzenie nieaktualne - ramka potwierdzona lub timer zrestartowany
+        if not sender.is_frame_timeout(seq_num, start):
+            return
+
+        self.stats['timeouts'] += 1
+        if self.events.enabled:
+            self.events.emit(RETRANSMIT, seq=seq_num, frames=1, selective=True)
+
+        self._transmit(sender.retransmit_frame(seq_num))
+        self.stats['retransmissions'] += 1
+
+
+# Klasy symulacji dla trybów ARQ (SimConfig.arq_mode)
+SIMULATIONS = {
+    'GBN': GoBackNSimulation,
+    'SR': SelectiveRepeatSimulation,
+}
+
+
+def create_simulation(sim_config=None, realtime=False, events=None, trace=None):
+    """Tworzy symulację odpowiadającą trybowi ARQ z konfiguracji ('GBN' lub 'SR')."""
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
+    return SIMULATIONS[sim_config.arq_mode](sim_config, realtime=realtime, events=events, trace=trace)
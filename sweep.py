@@ -0,0 +1,209 @@
+"""
+Moduł realizujący równoległe przeglądy parametrów (Monte-Carlo) symulacji Go-Back-N.
+Przyjmuje siatkę lub losową próbkę parametrów kanału i protokołu (P, R, K, H, WINDOW_SIZE, tryb ARQ),
+rozdziela przebiegi na pulę procesów i zbiera wyniki w jedną tabelę.
+"""
+
+# sweep.py
+import argparse
+import contextlib
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from config import SimConfig
+
+# Nazwy parametrów punktu przeglądu -> pola SimConfig
+PARAMS = {
+    'p': 'gilbert_p',
+    'r': 'gilbert_r',
+    'k': 'gilbert_k',
+    'h': 'gilbert_h',
+    'window_size': 'window_size',
+    'mode': 'arq_mode',
+}
+
+
+def build_grid(**axes):
+    """
+    Buduje pełną siatkę punktów (iloczyn kartezjański osi).
+
+    Przykład: build_grid(p=[0.0003, 0.001], r=[0.02, 0.05], window_size=[4, 7])
+
+    Returns:
+        list: Lista słowników {nazwa_parametru: wartość}.
+    """
+    for name in axes:
+        if name not in PARAMS:
+            raise ValueError(f"Nieznany parametr przeglądu: {name}")
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[n] for n in names))]
+
+
+def sample_points(n, ranges, seed=None):
+    """
+    Losuje `n` punktów z podanych przedziałów (rozkład równomierny).
+
+    Args:
+        n (int): Liczba punktów.
+        ranges (dict): {nazwa_parametru: (min, max)}. Dla window_size losowana jest liczba całkowita,
+                       a dla mode - jedna z podanych wartości (np. ('GBN', 'SR')).
+        seed (int): Ziarno losowania punktów.
+    """
+    rng = random.Random(seed)
+    points = []
+    for _ in range(n):
+        point = {}
+        for name, (low, high) in ranges.items():
+            if name not in PARAMS:
+                raise ValueError(f"Nieznany parametr przeglądu: {name}")
+            if name == 'mode':
+                point[name] = rng.choice((low, high))
+            elif name == 'window_size':
+                point[name] = rng.randint(low, high)
+            else:
+                point[name] = rng.uniform(low, high)
+        points.append(point)
+    return points
+
+
+def _percentile(sorted_values, q):
+    """Percentyl metodą najbliższej rangi (dla pustej listy zwraca None)."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def _run_point(job):
+    """
+    Wykonuje pojedynczy przebieg w procesie roboczym.
+    Każde zadanie niesie własny obiekt SimConfig (z własnym ziarnem kanału).
+    """
+    import main
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        stats = main.simulate(job)
+
+    return {
+        'efficiency': stats['efficiency'],
+        'retransmissions': stats['retransmissions'],
+        'latencies': stats['latencies'],
+    }
+
+
+def point_config(point, base=None, **changes):
+    """Buduje SimConfig dla punktu przeglądu (pola pominięte w punkcie pochodzą z `base`)."""
+    if base is None:
+        base = SimConfig.from_module()
+    values = {PARAMS[name]: value for name, value in point.items()}
+    values.update(changes)
+    return base.replace(**values)
+
+
+def model_sweep(points, base_config):
+    """
+    Odpowiada na punkty przeglądu modelem analitycznym (model.py) - bez symulacji.
+    Percentyle opóźnień nie są modelowane (None).
+    """
+    import model
+
+    rows = []
+    for point in points:
+        sim_config = point_config(point, base_config)
+        prediction = model.predict(sim_config)
+        row = {name: getattr(sim_config, attr) for name, attr in PARAMS.items()}
+        row['efficiency'] = prediction['efficiency']
+        row['retransmissions'] = prediction['retransmissions']
+        row['latency_p50'] = row['latency_p90'] = row['latency_p99'] = None
+        rows.append(row)
+    return rows
+
+
+def run_sweep(points, target_packets=None, repeats=1, seed=0, workers=None, base_config=None, use_model=False):
+    """
+    Uruchamia symulację dla każdego punktu (`repeats` razy) w puli procesów.
+
+    Każdy przebieg dostaje własną konfigurację z własnym ziarnem kanału
+    (seed + numer przebiegu), więc wynik przeglądu jest powtarzalny niezależnie
+    od liczby procesów. Przy `use_model` wyniki pochodzą z modelu analitycznego
+    (natychmiast, bez puli procesów).
+
+    Returns:
+        list: Wiersze tabeli - parametry punktu oraz średnia wydajność, średnia liczba
+              retransmisji i percentyle opóźnienia dostarczenia pakietu (p50/p90/p99, w sekundach).
+    """
+    if base_config is None:
+        base_config = SimConfig.from_module()
+    if target_packets is not None:
+        base_config = base_config.replace(target_packets=target_packets)
+    if use_model:
+        return model_sweep(points, base_config)
+
+    jobs = []
+    for point in points:
+        for _ in range(repeats):
+            jobs.append(point_config(point, base_config, seed=seed + len(jobs)))
+
+    # Kilka przebiegów na zadanie puli ogranicza narzut komunikacji między procesami
+    chunksize = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_run_point, jobs, chunksize=chunksize))
+
+    rows = []
+    for i, point in enumerate(points):
+        chunk = results[i * repeats:(i + 1) * repeats]
+        latencies = sorted(lat for res in chunk for lat in res['latencies'])
+        row = {name: getattr(jobs[i * repeats], attr) for name, attr in PARAMS.items()}
+        row['efficiency'] = sum(res['efficiency'] for res in chunk) / repeats
+        row['retransmissions'] = sum(res['retransmissions'] for res in chunk) / repeats
+        row['latency_p50'] = _percentile(latencies, 50)
+        row['latency_p90'] = _percentile(latencies, 90)
+        row['latency_p99'] = _percentile(latencies, 99)
+        rows.append(row)
+    return rows
+
+
+def format_table(rows):
+    """Formatuje wiersze wyników jako tabelę tekstową."""
+    columns = list(PARAMS) + ['efficiency', 'retransmissions', 'latency_p50', 'latency_p90', 'latency_p99']
+    lines = [" | ".join(f"{c:>15}" for c in columns)]
+    for row in rows:
+        cells = []
+        for c in columns:
+            value = row[c]
+            cells.append(f"{value:>15.6g}" if isinstance(value, float) else f"{value!s:>15}")
+        lines.append(" | ".join(cells))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Przegląd parametrów symulacji ARQ")
+    parser.add_argument('--p', type=float, nargs='+', default=[config.GILBERT_P])
+    parser.add_argument('--r', type=float, nargs='+', default=[config.GILBERT_R])
+    parser.add_argument('--k', type=float, nargs='+', default=[config.GILBERT_K])
+    parser.add_argument('--h', type=float, nargs='+', default=[config.GILBERT_H])
+    parser.add_argument('--window', type=int, nargs='+', default=[config.WINDOW_SIZE])
+    parser.add_argument('--mode', type=str.upper, nargs='+', choices=['GBN', 'SR'], default=[config.ARQ_MODE])
+    parser.add_argument('--samples', type=int, default=0,
+                        help="Zamiast siatki: liczba losowych punktów z przedziałów [min, max] podanych osi")
+    parser.add_argument('--packets', type=int, default=config.TARGET_PACKETS)
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--model', action='store_true', help="Wyniki z modelu analitycznego zamiast symulacji")
+    args = parser.parse_args()
+
+    axes = {'p': args.p, 'r': args.r, 'k': args.k, 'h': args.h, 'window_size': args.window, 'mode': args.mode}
+    if args.samples:
+        sweep_points = sample_points(args.samples, {n: (v[0], v[-1]) if n == 'mode' else (min(v), max(v))
+                                                    for n, v in axes.items()}, seed=args.seed)
+    else:
+        sweep_points = build_grid(**axes)
+
+    table = run_sweep(sweep_points, target_packets=args.packets, repeats=args.repeats,
+                      seed=args.seed, workers=args.workers, use_model=args.model)
+    print(format_table(table))
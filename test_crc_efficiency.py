@@ -1,16 +1,65 @@
 # test_crc_efficiency.py
-import config
-from frame import Frame
-from channel import global_channel
+from config import SimConfig
+from frame import Frame, frame_overhead
+from checksum import CHECKSUMS, get_checksum
+from channel import GilbertChannel
+from error_trace import ReplayChannel
 from colors import Colors
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import random
 import struct
 
+# Przykładowy payload
+TEST_PAYLOAD = "TestData_1234567890" * 5
 
-def run_detection_test(iterations=10000, mode='BSC', prob=0.01):
+
+def _channel_config(mode, prob, sim_config):
+    """Konfiguracja kanału dla testu (dla Gilberta wymuszamy parametry)."""
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
+    if mode != 'BSC':
+        sim_config = sim_config.replace(gilbert_h=prob, gilbert_p=0.05, gilbert_r=0.1)
+    return sim_config
+
+
+def print_detection_table(counts):
+    """Wypisuje tabelkę zliczeń testu (słownik z run_detection_test / run_detection_batch)."""
+    corrupted_physically = counts['corrupted']
+    print(f"Suma kontrolna:        {counts['checksum']} ({counts['checksum_bits']} b sumy, "
+          f"{counts['overhead_bits']} b narzutu na ramkę)")
+    print(f"Wysłane ramki:         {counts['total']}")
+    print(f"Uszkodzone fizycznie:  {corrupted_physically}")
+    print(f"  -> Wykryte (CRC):    {counts['detected']}")
+    print(f"  -> NIEWYKRYTE:       {counts['undetected']} (To są błędy, które przechodzą cicho)")
+
+    if corrupted_physically > 0:
+        det_rate = (counts['detected'] / corrupted_physically) * 100
+        print(f"Skuteczność CRC:       {det_rate:.4f}%")
+    else:
+        print("Brak uszkodzeń w kanale.")
+
+
+def run_detection_test(iterations=10000, mode='BSC', prob=0.01, sim_config=None, trace=None):
     """
-    Testuje skuteczność wykrywania błędów przez CRC-32.
+    Testuje skuteczność wykrywania błędów przez sumę kontrolną (domyślnie CRC-32).
     Generuje tabelkę zliczeń: Uszkodzone Fizycznie vs Wykryte vs Niewykryte.
+
+    Args:
+        sim_config (SimConfig): Bazowa konfiguracja kanału (ziarno, parametry Gilberta, suma kontrolna).
+        trace: Przebieg błędów (ścieżka lub error_trace.ErrorTrace) odtwarzany w trybie Gilberta
+               zamiast losowania - kolejne testy widzą te same błędy.
+
+    Returns:
+        dict: Zliczenia total, corrupted, detected, undetected oraz narzut sumy kontrolnej.
     """
+    sim_config = _channel_config(mode, prob, sim_config)
+    checksum = get_checksum(sim_config.checksum)
+    if trace is not None and mode != 'BSC':
+        channel = ReplayChannel(trace, sim_config)
+    else:
+        channel = GilbertChannel(sim_config)
+
     total_frames = 0
     corrupted_physically = 0  # Fizycznie zmienione przez kanał
     detected_errors = 0  # CRC=Fail (Odrzucone)
@@ -18,23 +67,17 @@ def run_detection_test(iterations=10000, mode='BSC', prob=0.01):
 
     print(f"\n--- TEST: {mode} (Prob/Force={prob}) | Próbek: {iterations} ---")
 
-    # Przykładowy payload
-    original_payload = "TestData_1234567890" * 5
-    original_frame = Frame('DATA', 1, original_payload)
-    original_bytes = original_frame.to_bytes()
+    original_frame = Frame('DATA', 1, TEST_PAYLOAD)
+    original_bytes = original_frame.to_bytes(checksum)
 
     for _ in range(iterations):
         total_frames += 1
 
         # 1. Przepuść przez kanał (omijamy logikę ARQ, testujemy samą fizykę i CRC)
         if mode == 'BSC':
-            received_bytes = global_channel.propagate_bsc(original_bytes, prob)
+            received_bytes = channel.propagate_bsc(original_bytes, prob)
         else:
-            # Dla Gilberta wymuszamy parametry
-            config.GILBERT_H = prob
-            config.GILBERT_P = 0.05
-            config.GILBERT_R = 0.1
-            received_bytes = global_channel.propagate(original_bytes)
+            received_bytes = channel.propagate(original_bytes)
 
         # 2. Sprawdź, czy fizycznie doszło do zmiany bitów (porównanie bajtów)
         if original_bytes != received_bytes:
@@ -42,7 +85,7 @@ def run_detection_test(iterations=10000, mode='BSC', prob=0.01):
 
             # 3. Deserializacja i sprawdzenie werdyktu CRC
             # (Uwaga: normalnie receiver by to robił, tu robimy ręcznie do statystyki)
-            decoded_frame = Frame.from_bytes(received_bytes)
+            decoded_frame = Frame.from_bytes(received_bytes, checksum)
 
             if decoded_frame.is_corrupt():
                 detected_errors += 1
@@ -51,30 +94,126 @@ def run_detection_test(iterations=10000, mode='BSC', prob=0.01):
                 undetected_errors += 1
                 # print(f"{Colors.RED}!!! NIEWYKRYTY BŁĄD !!!{Colors.RESET}")
 
-    # --- WYNIKI (TABELKA) ---
-    print(f"Wysłane ramki:         {total_frames}")
-    print(f"Uszkodzone fizycznie:  {corrupted_physically}")
-    print(f"  -> Wykryte (CRC):    {detected_errors}")
-    print(f"  -> NIEWYKRYTE:       {undetected_errors} (To są błędy, które przechodzą cicho)")
+    counts = _with_overhead({'total': total_frames, 'corrupted': corrupted_physically,
+                             'detected': detected_errors, 'undetected': undetected_errors}, checksum)
+    print_detection_table(counts)
+    return counts
 
-    if corrupted_physically > 0:
-        det_rate = (detected_errors / corrupted_physically) * 100
-        print(f"Skuteczność CRC:       {det_rate:.4f}%")
+
+def _with_overhead(counts, checksum):
+    """Dopisuje do zliczeń nazwę sumy kontrolnej i jej narzut (w bitach na ramkę)."""
+    counts['checksum'] = checksum.name
+    counts['checksum_bits'] = checksum.size * 8
+    counts['overhead_bits'] = frame_overhead(checksum) * 8
+    return counts
+
+
+def _detect_chunk(job):
+    """
+    Zlicza wyniki dla jednej serii `count` kopii ramki (w procesie roboczym lub lokalnie).
+
+    Cała seria przechodzi przez kanał jednym przebiegiem, a werdykt CRC jest liczony
+    bezpośrednio na wycinkach bufora (Frame.crc_ok) - bez tworzenia obiektów Frame.
+    """
+    original_bytes, count, mode, prob, sim_config = job
+    channel = GilbertChannel(sim_config)
+    checksum = get_checksum(sim_config.checksum)
+    frames = [original_bytes] * count
+    size = len(original_bytes)
+
+    if mode == 'BSC':
+        view = memoryview(channel.propagate_bsc_batch(frames, prob))
+        received = (view[offset:offset + size] for offset in range(0, count * size, size))
     else:
-        print("Brak uszkodzeń w kanale.")
+        received = channel.propagate_batch(frames)
+
+    corrupted = detected = 0
+    crc_ok = Frame.crc_ok
+    for frame_bytes in received:
+        if frame_bytes != original_bytes:
+            corrupted += 1
+            if not crc_ok(frame_bytes, checksum):
+                detected += 1
+    return corrupted, detected
+
+
+def run_detection_batch(iterations=10000, mode='BSC', prob=0.01, sim_config=None, batch_size=4096, workers=1):
+    """
+    Wersja seryjna run_detection_test dla dużej liczby próbek (np. 10^7 przy p=0.3).
+
+    Próbki są dzielone na serie po `batch_size` ramek; seria `i` używa ziarna
+    (ziarno bazowe + i), więc wynik nie zależy od liczby procesów.
+    Kanał Gilberta przenosi stan tylko w obrębie serii.
+
+    Args:
+        batch_size (int): Liczba ramek przepuszczanych przez kanał jednym przebiegiem.
+        workers (int): Liczba procesów (1 - obliczenia w bieżącym procesie).
+
+    Returns:
+        dict: Zliczenia total, corrupted, detected, undetected oraz narzut sumy kontrolnej.
+    """
+    sim_config = _channel_config(mode, prob, sim_config)
+    checksum = get_checksum(sim_config.checksum)
+    base_seed = sim_config.seed if sim_config.seed is not None else random.randrange(1 << 32)
+    original_bytes = Frame('DATA', 1, TEST_PAYLOAD).to_bytes(checksum)
+
+    jobs = []
+    for index, start in enumerate(range(0, iterations, batch_size)):
+        count = min(batch_size, iterations - start)
+        jobs.append((original_bytes, count, mode, prob, sim_config.replace(seed=base_seed + index)))
+
+    print(f"\n--- TEST SERYJNY: {mode} (Prob/Force={prob}) | Próbek: {iterations} | Procesy: {workers} ---")
+    if workers == 1:
+        results = list(map(_detect_chunk, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_detect_chunk, jobs))
+
+    corrupted = sum(r[0] for r in results)
+    detected = sum(r[1] for r in results)
+    counts = _with_overhead({'total': iterations, 'corrupted': corrupted, 'detected': detected,
+                             'undetected': corrupted - detected}, checksum)
+    print_detection_table(counts)
+    return counts
 
 
 if __name__ == "__main__":
-    print("Symulacja weryfikacji modelu błędów i skuteczności CRC-32")
+    parser = argparse.ArgumentParser(description="Skuteczność wykrywania błędów przez sumy kontrolne ramek")
+    parser.add_argument('--iterations', type=int, default=5000, help="Liczba próbek na poziom prawdopodobieństwa")
+    parser.add_argument('--sequential', action='store_true', help="Dawny tryb: ramka po ramce (Frame.from_bytes)")
+    parser.add_argument('--batch-size', type=int, default=4096)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--checksum', nargs='+', choices=list(CHECKSUMS), default=None,
+                        help="Sumy kontrolne do porównania (domyślnie CHECKSUM z config.py)")
+    args = parser.parse_args()
+
+    print("Symulacja weryfikacji modelu błędów i skuteczności sum kontrolnych")
+    base_config = SimConfig.from_module(seed=args.seed)
+    checksums = args.checksum or [base_config.checksum]
 
     # Zgodnie z notatkami: "poziomy prawdopodobieństw: mało, średnio, dużo"
-
     # 1. MAŁO (BSC p=0.001) -> Powinno być 100% wykrytych
-    run_detection_test(iterations=5000, mode='BSC', prob=0.001)
-
     # 2. ŚREDNIO (BSC p=0.01) -> Dużo błędów, CRC wciąż powinno trzymać
-    run_detection_test(iterations=5000, mode='BSC', prob=0.01)
-
     # 3. DUŻO / EKSTREMALNIE (BSC p=0.3) -> 30% bitów zepsutych.
     # Tutaj struktura ramki może się tak rozsypać, że CRC przypadkiem spasuje (bardzo rzadkie, ale możliwe)
-    run_detection_test(iterations=5000, mode='BSC', prob=0.3)
\ No newline at end of file
+    summary = []
+    for name in checksums:
+        level_config = base_config.replace(checksum=name)
+        for level in (0.001, 0.01, 0.3):
+            if args.sequential:
+                counts = run_detection_test(iterations=args.iterations, mode='BSC', prob=level,
+                                            sim_config=level_config)
+            else:
+                counts = run_detection_batch(iterations=args.iterations, mode='BSC', prob=level,
+                                             sim_config=level_config, batch_size=args.batch_size,
+                                             workers=args.workers)
+            summary.append((level, counts))
+
+    if len(checksums) > 1:
+        # Porównanie: siła wykrywania vs narzut (mniej bitów sumy = lepsze goodput)
+        print(f"\n{Colors.GRAY}{'suma':>8} {'narzut [b]':>10} {'p':>6} {'uszkodzone':>10} {'niewykryte':>10}")
+        for level, counts in summary:
+            print(f"{counts['checksum']:>8} {counts['overhead_bits']:>10} {level:>6} "
+                  f"{counts['corrupted']:>10} {counts['undetected']:>10}")
+        print(Colors.RESET, end="")
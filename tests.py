@@ -9,18 +9,16 @@ i weryfikuje wydajność protokołu.
 
 # tests.py
 import main
-import config
+import model
+from config import SimConfig
 from colors import Colors
 
 
 def run_tests():
     print(f"{Colors.RED}=== ROZPOCZYNAM TESTY AUTOMATYCZNE ZGODNE ZE SPRAWOZDANIEM ==={Colors.RESET}\n")
 
-    # Zapiszmy oryginalne wartości
-    original_target = config.TARGET_PACKETS
-    original_k = config.GILBERT_K
-
-    config.TARGET_PACKETS = 20
+    # Każdy scenariusz dostaje własną konfigurację - moduł config pozostaje nietknięty
+    base_config = SimConfig(target_packets=20)
     YELLOW = Colors.FRAME_COLORS[2]
 
     # --- SCENARIUSZ 1: CZYSTE NIEBO ---
@@ -28,33 +26,28 @@ def run_tests():
     print("Parametry: P = 0.0, R = 1.0, K = 0.0 (Absolutny brak błędów)")
 
     # WYŁĄCZAMY SZUM TŁA (K=0), żeby kanał był idealny
-    config.GILBERT_K = 0.0
-
-    eff1 = main.run_go_back_n_simulation(override_p=0.0, override_r=1.0)
+    scenario1 = base_config.replace(gilbert_p=0.0, gilbert_r=1.0, gilbert_k=0.0)
+    eff1 = main.run_go_back_n_simulation(sim_config=scenario1)
 
-    print(f"-> Wynik raportu: 1.00. Wynik testu: {eff1:.2f}\n")
-
-    # --- PRZYWRACAMY SZUM DLA RESZTY ---
-    config.GILBERT_K = original_k
+    print(f"-> Wynik raportu: 1.00. Model: {model.predict(scenario1)['efficiency']:.2f}. Wynik testu: {eff1:.2f}\n")
 
     # --- SCENARIUSZ 2: LEKKI DESZCZ ---
     print(f"{YELLOW}SCENARIUSZ 2: Lekki Deszcz (Realistyczny){Colors.RESET}")
     print("Parametry: P = 0.0003, R = 0.05")
 
-    eff2 = main.run_go_back_n_simulation(override_p=0.0003, override_r=0.05)
+    scenario2 = base_config.replace(gilbert_p=0.0003, gilbert_r=0.05)
+    eff2 = main.run_go_back_n_simulation(sim_config=scenario2)
 
-    print(f"-> Wynik raportu: ~0.85-0.95. Wynik testu: {eff2:.2f}\n")
+    print(f"-> Wynik raportu: ~0.85-0.95. Model: {model.predict(scenario2)['efficiency']:.2f}. Wynik testu: {eff2:.2f}\n")
 
     # --- SCENARIUSZ 3: CIĘŻKA BURZA ---
     print(f"{YELLOW}SCENARIUSZ 3: Ciężka Burza (Ekstremalny){Colors.RESET}")
     print("Parametry: P = 0.001, R = 0.02")
 
-    eff3 = main.run_go_back_n_simulation(override_p=0.001, override_r=0.02)
-
-    print(f"-> Wynik raportu: < 0.50. Wynik testu: {eff3:.2f}\n")
+    scenario3 = base_config.replace(gilbert_p=0.001, gilbert_r=0.02)
+    eff3 = main.run_go_back_n_simulation(sim_config=scenario3)
 
-    # Przywracanie konfiguracji
-    config.TARGET_PACKETS = original_target
+    print(f"-> Wynik raportu: < 0.50. Model: {model.predict(scenario3)['efficiency']:.2f}. Wynik testu: {eff3:.2f}\n")
 
 
 if __name__ == "__main__":
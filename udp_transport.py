@@ -0,0 +1,406 @@
+"""
+Moduł realizujący transport ramek przez prawdziwe gniazda UDP na 127.0.0.1.
+Nadajnik i Odbiornik wymieniają zserializowane ramki (frame.py) przez gniazda
+nieblokujące, a pomiędzy nimi pracuje wymienny pośrednik zakłóceń (ImpairmentShim),
+który nakłada model Gilberta na datagramy. Pętla oparta na `selectors` odbiera
+datagramy partiami, co pozwala zmierzyć koszt wywołań systemowych przy pełnej
+szybkości łącza.
+"""
+
+# udp_transport.py
+import heapq
+import selectors
+import socket
+import time
+from channel import GilbertChannel, PassThroughChannel
+from config import SimConfig
+from sender import Sender, SelectiveRepeatSender
+from receiver import Receiver, SelectiveRepeatReceiver
+from events import sink_or_null, RETRANSMIT
+
+# Największy datagram odbierany jednym wywołaniem recv
+MAX_DATAGRAM = 65535
+
+
+def _udp_socket():
+    """Tworzy nieblokujące gniazdo UDP związane z losowym portem na 127.0.0.1."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.setblocking(False)
+    return sock
+
+
+class ImpairmentShim:
+    """
+    Pośrednik UDP nakładający zakłócenia kanału między Nadajnikiem a Odbiornikiem.
+
+    Datagramy odebrane przez gniazdo `a_side` (od Nadajnika) są przekazywane gniazdem
+    `b_side` do Odbiornika, a datagramy odebrane przez `b_side` (ACK) - gniazdem
+    `a_side` do Nadajnika. Każda partia datagramów przechodzi przez kanał jednym
+    wywołaniem `propagate_batch` (stan Gilberta przechodzi z ramki na ramkę).
+
+    Attributes:
+        channel: Model zakłóceń z metodą `propagate_batch` (None - przekazywanie bez zmian).
+        a_side (socket.socket): Gniazdo widziane przez Nadajnik.
+        b_side (socket.socket): Gniazdo widziane przez Odbiornik.
+        sender_addr (tuple): Adres Nadajnika (ustalany z pierwszego odebranego datagramu).
+        receiver_addr (tuple): Adres Odbiornika.
+    """
+
+    def __init__(self, channel=None, receiver_addr=None):
+        self.channel = channel
+        self.a_side = _udp_socket()
+        self.b_side = _udp_socket()
+        self.sender_addr = None
+        self.receiver_addr = receiver_addr
+
+    def impair(self, datagrams):
+        """Nakłada zakłócenia na partię datagramów."""
+        if self.channel is None:
+            return datagrams
+        return self.channel.propagate_batch(datagrams)
+
+    def forward(self, datagrams, stats):
+        """Przekazuje partię datagramów od Nadajnika do Odbiornika."""
+        _send_all(self.b_side, self.impair(datagrams), self.receiver_addr, stats)
+
+    def backward(self, datagrams, stats):
+        """Przekazuje partię potwierdzeń od Odbiornika do Nadajnika."""
+        _send_all(self.a_side, self.impair(datagrams), self.sender_addr, stats)
+
+    def close(self):
+        self.a_side.close()
+        self.b_side.close()
+
+
+def _drain(sock, batch_size, stats, with_address=False):
+    """
+    Odbiera z gniazda nieblokującego do `batch_size` datagramów (aż do pustej kolejki).
+
+    Returns:
+        list: Datagramy (lub krotki (datagram, adres) przy `with_address`).
+    """
+    batch = []
+    recv = sock.recvfrom if with_address else sock.recv
+    while len(batch) < batch_size:
+        try:
+            item = recv(MAX_DATAGRAM)
+        except BlockingIOError:
+            break
+        finally:
+            stats['syscalls'] += 1
+        batch.append(item)
+    return batch
+
+
+def _send_all(sock, datagrams, address, stats):
+    """
+    Wysyła partię datagramów. Przy pełnym buforze gniazda datagram jest tracony
+    (jak w prawdziwej sieci) - odtworzy go mechanizm ARQ.
+    """
+    for datagram in datagrams:
+        stats['syscalls'] += 1
+        try:
+            sock.sendto(datagram, address)
+        except BlockingIOError:
+            stats['send_drops'] += 1
+
+
+class UdpGoBackN:
+    """
+    Przebieg Go-Back-N przez gniazda UDP na 127.0.0.1 (czas rzeczywisty, bez sztucznych opóźnień).
+
+    Nadajnik, pośrednik zakłóceń i Odbiornik są obsługiwane w jednym wątku przez
+    `selectors` - pętla czeka na gotowość dowolnego gniazda lub na upływ timera.
+    Nadajnik i Odbiornik korzystają z PassThroughChannel, zakłócenia nakłada wyłącznie pośrednik.
+
+    Attributes:
+        sim_config (SimConfig): Parametry przebiegu (timeout warto skrócić - brak opóźnień propagacji).
+        shim (ImpairmentShim): Pośrednik zakłóceń między gniazdami.
+        batch_size (int): Największa liczba datagramów odbieranych przy jednej gotowości gniazda.
+        stats (dict): Liczniki przebiegu (w tym liczba wywołań systemowych i utraconych datagramów).
+        events: Odbiorca zdarzeń (domyślnie wyłączony).
+    """
+
+    sender_class = Sender
+    receiver_class = Receiver
+
+    def __init__(self, sim_config=None, batch_size=64, channel=True, events=None):
+        """
+        Args:
+            sim_config (SimConfig): Parametry przebiegu (domyślnie bieżące wartości modułu config).
+            batch_size (int): Rozmiar partii odbioru.
+            channel: Model zakłóceń pośrednika - True (GilbertChannel z konfiguracji),
+                     None (bez zakłóceń) lub dowolny obiekt z metodą `propagate_batch`.
+            events: Odbiorca zdarzeń Nadajnika, Odbiornika i kanału.
+        """
+        if sim_config is None:
+            sim_config = SimConfig.from_module()
+        self.events = events = sink_or_null(events)
+        if channel is True:
+            channel = GilbertChannel(sim_config, events=events)
+        self.sim_config = sim_config
+        self.batch_size = batch_size
+        self.target_packets = sim_config.target_packets
+        self.data_to_send = [f"Pakiet_{i + 1}" for i in range(self.target_packets)]
+        self.sent_data_idx = 0
+
+        pass_through = PassThroughChannel()
+        self.sender = self.sender_class(clock=time.monotonic, sim_config=sim_config, channel=pass_through,
+                                        events=events)
+        self.receiver = self.receiver_class(sim_config=sim_config, channel=pass_through, events=events,
+                                            clock=time.monotonic)
+
+        self.sender_sock = _udp_socket()
+        self.receiver_sock = _udp_socket()
+        self.shim = ImpairmentShim(channel, self.receiver_sock.getsockname())
+        self.sender_sock.connect(self.shim.a_side.getsockname())
+        self.receiver_sock.connect(self.shim.b_side.getsockname())
+
+        self.stats = {
+            'transmissions': 0,
+            'retransmissions': 0,
+            'timeouts': 0,
+            'fast_retransmits': 0,
+            'syscalls': 0,
+            'send_drops': 0,
+        }
+
+    # --- Nadajnik ---
+
+    def _transmit(self, datagrams):
+        self.stats['transmissions'] += len(datagrams)
+        _send_all(self.sender_sock, datagrams, self.shim.a_side.getsockname(), self.stats)
+
+    def _send_new_frames(self):
+        sender = self.sender
+        batch = []
+        while sender._is_within_window(sender.next_seq_num) and self.sent_data_idx < self.target_packets:
+            batch.append(sender.send_data(self.data_to_send[self.sent_data_idx])[1])
+            self.sent_data_idx += 1
+        if batch:
+            self._transmit(batch)
+
+    def _arm_timer(self):
+        """Watchdog timera (jak w GoBackNSimulation._arm_timer)."""
+        sender = self.sender
+        if sender.base != sender.next_seq_num and sender.timer_start is None:
+            sender.start_timer()
+        if sender.base == sender.next_seq_num and self.sent_data_idx >= self.target_packets:
+            sender.stop_timer()
+
+    def _next_deadline(self):
+        """Zwraca chwilę najbliższego timeoutu (None - brak działającego timera)."""
+        return self.sender.timer_deadline()
+
+    def _on_timeout(self):
+        sender = self.sender
+        if not sender.is_timeout():
+            return
+
+        self.stats['timeouts'] += 1
+        self._retransmit_window(fast=False)
+
+    def _retransmit_window(self, fast):
+        """Retransmituje niepotwierdzone okno jedną serią datagramów i restartuje timer."""
+        sender = self.sender
+        sender.retransmission_started()
+        batch = [sender.send_frame(frame) for frame in sender.outstanding_frames()]
+        if self.events.enabled:
+            self.events.emit(RETRANSMIT, seq=sender.base, frames=len(batch), selective=False, fast=fast)
+        self._transmit(batch)
+        self.stats['retransmissions'] += len(batch)
+
+        sender.stop_timer()
+        sender.start_timer()
+
+    def _on_acks(self, datagrams):
+        sender = self.sender
+        for ack_bytes in datagrams:
+            ack_frame = sender.decode(ack_bytes)
+            if not ack_frame.is_corrupt():
+                sender.on_ack(ack_frame.seq_num)
+                if sender.fast_retransmit_pending:
+                    self.stats['fast_retransmits'] += 1
+                    self._retransmit_window(fast=True)
+
+    # --- Odbiornik ---
+
+    def _on_frames(self, datagrams):
+        acks = []
+        for raw_bytes in datagrams:
+            ack_bytes = self.receiver.receive_frame(raw_bytes)
+            if ack_bytes is not None:
+                acks.append(ack_bytes)
+        _send_all(self.receiver_sock, acks, self.shim.b_side.getsockname(), self.stats)
+
+    def _flush_ack(self):
+        """Wysyła wstrzymane ACK (polityka potwierdzeń), jeśli minął jego termin."""
+        ack_due = self.receiver.ack_due
+        if ack_due is None or time.monotonic() < ack_due:
+            return
+        ack_bytes = self.receiver.flush_ack()
+        if ack_bytes is not None:
+            _send_all(self.receiver_sock, [ack_bytes], self.shim.b_side.getsockname(), self.stats)
+
+    # --- Pośrednik ---
+
+    def _on_shim_forward(self, items):
+        shim = self.shim
+        if shim.sender_addr is None:
+            shim.sender_addr = items[0][1]
+        shim.forward([datagram for datagram, _ in items], self.stats)
+
+    def _on_shim_backward(self, datagrams):
+        self.shim.backward(datagrams, self.stats)
+
+    def run(self):
+        """
+        Wykonuje przebieg do momentu odebrania `target_packets` pakietów.
+
+        Returns:
+            dict: Statystyki przebiegu (m.in. efficiency, wall_time, throughput w pakietach/s,
+                  syscalls_per_packet, send_drops).
+        """
+        selector = selectors.DefaultSelector()
+        handlers = {
+            self.shim.a_side: (self._on_shim_forward, True),
+            self.shim.b_side: (self._on_shim_backward, False),
+            self.receiver_sock: (self._on_frames, False),
+            self.sender_sock: (self._on_acks, False),
+        }
+        for sock in handlers:
+            selector.register(sock, selectors.EVENT_READ)
+
+        wall_start = time.perf_counter()
+        try:
+            while len(self.receiver.received_payload) < self.target_packets:
+                self._send_new_frames()
+                self._arm_timer()
+
+                deadline = self._next_deadline()
+                ack_due = self.receiver.ack_due
+                if ack_due is not None and (deadline is None or ack_due < deadline):
+                    deadline = ack_due
+                wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                events = selector.select(wait)
+                if not events:
+                    self._on_timeout()
+                    self._flush_ack()
+                    continue
+
+                for key, _ in events:
+                    handler, with_address = handlers[key.fileobj]
+                    batch = _drain(key.fileobj, self.batch_size, self.stats, with_address)
+                    if batch:
+                        handler(batch)
+                self._flush_ack()
+        finally:
+            selector.close()
+            self.close()
+        wall_time = time.perf_counter() - wall_start
+
+        stats = self.stats
+        transmissions = stats['transmissions']
+        stats['delivered'] = delivered = len(self.receiver.received_payload)
+        stats['efficiency'] = self.target_packets / transmissions if transmissions > 0 else 0
+        stats['wall_time'] = wall_time
+        stats['throughput'] = delivered / wall_time if wall_time > 0 else 0
+        stats['syscalls_per_packet'] = stats['syscalls'] / delivered if delivered else 0
+        stats['ack'] = self.receiver.ack_snapshot()
+        return stats
+
+    def close(self):
+        """Zamyka wszystkie gniazda przebiegu."""
+        self.sender_sock.close()
+        self.receiver_sock.close()
+        self.shim.close()
+
+
+class UdpSelectiveRepeat(UdpGoBackN):
+    """Przebieg Selective Repeat przez gniazda UDP (osobny timer dla każdej ramki)."""
+
+    sender_class = SelectiveRepeatSender
+    receiver_class = SelectiveRepeatReceiver
+
+    def __init__(self, sim_config=None, batch_size=64, channel=True, events=None):
+        super().__init__(sim_config, batch_size, channel, events)
+        self._timers = []
+
+    def _arm_timer(self):
+        sender = self.sender
+        for seq_num, start, deadline in sender.started_timers:
+            heapq.heappush(self._timers, (deadline, seq_num, start))
+        sender.started_timers.clear()
+
+    def _next_deadline(self):
+        # Timery nieaktualne (ramka potwierdzona lub timer zrestartowany) są pomijane
+        sender = self.sender
+        timers = self._timers
+        while timers:
+            _, seq_num, start = timers[0]
+            if sender.sent_at[seq_num % sender.buffer.capacity] == start and sender.buffer.get(seq_num) is not None:
+                return timers[0][0]
+            heapq.heappop(timers)
+        return None
+
+    def _on_timeout(self):
+        _, seq_num, start = heapq.heappop(self._timers)
+        sender = self.sender
+        if not sender.is_frame_timeout(seq_num, start):
+            return
+
+        self.stats['timeouts'] += 1
+        if self.events.enabled:
+            self.events.emit(RETRANSMIT, seq=seq_num, frames=1, selective=True)
+
+        self._transmit([sender.retransmit_frame(seq_num)])
+        self.stats['retransmissions'] += 1
+
+
+# Klasy przebiegów UDP dla trybów ARQ (SimConfig.arq_mode)
+TRANSPORTS = {
+    'GBN': UdpGoBackN,
+    'SR': UdpSelectiveRepeat,
+}
+
+
+def run_udp(sim_config=None, batch_size=64, channel=True, events=None):
+    """Uruchamia jeden przebieg przez gniazda UDP i zwraca jego statystyki."""
+    if sim_config is None:
+        sim_config = SimConfig.from_module()
+    return TRANSPORTS[sim_config.arq_mode](sim_config, batch_size, channel, events).run()
+
+
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+    import os
+
+    parser = argparse.ArgumentParser(description="Przebieg ARQ przez gniazda UDP na 127.0.0.1")
+    parser.add_argument('--mode', choices=['GBN', 'SR'], type=str.upper, default=None)
+    parser.add_argument('--packets', type=int, default=20000)
+    parser.add_argument('--window', type=int, default=None)
+    parser.add_argument('--seq-bits', type=int, default=None)
+    parser.add_argument('--timeout', type=float, default=0.02,
+                        help="TIMEOUT w sekundach (na localhost RTT jest rzędu mikrosekund)")
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--ideal', action='store_true', help="Pośrednik bez zakłóceń")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    base_config = SimConfig.from_module(target_packets=args.packets, timeout=args.timeout, seed=args.seed)
+    if args.seq_bits is not None:
+        base_config = base_config.replace(seq_bits=args.seq_bits)
+    if args.window is not None:
+        base_config = base_config.replace(window_size=args.window)
+    if args.mode is not None:
+        base_config = base_config.replace(arq_mode=args.mode)
+
+    print(f"Tryb {base_config.arq_mode}, okno {base_config.window_size}, {args.packets} pakietów")
+    print(f"{'partia':>7} {'pakiety/s':>11} {'wydajność':>10} {'syscall/pakiet':>15} {'utracone':>9}")
+    for batch_size in args.batch:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            stats = run_udp(base_config, batch_size, channel=None if args.ideal else True)
+        print(f"{batch_size:>7} {stats['throughput']:>11,.0f} {stats['efficiency']:>10.2f} "
+              f"{stats['syscalls_per_packet']:>15.2f} {stats['send_drops']:>9}")
@@ -8,12 +8,23 @@ Weryfikuje poprawność działania poszczególnych komponentów systemu w izolac
 # ... reszta kodu bez zmian ...
 
 # unit_tests.py
+import json
 import unittest
-import config
+import zlib
+from config import SimConfig
 from frame import Frame
-from sender import Sender
-from receiver import Receiver
-from channel import GilbertChannel
+from sender import Sender, SendBuffer, SelectiveRepeatSender
+from receiver import Receiver, SelectiveRepeatReceiver
+from channel import GilbertChannel, ChannelTrace
+from scheduler import EventScheduler
+from simulation import GoBackNSimulation, create_simulation
+from async_runtime import run_async
+from udp_transport import run_udp
+import benchmark
+import io
+import events
+import model
+import sweep
 
 
 class TestGoBackN(unittest.TestCase):
@@ -25,19 +36,9 @@ class TestGoBackN(unittest.TestCase):
         """
         print(f"\n[TEST]: {self._testMethodName}")
 
-        # Zapamiętujemy oryginalne ustawienia
-        self.orig_p = config.GILBERT_P
-        self.orig_k = config.GILBERT_K
-
-        # Ustawiamy idealny kanał dla testów logicznych
-        config.GILBERT_P = 0.0
-        config.GILBERT_K = 0.0
-        config.GILBERT_R = 1.0
-
-    def tearDown(self):
-        """Przywracamy ustawienia po teście."""
-        config.GILBERT_P = self.orig_p
-        config.GILBERT_K = self.orig_k
+        # Idealny kanał dla testów logicznych (własna konfiguracja - moduł config pozostaje nietknięty)
+        self.ideal_config = SimConfig(gilbert_p=0.0, gilbert_k=0.0, gilbert_r=1.0)
+        self.ideal_channel = GilbertChannel(self.ideal_config)
 
     # --- TESTY RAMEK (FRAME) ---
 
@@ -70,6 +71,75 @@ class TestGoBackN(unittest.TestCase):
         self.assertTrue(corrupt_frame.is_corrupt(), "CRC powinno wykryć zmianę bitów!")
         print("   -> CRC poprawnie wykryło uszkodzenie.")
 
+    def test_crc_batch_detection(self):
+        """Sprawdza tryb seryjny testu CRC: werdykt bez obiektów Frame i wynik niezależny od liczby procesów."""
+        import contextlib
+        import test_crc_efficiency as crc_test
+
+        raw = bytearray(Frame('DATA', 1, "WazneDane").to_bytes())
+        self.assertTrue(Frame.crc_ok(raw) and Frame.crc_ok(memoryview(raw)))
+        raw[-1] ^= 0x01
+        self.assertFalse(Frame.crc_ok(raw))
+        self.assertFalse(Frame.crc_ok(raw[:5]))
+
+        cfg = SimConfig(seed=7)
+        with contextlib.redirect_stdout(io.StringIO()):
+            local = crc_test.run_detection_batch(3000, 'BSC', 0.3, cfg, batch_size=500, workers=1)
+            pooled = crc_test.run_detection_batch(3000, 'BSC', 0.3, cfg, batch_size=500, workers=2)
+            sparse = crc_test.run_detection_batch(3000, 'BSC', 0.0005, cfg, batch_size=500)
+        self.assertEqual(local, pooled)
+        self.assertEqual(local['corrupted'], 3000)
+        self.assertEqual(local['undetected'], 0)
+        # P(ramka uszkodzona) = 1 - (1 - p)^n, n = 824 bity -> ok. 0.338
+        self.assertAlmostEqual(sparse['corrupted'] / 3000, 0.338, delta=0.04)
+        print("   -> Tryb seryjny liczy werdykty CRC bez obiektów Frame.")
+
+    def test_frame_wire_format(self):
+        """Sprawdza układ bajtów [CRC][SN, typ, nadawca, odbiorca][dane] i obsługę zbyt krótkich danych."""
+        raw = Frame('ACK', 3, sender_id="B", receiver_id="A").to_bytes()
+
+        self.assertEqual(raw[4:], b'\x03\x01BA')
+        self.assertEqual(int.from_bytes(raw[:4], 'big'), zlib.crc32(raw[4:]))
+        self.assertTrue(Frame.from_bytes(raw[:5]).is_corrupt(), "Zbyt krótka ramka musi być odrzucona.")
+        print("   -> Format ramki zgodny ze specyfikacją.")
+
+    def test_checksum_variants(self):
+        """Sprawdza sumy tablicowe (wartości kontrolne katalogu CRC) i kodek ramki dla każdej sumy."""
+        from checksum import CHECKSUMS, CRC32
+
+        check = {'crc8': 0xF4, 'crc16': 0x29B1, 'crc32': 0xCBF43926, 'crc32c': 0xE3069283, 'adler32': 0x091E01DE}
+        for name, expected in check.items():
+            self.assertEqual(CHECKSUMS[name].compute(b"123456789"), expected, name)
+        self.assertEqual(CRC32.reference.compute(b"123456789"), zlib.crc32(b"123456789"))
+
+        for checksum in CHECKSUMS.values():
+            raw = bytearray(Frame('DATA', 5, "Dane").to_bytes(checksum))
+            self.assertEqual(len(raw), checksum.size + 4 + 4)
+            self.assertEqual(Frame.from_bytes(raw, checksum).payload, "Dane")
+            raw[-1] ^= 0x10
+            self.assertTrue(Frame.from_bytes(raw, checksum).is_corrupt(), checksum.name)
+
+        with self.assertRaises(ValueError):
+            SimConfig(checksum='crc23')
+        cfg = SimConfig(target_packets=10, seed=1, checksum='crc8')
+        stats = create_simulation(cfg).run()
+        frames = stats['transmissions'] + stats['acks']
+        self.assertEqual(stats['checksum_bits'], frames * 8)
+        self.assertEqual(stats['header_bits'], frames * 32)
+        self.assertEqual(stats['payload_bits'], sum(len(f"Pakiet_{i + 1}") for i in range(10)) * 8)
+        self.assertAlmostEqual(stats['bit_efficiency'],
+                               stats['payload_bits'] / (stats['data_bits'] + stats['ack_bits']))
+        print("   -> Sumy kontrolne zgodne z katalogiem, narzut rozliczony.")
+
+    def test_frame_compact_representation(self):
+        """Sprawdza, czy ramka nie ma słownika atrybutów i trzyma typ jako kod liczbowy."""
+        frame = Frame('ACK', 2)
+
+        self.assertFalse(hasattr(frame, '__dict__'), "Frame powinna używać __slots__.")
+        self.assertEqual(frame.type_code, 1)
+        self.assertEqual(frame.type, 'ACK')
+        print("   -> Ramka używa __slots__ i kodu typu.")
+
     # --- TESTY NADAJNIKA (SENDER) ---
 
     def test_sender_window_logic(self):
@@ -86,12 +156,13 @@ class TestGoBackN(unittest.TestCase):
 
     def test_sender_cumulative_ack(self):
         """Sprawdza, czy ACK czyści bufor nadajnika (zwolnienie pamięci)."""
-        sender = Sender(window_size=4, max_seq=8)
+        sender = Sender(window_size=4, max_seq=8, channel=self.ideal_channel)
         sender.base = 0
 
         # Symulujemy dodanie ramek do bufora
         sender.buffer[0] = Frame('DATA', 0)
         sender.buffer[1] = Frame('DATA', 1)
+        sender.next_seq_num = 2
 
         # Otrzymujemy ACK 2 (potwierdza 0 i 1)
         sender.on_ack(2)
@@ -101,11 +172,200 @@ class TestGoBackN(unittest.TestCase):
         self.assertNotIn(1, sender.buffer, "Pakiet 1 powinien zniknąć z bufora.")
         print("   -> Kumulacyjne ACK poprawnie czyści bufor.")
 
+    def test_single_propagation_per_transmission(self):
+        """Sprawdza, że każda transmisja (DATA i ACK) przechodzi przez kanał dokładnie raz."""
+        for mode in ('GBN', 'SR'):
+            cfg = SimConfig(arq_mode=mode, target_packets=200, seed=5)
+            sim = create_simulation(cfg)
+            stats = sim.run()
+            self.assertEqual(stats['channel_bits'], stats['data_bits'] + stats['ack_bits'], mode)
+            self.assertEqual(stats['acks'], sim.reverse.frames)
+
+        sender = Sender(window_size=4, max_seq=8, clock=lambda: 0.0, channel=GilbertChannel(self.ideal_config))
+        frame, raw = sender.send_data("A")
+        self.assertEqual(bytes(raw), sender.encoded(frame))
+        self.assertEqual(sender.channel.bit_uses, len(raw) * 8)
+        print("   -> Jedno przejście przez kanał na transmisję.")
+
+    def test_sender_ack_validation_bulk_release(self):
+        """Sprawdza odrzucanie ACK spoza okna i zwalnianie zakresu komórek przez koniec pierścienia."""
+        sink = events.JsonlSink(io.StringIO())
+        sender = Sender(window_size=6, max_seq=8, clock=lambda: 0.0, channel=self.ideal_channel, events=sink)
+        sender.base = sender.next_seq_num = 5
+        for data in "ABCDE":
+            sender.process_data(data)
+        self.assertEqual(sender.next_seq_num, 2)
+
+        # ACK 4 nie potwierdza żadnej wysłanej ramki - bez zmiany stanu (wcześniej pętla mijała next_seq_num)
+        self.assertEqual(sender.on_ack(4), 0)
+        self.assertEqual((sender.base, sender.ignored_acks, len(sender.buffer)), (5, 1, 5))
+
+        self.assertEqual(sender.on_ack(1), 4)
+        self.assertEqual(sender.base, 1)
+        self.assertEqual([f.seq_num for f in sender.outstanding_frames()], [1])
+        self.assertEqual(len(sender.buffer), 1)
+        self.assertEqual(sink.count, 5 + 2)  # FRAME_SENT x5, ACK_IGNORED, jedno ACK_MOVED na 4 ramki
+        print("   -> ACK spoza okna odrzucone, zakres zwolniony jednym krokiem.")
+
+    def test_sender_adaptive_timeout(self):
+        """Sprawdza estymację RTO (Jacobson/Karn), wycofanie wykładnicze i skrócenie odzyskiwania po burzy."""
+        from sender import RtoEstimator
+
+        rto = RtoEstimator(1.0, 0.01, 2.0)
+        rto.sample(0.1)
+        self.assertAlmostEqual(rto.rto, 0.1 + 4 * 0.05)
+        rto.on_timeout(timer_start=5.0, now=5.3)
+        rto.on_timeout(timer_start=5.1, now=5.4)  # timer uzbrojony przed wycofaniem - bez drugiego podwojenia
+        self.assertAlmostEqual(rto.rto, 0.6)
+        self.assertEqual(rto.backoffs, 1)
+        rto.on_progress()  # nowe ACK (nawet bez próbki - reguła Karna) kasuje wycofanie
+        self.assertAlmostEqual(rto.rto, 0.3)
+
+        now = [0.0]
+        cfg = SimConfig(window_size=4, adaptive_timeout=True)
+        sender = Sender(clock=lambda: now[0], sim_config=cfg, channel=self.ideal_channel)
+        sender.process_data("A")
+        sender.send_frame(sender.buffer[0])  # retransmisja - próbka niejednoznaczna
+        sender.process_data("B")
+        now[0] = 0.02
+        sender.on_ack(1)
+        sender.on_ack(2)
+        self.assertEqual((sender.rtt.samples, sender.rtt.karn_skipped), (1, 1))
+        self.assertAlmostEqual(sender.rtt.srtt, 0.02)
+
+        stormy = SimConfig(gilbert_p=0.002, gilbert_r=0.05, target_packets=100, seed=4)
+        fixed = create_simulation(stormy).run()
+        adaptive = create_simulation(stormy.replace(adaptive_timeout=True)).run()
+        self.assertEqual(adaptive['delivered'], 100)
+        self.assertIsNone(fixed['rto'])
+        self.assertGreater(adaptive['rto']['samples'], 0)
+        self.assertLess(adaptive['sim_time'], fixed['sim_time'] / 5, "Odzyskiwanie po burzy powinno być szybsze.")
+        for p, r, seed in ((0.002, 0.05, 1), (0.002, 0.05, 2), (0.001, 0.02, 2)):
+            bursty = SimConfig(gilbert_p=p, gilbert_r=r, target_packets=100, seed=seed)
+            self.assertLessEqual(create_simulation(bursty.replace(adaptive_timeout=True)).run()['sim_time'],
+                                 create_simulation(bursty).run()['sim_time'], (p, r, seed))
+        print(f"   -> RTO {adaptive['rto']['rto'] * 1000:.1f} ms; czas {fixed['sim_time']:.2f}s -> "
+              f"{adaptive['sim_time']:.2f}s.")
+
+    def test_sender_fast_retransmit(self):
+        """Sprawdza szybką retransmisję po 3 zduplikowanych ACK i blokadę kolejnych w trakcie odzyskiwania."""
+        cfg = SimConfig(window_size=4, dup_ack_threshold=3)
+        sender = Sender(clock=lambda: 0.0, sim_config=cfg, channel=self.ideal_channel)
+        for data in "ABCD":
+            sender.process_data(data)
+        sender.on_ack(1)
+        for _ in range(2):
+            sender.on_ack(1)
+        self.assertFalse(sender.fast_retransmit_pending)
+        sender.on_ack(1)
+        self.assertTrue(sender.fast_retransmit_pending)
+        sender.retransmission_started()
+
+        # Kolejne duplikaty z ramek wysłanych przed retransmisją - bez drugiej szybkiej retransmisji
+        for _ in range(3):
+            sender.on_ack(1)
+        self.assertFalse(sender.fast_retransmit_pending)
+        self.assertEqual((sender.fast_retransmits, sender.fast_retransmits_suppressed), (1, 1))
+        sender.on_ack(4)
+        self.assertIsNone(sender.recover)
+
+        stormy = SimConfig(gilbert_p=0.002, gilbert_r=0.05, window_size=7, target_packets=200, seed=0)
+        slow = create_simulation(stormy).run()
+        fast = create_simulation(stormy.replace(dup_ack_threshold=3)).run()
+        self.assertEqual(fast['delivered'], 200)
+        self.assertGreater(fast['fast_retransmits'], 0)
+        self.assertLess(fast['timeouts'], slow['timeouts'])
+        self.assertLess(fast['sim_time'], slow['sim_time'], "Odzyskiwanie po błędzie powinno być szybsze.")
+        print(f"   -> szybkie retransmisje {fast['fast_retransmits']}; czas {slow['sim_time']:.2f}s -> "
+              f"{fast['sim_time']:.2f}s.")
+
+    def test_wide_sequence_numbers(self):
+        """Sprawdza nagłówek z 16/32-bitowym SN i przejście okna przez 0 przy numeracji 32-bitowej."""
+        from frame import seq_width, header_size
+
+        self.assertEqual([seq_width(2 ** bits) for bits in (3, 8, 9, 16, 17, 32)], [1, 1, 2, 2, 4, 4])
+        self.assertEqual([header_size(width) for width in (1, 2, 4)], [4, 5, 7])
+        raw = Frame('DATA', 2 ** 32 - 1, "Dane").to_bytes(seq_bytes=4)
+        self.assertEqual(Frame.from_bytes(raw, seq_bytes=4).seq_num, 2 ** 32 - 1)
+        self.assertTrue(Frame.crc_ok(raw, seq_bytes=4))
+
+        max_seq = 2 ** 32
+        sender = Sender(window_size=20000, max_seq=max_seq, clock=lambda: 0.0, channel=self.ideal_channel)
+        self.assertEqual(sender.buffer.capacity, 32768)
+        sender.base = sender.next_seq_num = max_seq - 5
+        for i in range(10):
+            sender.process_data(f"P{i}")
+        self.assertEqual(sender.next_seq_num, 5)
+        self.assertTrue(sender._is_within_window(max_seq - 1) and sender._is_within_window(19990))
+        self.assertEqual(sender.on_ack(2), 7)
+        self.assertEqual([f.seq_num for f in sender.outstanding_frames()], [2, 3, 4])
+
+        cfg = SimConfig(seq_bits=16, window_size=1000, target_packets=3000, seed=2, gilbert_p=0.0001)
+        stats = create_simulation(cfg).run()
+        self.assertEqual(stats['delivered'], 3000)
+        self.assertEqual(stats['header_bits'], (stats['transmissions'] + stats['acks']) * 5 * 8)
+        print("   -> Szerokie pole SN i okno 1000 ramek działają z przejściem przez 0.")
+
+    def test_send_buffer_ring_wraparound(self):
+        """Sprawdza pierścień bufora dla okna 7 przy 8 numerach (przejście przez 0 bez kolizji)."""
+        buffer = SendBuffer(window_size=7, max_seq=8)
+        window = [5, 6, 7, 0, 1, 2, 3]
+        for seq in window:
+            buffer[seq] = Frame('DATA', seq)
+
+        self.assertEqual(len(buffer), 7)
+        self.assertEqual([buffer[seq].seq_num for seq in window], window)
+        buffer.pop(5)
+        self.assertNotIn(5, buffer)
+        self.assertIn(3, buffer)
+        print("   -> Bufor pierścieniowy poprawnie obsługuje zawijanie numerów.")
+
+    def test_sender_caches_serialized_frames(self):
+        """Sprawdza, czy retransmisja używa zapamiętanych bajtów zamiast ponownej serializacji."""
+        sender = Sender(window_size=4, max_seq=8, channel=self.ideal_channel)
+        frame = sender.process_data("Dane")
+        cached = sender.encoded(frame)
+
+        self.assertIs(sender.encoded(frame), cached, "Ramka z bufora nie powinna być serializowana ponownie.")
+        self.assertEqual(sender.send_frame(frame), cached)
+
+        sender.on_ack(1)
+        self.assertNotIn(0, sender.buffer, "Potwierdzona ramka powinna zniknąć z bufora.")
+        self.assertEqual(sender.buffer.wire.count(None), sender.buffer.capacity,
+                         "Potwierdzona ramka powinna zniknąć z pamięci bajtów.")
+        print("   -> Nadajnik ponownie wykorzystuje zserializowane ramki.")
+
+    def test_duplex_piggybacked_acks(self):
+        """Sprawdza format DATA_ACK i to, że stacje pełnodupleksowe potwierdzają w ramkach danych."""
+        from frame import DATA_ACK
+        from checksum import CRC16
+        import duplex
+
+        for checksum, seq_bytes in ((None, 1), (CRC16, 2)):
+            raw = Frame(DATA_ACK, 9, "Dane", "B", "A", ack_num=4).to_bytes(checksum, seq_bytes)
+            restored = Frame.from_bytes(raw, checksum, seq_bytes)
+            self.assertEqual((restored.type, restored.seq_num, restored.ack_num, restored.payload),
+                             ('DATA_ACK', 9, 4, "Dane"))
+
+        cfg = self.ideal_config.replace(target_packets=60, window_size=20, seq_bits=8, seed=1)
+        sim = duplex.DuplexSimulation(cfg)
+        stats = sim.run()
+        for name, peer in (('A', 'B'), ('B', 'A')):
+            self.assertEqual(sim.endpoints[name].receiver.received_payload, sim.endpoints[peer].outgoing)
+        self.assertEqual(stats['transmissions'], 120)
+        self.assertLess(stats['standalone_acks'], 12, "Przy ruchu w obu kierunkach ACK ma jechać w danych.")
+
+        one_way = duplex.DuplexSimulation(cfg, reverse_packets=0).run()
+        self.assertEqual(one_way['delivered'], 60)
+        self.assertGreater(one_way['standalone_acks'], 0, "Bez danych zwrotnych ACK wysyłane są po timerze.")
+        self.assertLess(one_way['standalone_acks'], 60, "Opóźnione ACK obejmuje kilka ramek.")
+        print(f"   -> 120 pakietów w {stats['frames']} ramkach ({stats['standalone_acks']} osobnych ACK).")
+
     # --- TESTY ODBIORNIKA (RECEIVER) ---
 
     def test_receiver_out_of_order_logic(self):
         """Sprawdza, czy Odbiornik odrzuca ramki spoza kolejności."""
-        receiver = Receiver(max_seq=8)
+        receiver = Receiver(max_seq=8, channel=self.ideal_channel)
         receiver.expected_seq_num = 1  # Czeka na 1
 
         # Tworzymy ramkę z numerem 5 (duża dziura)
@@ -122,12 +382,303 @@ class TestGoBackN(unittest.TestCase):
         self.assertEqual(receiver.expected_seq_num, 1, "Odbiornik nie powinien przesunąć okna.")
         print("   -> Odbiornik prawidłowo odrzuca pakiety spoza kolejności.")
 
+    def test_receiver_ack_policies(self):
+        """Sprawdza wstrzymywanie ACK (every_k, timer), limit duplikatów i oszczędność kanału zwrotnego."""
+        now = [0.0]
+        receiver = Receiver(max_seq=8, channel=self.ideal_channel, clock=lambda: now[0],
+                            sim_config=self.ideal_config.replace(ack_policy='every_k', ack_every=2, dup_ack_limit=1))
+        self.assertIsNone(receiver.receive_frame(Frame('DATA', 0, "A").to_bytes()), "Pierwsze ACK wstrzymane.")
+        self.assertEqual(receiver.ack_due, receiver.ack_delay)
+        self.assertEqual(Frame.from_bytes(receiver.receive_frame(Frame('DATA', 1, "B").to_bytes())).seq_num, 2)
+        self.assertIsNone(receiver.ack_due, "Wysłane ACK obejmuje wstrzymane potwierdzenie.")
+
+        # Luka: pierwszy duplikat ACK 2 wysłany od razu, kolejny ponad limit pominięty
+        self.assertIsNotNone(receiver.receive_frame(Frame('DATA', 3, "D").to_bytes()))
+        self.assertIsNone(receiver.receive_frame(Frame('DATA', 4, "E").to_bytes()))
+        now[0] = 0.5
+        receiver.receive_frame(Frame('DATA', 2, "C").to_bytes())
+        snapshot = receiver.ack_snapshot()
+        self.assertEqual((snapshot['dup_acks_suppressed'], snapshot['recoveries']), (1, 1))
+        self.assertAlmostEqual(snapshot['mean_recovery_time'], 0.5)
+        self.assertEqual(Frame.from_bytes(receiver.flush_ack()).seq_num, 3, "Timer wysyła wstrzymane ACK.")
+        # Powtórzenia przyjętej ramki (zgubione ACK całego okna) są potwierdzane mimo limitu
+        for _ in range(3):
+            self.assertEqual(Frame.from_bytes(receiver.receive_frame(Frame('DATA', 2, "C").to_bytes())).seq_num, 3)
+
+        sr = SelectiveRepeatReceiver(sim_config=self.ideal_config.replace(arq_mode='SR', ack_policy='timer'),
+                                     channel=self.ideal_channel)
+        self.assertEqual(sr.ack_snapshot()['policy'], 'SACK', "SR potwierdza każdą ramkę - polityka nie działa.")
+
+        # Regresja: przy limicie duplikatów utrata ostatnich ACK okna nie może zablokować przebiegu
+        lossy = SimConfig(gilbert_p=0.01, gilbert_r=0.05, window_size=4, target_packets=300, dup_ack_limit=1)
+        for seed in (0, 1):
+            stats = create_simulation(lossy.replace(seed=seed)).run()
+            self.assertEqual(stats['delivered'], 300, seed)
+            self.assertGreater(stats['ack']['dup_acks_suppressed'], 0)
+
+        stormy = SimConfig(gilbert_p=0.002, gilbert_r=0.05, window_size=7, target_packets=200, seed=3)
+        acks = {}
+        for changes in (dict(ack_policy='each'), dict(ack_policy='every_k', ack_every=4),
+                        dict(ack_policy='timer'), dict(dup_ack_limit=1)):
+            sim = create_simulation(stormy.replace(**changes))
+            stats = sim.run()
+            self.assertEqual(sim.receiver.received_payload, [f"Pakiet_{i + 1}" for i in range(200)])
+            self.assertEqual(stats['ack']['acks_sent'], stats['acks'])
+            acks[tuple(changes.values())] = stats['acks']
+        self.assertLess(max(acks[('every_k', 4)], acks[('timer',)], acks[(1,)]), acks[('each',)])
+
+        # Bez dalszych ramek wstrzymane ACK musi wysłać timer (inaczej Nadajnik czekałby na TIMEOUT)
+        async_stats = run_async(self.ideal_config.replace(ack_policy='timer', target_packets=50), delay=0.001)
+        self.assertEqual((async_stats['delivered'], async_stats['timeouts']), (50, 0))
+        print(f"   -> ACK w kanale zwrotnym: {acks}.")
+
+    # --- TESTY SELECTIVE REPEAT ---
+
+    def test_sr_receiver_buffers_out_of_order(self):
+        """Sprawdza, czy odbiornik SR buforuje ramki spoza kolejności i oddaje dane w kolejności."""
+        receiver = SelectiveRepeatReceiver(max_seq=8, window_size=4, channel=self.ideal_channel)
+
+        sack = Frame.from_bytes(receiver.receive_frame(Frame('DATA', 1, "B").to_bytes()))
+        self.assertEqual((sack.type, sack.seq_num), ('SACK', 1), "Ramka w oknie powinna być potwierdzona.")
+        self.assertEqual(receiver.received_payload, [], "Dane nie mogą wyprzedzić brakującej ramki 0.")
+
+        receiver.receive_frame(Frame('DATA', 0, "A").to_bytes())
+        self.assertEqual(receiver.received_payload, ["A", "B"])
+        self.assertEqual(receiver.expected_seq_num, 2)
+        print("   -> Odbiornik SR buforuje ramki i zachowuje kolejność danych.")
+
+    def test_sr_sender_selective_ack(self):
+        """Sprawdza, czy SACK potwierdza tylko jedną ramkę, a okno przesuwa się po wypełnieniu luki."""
+        sender = SelectiveRepeatSender(window_size=4, max_seq=8, channel=self.ideal_channel)
+        for data in "ABC":
+            sender.process_data(data)
+
+        self.assertEqual(sender.on_ack(1), 0, "SACK 1 nie może przesunąć okna, gdy brakuje 0.")
+        self.assertEqual([f.seq_num for f in sender.outstanding_frames()], [0, 2])
+        self.assertEqual(sender.on_ack(0), 2, "Po SACK 0 okno przesuwa się przez 0 i 1.")
+        self.assertEqual(sender.base, 2)
+        print("   -> Nadajnik SR obsługuje potwierdzenia selektywne.")
+
+    def test_sr_simulation_delivers_in_order(self):
+        """Sprawdza, czy pełna symulacja SR dostarcza wszystkie pakiety w kolejności mimo burz."""
+        noisy = SimConfig(gilbert_p=0.01, gilbert_r=0.1, gilbert_k=0.001, gilbert_h=0.5,
+                          target_packets=40, seed=4, arq_mode='SR')
+
+        sim = create_simulation(noisy)
+        stats = sim.run()
+
+        self.assertEqual(sim.receiver.received_payload, [f"Pakiet_{i + 1}" for i in range(40)])
+        self.assertGreater(stats['retransmissions'], 0)
+        with self.assertRaises(ValueError):
+            noisy.replace(window_size=5)
+        print(f"   -> SR: wydajność {stats['efficiency']:.2f} przy {stats['retransmissions']} retransmisjach.")
+
+    # --- TESTY ŚRODOWISKA ASYNCIO ---
+
+    def test_async_runtime_pipelines_window(self):
+        """Sprawdza, czy w środowisku asyncio w łączu jest jednocześnie całe okno ramek."""
+        stats = run_async(self.ideal_config.replace(target_packets=12, window_size=4), delay=0.002)
+
+        self.assertEqual(stats['delivered'], 12)
+        self.assertEqual(stats['retransmissions'], 0)
+        self.assertEqual(stats['max_in_flight'], 4, "Nadajnik powinien wypełnić całe okno bez czekania na ACK.")
+        print(f"   -> asyncio: {stats['throughput']:.0f} pakietów/s przy {stats['max_in_flight']} ramkach w łączu.")
+
+    def test_async_runtime_recovers_from_errors(self):
+        """Sprawdza, czy tryby GBN i SR w asyncio dostarczają wszystkie pakiety przez kanał z błędami."""
+        noisy = SimConfig(gilbert_p=0.01, gilbert_r=0.1, gilbert_k=0.001, gilbert_h=0.5,
+                          target_packets=15, seed=2, timeout=0.05)
+        for mode in ('GBN', 'SR'):
+            stats = run_async(noisy.replace(arq_mode=mode), delay=0.001)
+            self.assertEqual(stats['delivered'], 15, f"Tryb {mode} nie dostarczył wszystkich pakietów.")
+            self.assertGreater(stats['retransmissions'], 0)
+        print("   -> asyncio: GBN i SR odtwarzają utracone ramki.")
+
+    # --- TESTY TRANSPORTU UDP ---
+
+    def test_udp_transport_delivers_over_sockets(self):
+        """Sprawdza, czy ramki przechodzą przez gniazda UDP i pośrednika zakłóceń bez strat w kolejności."""
+        ideal = self.ideal_config.replace(target_packets=200, timeout=0.05)
+        stats = run_udp(ideal, batch_size=16, channel=None)
+        self.assertEqual(stats['delivered'], 200)
+        self.assertEqual(stats['transmissions'], 200, "Bez zakłóceń każda ramka jest wysyłana raz.")
+
+        noisy = SimConfig(gilbert_p=0.01, gilbert_r=0.1, gilbert_k=0.001, gilbert_h=0.5,
+                          target_packets=50, seed=3, timeout=0.01, arq_mode='SR')
+        stats = run_udp(noisy)
+        self.assertEqual(stats['delivered'], 50)
+        self.assertGreater(stats['retransmissions'], 0)
+        print(f"   -> UDP: {stats['syscalls_per_packet']:.1f} wywołań systemowych na pakiet.")
+
+    # --- TESTY BENCHMARKÓW ---
+
+    def test_benchmark_report_and_regression(self):
+        """Sprawdza format raportu benchmarków i wykrywanie regresji względem wyniku bazowego."""
+        report = benchmark.run_benchmarks(['frame_to_bytes', 'e2e_gbn_w4'], scale=0.01, repeats=1)
+        self.assertEqual(set(report['results']), {'frame_to_bytes', 'e2e_gbn_w4'})
+        self.assertEqual(report['results']['e2e_gbn_w4']['unit'], 'packets/s')
+        self.assertGreater(report['results']['frame_to_bytes']['value'], 0)
+        self.assertGreater(benchmark._best_time(lambda: None, 1), 0, "Pusty pomiar nie może dać dzielnika 0.")
+
+        baseline = {'results': {name: {'value': entry['value'] * 2, 'unit': entry['unit']}
+                                for name, entry in report['results'].items()}}
+        rows = benchmark.compare(report, baseline, tolerance=0.1)
+        self.assertTrue(all(regression for *_, regression in rows), "Spadek o 50% to regresja.")
+        self.assertFalse(any(regression for *_, regression in benchmark.compare(report, report)))
+        print("   -> Benchmarki: raport JSON i porównanie z bazą działają.")
+
+    def test_instrumentation_counts_stages(self):
+        """Sprawdza liczniki etapów instrumentacji i przywrócenie oryginalnych metod po pomiarze."""
+        import instrument
+
+        original_propagate = GilbertChannel.propagate
+        original_from_bytes = Frame.__dict__['from_bytes']
+        cfg = SimConfig(gilbert_p=0.005, gilbert_r=0.1, target_packets=30, seed=2)
+
+        with instrument.Instrumentation(profile=True) as probe:
+            stats = create_simulation(cfg).run()
+        report = json.loads(json.dumps(probe.report()))
+        stages = report['stages']
+
+        self.assertEqual(stages['channel.propagate']['calls'], stats['transmissions'] + stats['acks'])
+        self.assertEqual(stages['receiver.receive_frame']['calls'], stats['transmissions'])
+        self.assertEqual(stages['sender.timer']['calls'], stats['timeouts'])
+        self.assertEqual(sum(stages['frame.to_bytes']['histogram_ns'].values()), stages['frame.to_bytes']['calls'])
+        self.assertTrue(report['profile'])
+        self.assertIs(GilbertChannel.propagate, original_propagate)
+        self.assertIs(Frame.__dict__['from_bytes'], original_from_bytes)
+        print(f"   -> {stages['channel.propagate']['calls']} propagacji zmierzonych, metody przywrócone.")
+
+    # --- TESTY ZDARZEŃ ---
+
+    def test_event_sinks(self):
+        """Sprawdza zapis zdarzeń do JSON Lines i renderowanie w konsoli przez wspólny strumień zdarzeń."""
+        trace, console = io.StringIO(), io.StringIO()
+        sink = events.MultiSink(events.JsonlSink(trace), events.ConsoleRenderer(console))
+        receiver = Receiver(max_seq=8, channel=self.ideal_channel, events=sink)
+
+        receiver.receive_frame(Frame('DATA', 0, "A").to_bytes())
+        receiver.receive_frame(Frame('DATA', 2, "C").to_bytes())
+
+        kinds = [json.loads(line)['event'] for line in trace.getvalue().splitlines()]
+        self.assertEqual(kinds, ['frame_accepted', 'ack_sent', 'frame_out_of_order', 'ack_sent'])
+        self.assertIn("poza kolejnością", console.getvalue())
+        self.assertFalse(events.MultiSink().enabled, "Pusty zestaw odbiorców musi być wyłączony.")
+
+        # Próg poziomu: przy 'info' pomijane są zdarzenia każdej ramki (DEBUG)
+        trace, console = io.StringIO(), io.StringIO()
+        sink = events.MultiSink(events.JsonlSink(trace, level='info'), events.ConsoleRenderer(console, level='info'))
+        receiver = Receiver(max_seq=8, channel=self.ideal_channel, events=sink)
+        receiver.receive_frame(Frame('DATA', 0, "A").to_bytes())
+        receiver.receive_frame(Frame('DATA', 2, "C").to_bytes())
+        self.assertEqual([json.loads(line)['event'] for line in trace.getvalue().splitlines()], ['frame_out_of_order'])
+        self.assertEqual(len(console.getvalue().splitlines()), 1)
+        print("   -> Zdarzenia trafiają do JSONL i do konsoli.")
+
+    def test_channel_burst_events(self):
+        """Sprawdza, czy kanał zgłasza początek i koniec burzy oraz przekłamania tylko przy włączonym odbiorcy."""
+        trace = io.StringIO()
+        stormy = SimConfig(gilbert_p=0.02, gilbert_r=0.05, gilbert_k=0.0, gilbert_h=0.5, seed=9)
+        channel = GilbertChannel(stormy, events=events.JsonlSink(trace))
+        for _ in range(50):
+            channel.propagate(bytes(32))
+
+        records = [json.loads(line) for line in trace.getvalue().splitlines()]
+        starts = sum(r['event'] == 'burst_start' for r in records)
+        ends = sum(r['event'] == 'burst_end' for r in records)
+        self.assertGreater(starts, 0)
+        self.assertLessEqual(abs(starts - ends), 1, "Każda burza (poza ostatnią) musi mieć koniec.")
+        self.assertTrue(any(r['event'] == 'channel_errors' for r in records))
+        print(f"   -> Kanał zgłosił {starts} burz.")
+
+    # --- TESTY MODELU ANALITYCZNEGO ---
+
+    def test_model_frame_error_rate_matches_channel(self):
+        """Sprawdza, czy FER z łańcucha Markowa zgadza się z częstością błędów ramek w kanale."""
+        p, r, k, h = 0.001, 0.02, 0.0001, 0.5
+        channel = GilbertChannel(SimConfig(gilbert_p=p, gilbert_r=r, gilbert_k=k, gilbert_h=h, seed=1))
+        frame = bytes(16)
+        trials = 20000
+        errors = sum(channel.propagate(frame) != frame for _ in range(trials))
+
+        expected = model.frame_error_rate(p, r, k, h, len(frame) * 8)
+        self.assertAlmostEqual(errors / trials, expected, delta=0.01)
+        self.assertEqual(model.frame_error_rate(0.0, 1.0, 0.0, 0.5, 1000), 0.0)
+        print(f"   -> FER: model {expected:.4f}, kanał {errors / trials:.4f}.")
+
+    def test_model_predicts_simulated_efficiency(self):
+        """Sprawdza, czy model przewiduje wydajność GBN i SR zmierzoną w symulacji."""
+        for mode in ('GBN', 'SR'):
+            cfg = SimConfig(gilbert_p=0.0003, gilbert_r=0.05, target_packets=1500, arq_mode=mode)
+            runs = [create_simulation(cfg.replace(seed=seed)).run()['efficiency'] for seed in range(3)]
+            simulated = sum(runs) / len(runs)
+            self.assertAlmostEqual(model.predict(cfg)['efficiency'], simulated, delta=0.04, msg=mode)
+
+        rows = sweep.run_sweep(sweep.build_grid(p=[0.0003, 0.001]), base_config=SimConfig(), use_model=True)
+        self.assertGreater(rows[0]['efficiency'], rows[1]['efficiency'])
+        print("   -> Model analityczny zgodny z symulacją.")
+
     # --- TESTY KANAŁU ---
 
+    def test_channel_trace_replay(self):
+        """Sprawdza, czy zapis maski przekłamań pozwala odtworzyć wyjście i wizualizację dowolnej ramki."""
+        stormy = SimConfig(gilbert_p=0.01, gilbert_r=0.05, gilbert_k=0.001, gilbert_h=0.5, seed=3)
+        channel = GilbertChannel(stormy, record=True)
+        outputs = [channel.propagate(bytes([i]) * 16) for i in range(40)]
+
+        self.assertEqual([t.output() for t in channel.traces], outputs)
+        clean = [t for t in channel.traces if t.errors == 0]
+        self.assertTrue(clean and all(t.mask is None for t in clean), "Ramka bez błędów nie ma maski.")
+
+        trace = next(t for t in channel.traces if t.errors > 0)
+        self.assertIsNone(trace._rendered, "Wizualizacja nie może powstawać bez potrzeby.")
+        visual_input, visual_output = trace.render()
+        self.assertEqual(visual_output.count(f"\033[91m"), trace.errors)
+        self.assertIs(trace.render()[1], visual_output, "Wizualizacja powinna być budowana tylko raz.")
+        self.assertEqual(ChannelTrace(b'\x00\x00', None, [(4, 12)], 0).burst_mask(), b'\x0f\xf0')
+        print("   -> Zapis kanału odtwarza wyjście i wizualizację ramki.")
+
+    def test_error_trace_file_replay(self):
+        """Sprawdza, czy przebieg zapisany do pliku odtwarza dokładnie te same błędy w symulacji."""
+        import os
+        import tempfile
+        from error_trace import ErrorTrace, ReplayChannel, generate_trace, save_channel_traces
+
+        stormy = SimConfig(gilbert_p=0.005, gilbert_r=0.05, target_packets=40, seed=5)
+        with tempfile.TemporaryDirectory() as tmp:
+            sim = GoBackNSimulation(stormy)
+            sim.channel.traces = []
+            recorded = sim.run()
+            path = save_channel_traces(os.path.join(tmp, 'run.bin'), sim.channel.traces, stormy)
+            replay = GoBackNSimulation(stormy, trace=path)
+            replayed = replay.run()
+            self.assertTrue(replay.channel.trace.closed, "Przebieg otwarty ze ścieżki musi zostać zamknięty.")
+            self.assertEqual(replayed['retransmissions'], recorded['retransmissions'])
+            self.assertEqual(replayed['sim_time'], recorded['sim_time'])
+
+            path = generate_trace(os.path.join(tmp, 'gen.bin'), stormy, nbits=100_000)
+            with ErrorTrace(path) as trace:
+                full = int.from_bytes(trace.mask, 'big')
+                mask, bursts, errors = trace.window(3, 13)
+                expected = (full >> (trace.nbits - 16)) & 0x1FFF
+                self.assertEqual(int.from_bytes(mask or b'\x00', 'big') >> 3, expected)
+                self.assertEqual(errors, expected.bit_count())
+
+                channel = ReplayChannel(trace)
+                frames = [bytes(100)] * 20
+                first = [channel.propagate(f) for f in frames]
+                channel.seed(0)
+                self.assertEqual(channel.propagate_batch(frames), first, "Odtworzenie musi być powtarzalne.")
+                self.assertEqual(bytes().join(first), bytes(trace.mask[:2000]))
+                channel.close()
+                self.assertFalse(trace.closed, "Przekazany ErrorTrace należy do wywołującego.")
+            self.assertTrue(trace.closed)
+        print("   -> Przebieg błędów z pliku odtwarza te same przekłamania.")
+
     def test_channel_pass_through(self):
         """Sprawdza czy kanał przepuszcza dane (przy wyłączonych błędach)."""
         # W setUp wyłączyliśmy błędy, więc kanał powinien być przezroczysty
-        channel = GilbertChannel()
+        channel = GilbertChannel(self.ideal_config)
         data = b'Test1234'
 
         output = channel.propagate(bytearray(data))
@@ -135,6 +686,132 @@ class TestGoBackN(unittest.TestCase):
         self.assertEqual(data, output, "Przy zerowym P i K kanał nie powinien zmieniać danych.")
         print("   -> Kanał poprawnie przekazuje dane w idealnych warunkach.")
 
+    def test_channel_seed_reproducible(self):
+        """Sprawdza, czy dwa kanały z tym samym ziarnem psują dane identycznie."""
+        noisy = SimConfig(gilbert_p=0.01, gilbert_r=0.1, gilbert_k=0.001, gilbert_h=0.5)
+        frames = [bytes(range(40))] * 50
+
+        out_a = GilbertChannel(noisy, seed=7).propagate_batch(frames)
+        out_b = GilbertChannel(noisy, seed=7).propagate_batch(frames)
+
+        self.assertEqual(out_a, out_b, "To samo ziarno powinno dać identyczne przekłamania.")
+        self.assertNotEqual(out_a, frames, "Przy tych parametrach kanał powinien coś przekłamać.")
+        print("   -> Kanał z ziarnem jest powtarzalny.")
+
+    def test_channel_error_rate_matches_model(self):
+        """Sprawdza, czy stopa błędów bitowych zgadza się z rozkładem stacjonarnym modelu Gilberta."""
+        p, r, k, h = 0.01, 0.1, 0.001, 0.5
+        noisy = SimConfig(gilbert_p=p, gilbert_r=r, gilbert_k=k, gilbert_h=h, seed=2024)
+
+        data = bytes(50000)
+        out = GilbertChannel(noisy).propagate_batch([data] * 4)
+        flipped = sum(bin(b).count("1") for chunk in out for b in chunk)
+        measured = flipped / (len(data) * 8 * 4)
+
+        pi_b = p / (p + r)
+        expected = (1 - pi_b) * k + pi_b * h
+        self.assertAlmostEqual(measured, expected, delta=expected * 0.15)
+        print(f"   -> BER zmierzony {measured:.4f}, oczekiwany {expected:.4f}.")
+
+    # --- TESTY SYMULACJI ZDARZEŃ DYSKRETNYCH ---
+
+    def test_scheduler_orders_events_by_time(self):
+        """Sprawdza, czy planista wydaje zdarzenia według czasu wirtualnego."""
+        scheduler = EventScheduler()
+        scheduler.schedule(2.0, 'B')
+        scheduler.schedule(0.5, 'A')
+        scheduler.schedule(2.0, 'C')
+
+        order = [scheduler.pop()[0] for _ in range(3)]
+
+        self.assertEqual(order, ['A', 'B', 'C'], "Zdarzenia równoczesne w kolejności dodania.")
+        self.assertEqual(scheduler.now, 2.0)
+        print("   -> Planista zachowuje kolejność czasową.")
+
+    def test_simulation_timeout_in_virtual_time(self):
+        """Sprawdza, czy retransmisje po TIMEOUT nie czekają na zegar ścienny."""
+        noisy = SimConfig(gilbert_p=0.01, gilbert_r=0.1, gilbert_k=0.001, gilbert_h=0.5,
+                          target_packets=20, seed=11)
+
+        sim = GoBackNSimulation(noisy)
+        stats = sim.run()
+
+        self.assertEqual(sim.receiver.received_payload, [f"Pakiet_{i + 1}" for i in range(20)])
+        self.assertGreater(stats['timeouts'], 0, "Przy tych parametrach musi wystąpić TIMEOUT.")
+        self.assertGreater(stats['sim_time'], noisy.timeout)
+        self.assertLess(stats['wall_time'], noisy.timeout, "Czas wirtualny nie może być przesypiany.")
+        print(f"   -> {stats['timeouts']} timeoutów w {stats['sim_time']:.2f}s czasu wirtualnego.")
+
+    def test_multiflow_shared_channel(self):
+        """Sprawdza dostarczenie pakietów wszystkich przepływów, powtarzalność i indeks Jaina."""
+        import multiflow
+
+        self.assertAlmostEqual(multiflow.jain_index([2.0, 2.0, 2.0]), 1.0)
+        self.assertAlmostEqual(multiflow.jain_index([3.0, 0.0, 0.0]), 1 / 3)
+
+        cfg = SimConfig(gilbert_p=0.002, gilbert_r=0.05, target_packets=12, seed=4)
+        stream = io.StringIO()
+        sink = events.JsonlSink(stream)
+        shared = multiflow.MultiFlowSimulation(cfg, flows=40, start_spread=0.5, events=sink).run()
+        per_link = [multiflow.MultiFlowSimulation(cfg, flows=40, shared_channel=False).run() for _ in range(2)]
+
+        for stats in (shared, *per_link):
+            self.assertEqual(stats['completed'], 40)
+            self.assertEqual(stats['delivered'], 40 * 12)
+            self.assertGreaterEqual(stats['transmissions'], stats['delivered'])
+            self.assertTrue(0.0 < stats['fairness'] <= 1.0)
+        self.assertEqual(per_link[0]['flow_throughput'], per_link[1]['flow_throughput'])
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(sum(1 for r in records if r['event'] == events.FLOW_DONE), 40)
+        self.assertEqual({r['flow'] for r in records if r['event'] == events.FRAME_ACCEPTED}, set(range(40)))
+        print(f"   -> 40 przepływów: wydajność {shared['efficiency']:.2f}, indeks Jaina {shared['fairness']:.2f}.")
+
+    # --- TESTY PRZEGLĄDU PARAMETRÓW ---
+
+    def test_sweep_grid_reproducible(self):
+        """Sprawdza, czy przegląd w puli procesów daje powtarzalną tabelę dla całej siatki."""
+        points = sweep.build_grid(p=[0.0, 0.001], window_size=[2, 4])
+        self.assertEqual(len(points), 4)
+
+        rows_a = sweep.run_sweep(points, target_packets=15, seed=3, workers=2)
+        rows_b = sweep.run_sweep(points, target_packets=15, seed=3, workers=1)
+
+        self.assertEqual(rows_a, rows_b, "Wynik nie może zależeć od liczby procesów.")
+        self.assertEqual([row['window_size'] for row in rows_a], [2, 4, 2, 4])
+        print("   -> Przegląd parametrów jest powtarzalny.")
+
+    # --- TESTY KONFIGURACJI PRZEBIEGU ---
+
+    def test_sim_config_immutable_and_hashable(self):
+        """Sprawdza, czy SimConfig jest niezmienny i może być kluczem słownika."""
+        cfg = SimConfig(seed=1)
+
+        with self.assertRaises(Exception):
+            cfg.timeout = 5.0
+        self.assertEqual({cfg: 'wynik'}[SimConfig(seed=1)], 'wynik')
+        self.assertEqual(cfg.replace(seq_bits=4).max_seq, 16)
+        with self.assertRaises(ValueError):
+            SimConfig(window_size=8, seq_bits=3)
+
+        # Kanał domyślny Nadajnika i Odbiornika korzysta z ich konfiguracji, a nie z modułu config
+        self.assertEqual(Receiver(sim_config=self.ideal_config).channel.propagate(bytes(64)), bytes(64))
+        self.assertIs(Sender(sim_config=self.ideal_config).channel.sim_config, self.ideal_config)
+        print("   -> SimConfig jest niezmienny i haszowalny.")
+
+    def test_concurrent_simulations_isolated(self):
+        """Sprawdza, czy równoległe przebiegi w wątkach dają te same wyniki co sekwencyjne."""
+        from concurrent.futures import ThreadPoolExecutor
+        import main
+
+        configs = [SimConfig(gilbert_p=0.005, gilbert_r=0.1, target_packets=15, seed=s) for s in range(4)]
+        sequential = [main.simulate(cfg)['retransmissions'] for cfg in configs]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            threaded = [stats['retransmissions'] for stats in pool.map(main.simulate, configs)]
+
+        self.assertEqual(sequential, threaded)
+        self.assertEqual(main.simulate_memoized(configs[0])['retransmissions'], sequential[0])
+        print("   -> Przebiegi z własną konfiguracją nie wpływają na siebie.")
+
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()